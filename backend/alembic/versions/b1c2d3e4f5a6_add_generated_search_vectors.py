@@ -0,0 +1,91 @@
+"""Replace text search_vector columns with generated, GIN-indexed tsvectors
+
+Revision ID: b1c2d3e4f5a6
+Revises: af1b2c3d4e5f
+Create Date: 2026-10-16 09:00:00.000000
+
+The previous full-text migration stored search_vector as TEXT (never kept in
+sync) and indexed an unweighted to_tsvector() expression that the search
+queries had to repeat verbatim. This migration makes search_vector a stored
+generated tsvector so Postgres maintains it on write and the GIN index can
+serve both the @@ match and ts_rank without recomputing per row.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c2d3e4f5a6'
+down_revision: Union[str, None] = 'af1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> weighted tsvector expression (A = title/name, B = body text)
+SEARCH_VECTORS = {
+    'people': """
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(bio_short, '')), 'B')
+    """,
+    'events': """
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    'conflicts': """
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    'books': """
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    'countries': """
+        setweight(to_tsvector('english', coalesce(name_en, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(name_short, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    'political_parties': """
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(name_english, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(name_short, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+}
+
+# Expression indexes created by 9f0g1h2i3j4k that the generated columns replace
+LEGACY_INDEXES = {
+    'people': "coalesce(name, '') || ' ' || coalesce(bio_short, '')",
+    'events': "coalesce(title, '') || ' ' || coalesce(description, '')",
+    'conflicts': "coalesce(name, '') || ' ' || coalesce(description, '')",
+    'books': "coalesce(title, '') || ' ' || coalesce(description, '')",
+}
+
+
+def upgrade() -> None:
+    for table in LEGACY_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS idx_{table}_search_vector')
+        op.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(f"""
+            ALTER TABLE {table} ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS ({expression}) STORED
+        """)
+        op.execute(f"""
+            CREATE INDEX idx_{table}_search_vector ON {table} USING GIN (search_vector)
+        """)
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTORS:
+        op.execute(f'DROP INDEX IF EXISTS idx_{table}_search_vector')
+        op.drop_column(table, 'search_vector')
+
+    for table, expression in LEGACY_INDEXES.items():
+        op.add_column(table, sa.Column('search_vector', sa.Text, nullable=True))
+        op.execute(f"""
+            CREATE INDEX idx_{table}_search_vector ON {table}
+            USING GIN (to_tsvector('english', {expression}))
+        """)
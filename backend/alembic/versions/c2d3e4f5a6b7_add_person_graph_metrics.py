@@ -0,0 +1,46 @@
+"""Add person_graph_metrics table for precomputed network centrality
+
+Revision ID: c2d3e4f5a6b7
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d3e4f5a6b7'
+down_revision: Union[str, None] = 'b1c2d3e4f5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'person_graph_metrics',
+        sa.Column(
+            'person_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('people.id', ondelete='CASCADE'), primary_key=True,
+        ),
+        sa.Column('degree', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('pagerank', sa.Float, nullable=False, server_default='0'),
+        sa.Column('betweenness', sa.Float, nullable=False, server_default='0'),
+        sa.Column('community', sa.Integer),
+        sa.Column(
+            'computed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False,
+        ),
+    )
+    op.create_index(
+        'idx_person_graph_metrics_pagerank', 'person_graph_metrics', [sa.text('pagerank DESC')],
+    )
+    op.create_index('idx_person_graph_metrics_community', 'person_graph_metrics', ['community'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_person_graph_metrics_community')
+    op.drop_index('idx_person_graph_metrics_pagerank')
+    op.drop_table('person_graph_metrics')
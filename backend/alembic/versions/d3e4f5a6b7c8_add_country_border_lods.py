@@ -0,0 +1,43 @@
+"""Add country_border_lods table for precomputed simplified borders
+
+Revision ID: d3e4f5a6b7c8
+Revises: c2d3e4f5a6b7
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3e4f5a6b7c8'
+down_revision: Union[str, None] = 'c2d3e4f5a6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'country_border_lods',
+        sa.Column(
+            'border_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('country_borders.id', ondelete='CASCADE'), primary_key=True,
+        ),
+        sa.Column('tolerance', sa.Float, primary_key=True),
+        sa.Column(
+            'geometry',
+            Geometry(geometry_type='MULTIPOLYGON', srid=4326, spatial_index=False),
+            nullable=False,
+        ),
+        sa.Column(
+            'computed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('country_border_lods')
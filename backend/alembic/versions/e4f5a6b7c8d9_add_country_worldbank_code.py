@@ -0,0 +1,28 @@
+"""Add worldbank_code to countries
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-16 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f5a6b7c8d9'
+down_revision: Union[str, None] = 'd3e4f5a6b7c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('countries', sa.Column('worldbank_code', sa.String(3), nullable=True))
+    op.create_index('ix_countries_worldbank_code', 'countries', ['worldbank_code'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_countries_worldbank_code', table_name='countries')
+    op.drop_column('countries', 'worldbank_code')
@@ -0,0 +1,30 @@
+"""Add spatial and located-date indexes on events
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-16 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a6b7c8d9e0'
+down_revision: Union[str, None] = 'e4f5a6b7c8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_location ON events USING GIST (location)")
+    # The globe reads events by year range among those with a location
+    op.execute(
+        "CREATE INDEX idx_events_located_start_date ON events (start_date) "
+        "WHERE location IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_events_located_start_date")
+    op.execute("DROP INDEX IF EXISTS idx_events_location")
@@ -1,6 +1,6 @@
 """Admin CRUD router for managing database entities."""
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 import json
 
@@ -9,12 +9,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, text
 from sqlalchemy.orm import selectinload
 
-from ..database import get_db
+from ..database import get_db, run_after_commit
+from ..cache import cache_tag, invalidate_tags
 from ..auth.models import User, Permission
 from ..auth.dependencies import require_permission
 from ..people.models import Person, Book, BookAuthor
 from ..events.models import Event, Conflict
 from ..geography.models import Country
+from ..core.suggestions import SUGGESTION_SOURCES, get_suggestion_index
+from ..people.graph import get_person_graph
+from ..geography.epochs import get_border_epochs
 from .schemas import (
     BookCreate, BookUpdate,
     PersonCreate, PersonUpdate,
@@ -28,6 +32,16 @@ router = APIRouter()
 
 # ============== Audit Logging ==============
 
+def notify_data_change(table_name: str, record_id: UUID, action: str):
+    """Tell this worker's in-memory indexes that a record changed."""
+    if table_name in SUGGESTION_SOURCES:
+        get_suggestion_index().mark_stale()
+    if table_name == "people" and action == "DELETE":
+        get_person_graph().remove_person(record_id)
+    if table_name in ("countries", "country_borders"):
+        get_border_epochs().mark_stale()
+
+
 async def log_audit(
     db: AsyncSession,
     table_name: str,
@@ -36,8 +50,19 @@ async def log_audit(
     user_id: UUID,
     old_data: dict = None,
     new_data: dict = None,
+    cache_tags: Iterable[str] = (),
 ):
-    """Log an audit entry for data changes."""
+    """Log an audit entry for data changes.
+
+    Once the change commits, in-memory indexes are told about it and
+    cached values tagged with the table, the record or any of cache_tags
+    are invalidated. Invalidating earlier would let a concurrent reader
+    cache the old rows again under fresh tags.
+    """
+    tags = [table_name, cache_tag(table_name, record_id), *cache_tags]
+    run_after_commit(db, lambda: notify_data_change(table_name, record_id, action))
+    run_after_commit(db, lambda: invalidate_tags(*tags))
+
     try:
         await db.execute(
             text("""
@@ -57,6 +82,11 @@ async def log_audit(
         pass  # Don't fail if audit logging fails
 
 
+def event_year_tags(*dates) -> List[str]:
+    """Cache tags for the event years touched by a change."""
+    return [cache_tag("events", "year", d.year) for d in dates if d]
+
+
 # ============== Books CRUD ==============
 
 @router.get("/books")
@@ -477,7 +507,11 @@ async def create_event(
 
     await db.refresh(event)
 
-    await log_audit(db, "events", event.id, "CREATE", current_user.id, new_data={"title": event.title})
+    await log_audit(
+        db, "events", event.id, "CREATE", current_user.id,
+        new_data={"title": event.title},
+        cache_tags=event_year_tags(event.start_date),
+    )
 
     return {"id": str(event.id), "title": event.title, "message": "Event created successfully"}
 
@@ -497,6 +531,7 @@ async def update_event(
         raise HTTPException(status_code=404, detail="Event not found")
 
     old_data = {"title": event.title}
+    old_start_date = event.start_date
 
     update_data = event_data.model_dump(exclude_unset=True, exclude={"latitude", "longitude"})
     for field, value in update_data.items():
@@ -512,7 +547,11 @@ async def update_event(
     event.updated_at = datetime.utcnow()
     await db.flush()
 
-    await log_audit(db, "events", event.id, "UPDATE", current_user.id, old_data=old_data, new_data={"title": event.title})
+    await log_audit(
+        db, "events", event.id, "UPDATE", current_user.id,
+        old_data=old_data, new_data={"title": event.title},
+        cache_tags=event_year_tags(old_start_date, event.start_date),
+    )
 
     return {"id": str(event.id), "message": "Event updated successfully"}
 
@@ -530,7 +569,11 @@ async def delete_event(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    await log_audit(db, "events", event.id, "DELETE", current_user.id, old_data={"title": event.title})
+    await log_audit(
+        db, "events", event.id, "DELETE", current_user.id,
+        old_data={"title": event.title},
+        cache_tags=event_year_tags(event.start_date),
+    )
 
     await db.delete(event)
     await db.flush()
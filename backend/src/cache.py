@@ -1,13 +1,42 @@
-"""Redis caching layer for performance optimization."""
+"""Redis caching layer for performance optimization.
+
+Values are stored in Redis in the binary format of core.cache_codec: a
+header naming the serializer and compressor, then the serialized payload,
+compressed above a size threshold. Plain JSON values from older releases
+still read back. Each worker also keeps an in-process LRU (LocalCache) of
+decoded values in front of Redis, so hot keys skip the round trip and the
+decode. Writes and deletes are published on a Redis channel and other
+workers drop their local copies; the local tier is only used while this
+worker is subscribed (see start_cache_invalidation).
+
+cache_fetch (and the @cached decorator) add stampede protection: one
+computation per key at a time, stale values served during a refresh, and
+jittered expiry.
+
+Keys can be registered under tags (a Redis set per tag, e.g. "events" or
+"events:year:1917") when they are written; invalidate_tags deletes every
+key under the given tags without scanning the keyspace.
+"""
+import asyncio
 import json
 import hashlib
-from typing import Optional, Any, Callable, TypeVar, Union
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Tuple, TypeVar, Union
 from functools import wraps
 from datetime import timedelta
 import redis.asyncio as redis
 from fastapi import Request
 
 from .config import get_settings
+from .core.cache_codec import decode_with_size, encode
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -23,7 +52,8 @@ async def get_redis() -> redis.Redis:
     if _redis_client is None:
         _redis_pool = redis.ConnectionPool.from_url(
             settings.redis_url,
-            decode_responses=True,
+            # Cache values are binary (see core.cache_codec)
+            decode_responses=False,
             max_connections=50,
         )
         _redis_client = redis.Redis(connection_pool=_redis_pool)
@@ -79,6 +109,233 @@ class CacheTTL:
     TOKEN = 60 * 60 * 24 * 7  # 7 days for token blacklist
 
 
+# Longest time a worker keeps a value locally, per key prefix. Entries are
+# also dropped on invalidation messages and when the Redis copy expires.
+LOCAL_TTLS: Dict[str, int] = {
+    CachePrefix.COUNTRIES: CacheTTL.COUNTRIES,
+    CachePrefix.COUNTRY: CacheTTL.COUNTRIES,
+    CachePrefix.BORDERS: CacheTTL.GEOJSON,
+    CachePrefix.GEOJSON: CacheTTL.GEOJSON,
+    CachePrefix.ECONOMIC: CacheTTL.ECONOMIC,
+    CachePrefix.STATS: CacheTTL.STATS,
+    CachePrefix.SEARCH: CacheTTL.SEARCH,
+}
+DEFAULT_LOCAL_TTL = CacheTTL.MEDIUM
+# Prefixes always read from Redis
+LOCAL_EXCLUDED_PREFIXES = (CachePrefix.TOKEN_BLACKLIST,)
+
+# Serialized bytes kept in each worker's local cache
+LOCAL_MAX_BYTES = 128 * 1024 * 1024
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+# Tag sets are stored under "tag:<tag>"
+TAG_PREFIX = "tag"
+
+_MISSING = object()
+
+
+def local_ttl(key: str, ttl: float) -> float:
+    """Local lifetime for a key: its prefix TTL, capped at the Redis TTL."""
+    prefix = key.split(":", 1)[0]
+    return min(ttl, LOCAL_TTLS.get(prefix, DEFAULT_LOCAL_TTL))
+
+
+@dataclass
+class LocalEntry:
+    value: Any
+    size: int
+    expires_at: float
+    # When the Redis copy expires; None if it has no TTL
+    remote_expires_at: Optional[float]
+
+
+class LocalCache:
+    """Per-worker LRU of decoded cache values with a byte budget.
+
+    Values are the JSON-decoded copies Redis would return, shared between
+    callers, so they must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int = LOCAL_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self._entries: "OrderedDict[str, LocalEntry]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def accepts(self, key: str) -> bool:
+        return self.enabled and not key.startswith(LOCAL_EXCLUDED_PREFIXES)
+
+    def lookup(self, key: str) -> Optional[LocalEntry]:
+        """Return the live entry for a key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or _MISSING."""
+        entry = self.lookup(key)
+        return _MISSING if entry is None else entry.value
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        ttl: float,
+        remote_ttl: Union[float, None, object] = _MISSING,
+    ) -> None:
+        """Store a value for `ttl` seconds.
+
+        `remote_ttl` is the Redis copy's remaining lifetime (None for no
+        expiry); it defaults to `ttl`.
+        """
+        self.discard(key)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.monotonic()
+        if remote_ttl is _MISSING:
+            remote_ttl = ttl
+        remote_expires_at = None if remote_ttl is None else now + remote_ttl
+        self._entries[key] = LocalEntry(value, size, now + ttl, remote_expires_at)
+        self._size += size
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def discard_pattern(self, pattern: str) -> None:
+        """Drop keys matching a Redis glob-style pattern."""
+        for key in [k for k in self._entries if fnmatchcase(k, pattern)]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Local cache for this worker
+_local_cache = LocalCache()
+# Identifies this worker's own invalidation messages
+_worker_id = uuid.uuid4().hex
+_invalidation_task: Optional[asyncio.Task] = None
+
+
+def get_local_cache() -> LocalCache:
+    """Get this worker's local cache."""
+    return _local_cache
+
+
+def _invalidation_message(keys: List[str] = (), patterns: List[str] = ()) -> str:
+    return json.dumps({"origin": _worker_id, "keys": list(keys), "patterns": list(patterns)})
+
+
+def apply_invalidation(message: str) -> None:
+    """Drop local entries named in another worker's invalidation message."""
+    try:
+        data = json.loads(message)
+    except (TypeError, ValueError):
+        return
+    if data.get("origin") == _worker_id:
+        return
+    for key in data.get("keys", []):
+        _local_cache.discard(key)
+    for pattern in data.get("patterns", []):
+        _local_cache.discard_pattern(pattern)
+
+
+async def _listen_for_invalidations() -> None:
+    """Keep the local cache enabled only while subscribed.
+
+    Messages sent while disconnected are lost, so the local cache is
+    cleared whenever the subscription is (re)established or dropped.
+    """
+    backoff = 1
+    while True:
+        pubsub = None
+        try:
+            client = await get_redis()
+            pubsub = client.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            _local_cache.clear()
+            _local_cache.enabled = True
+            backoff = 1
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation subscription lost: {e}")
+        finally:
+            _local_cache.enabled = False
+            _local_cache.clear()
+            if pubsub is not None:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+
+
+def start_cache_invalidation() -> None:
+    """Subscribe to invalidations in the background, enabling the local cache."""
+    global _invalidation_task
+    if _invalidation_task is None or _invalidation_task.done():
+        _invalidation_task = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_cache_invalidation() -> None:
+    """Unsubscribe and disable the local cache."""
+    global _invalidation_task
+    if _invalidation_task is not None:
+        _invalidation_task.cancel()
+        try:
+            await _invalidation_task
+        except asyncio.CancelledError:
+            pass
+        _invalidation_task = None
+
+
+def cache_tag(*parts: Any) -> str:
+    """Build a tag name, e.g. cache_tag("events", "year", 1917) -> "events:year:1917".
+
+    A table name on its own ("events") tags values that depend on the
+    whole table; narrower tags name one entity or slice of it. A change
+    invalidates the table tag plus the slices it touches, so values tagged
+    only with a slice survive changes elsewhere in the table.
+    """
+    return ":".join(str(part) for part in parts)
+
+
 def make_cache_key(*args, prefix: str = "", **kwargs) -> str:
     """Generate a consistent cache key from arguments.
 
@@ -112,49 +369,248 @@ def make_cache_key(*args, prefix: str = "", **kwargs) -> str:
     return key_string
 
 
+async def _read(key: str) -> Tuple[Any, Optional[float]]:
+    """Return (value, seconds until the Redis copy expires).
+
+    The value is _MISSING on a miss; the lifetime is None for keys
+    without a TTL.
+    """
+    use_local = _local_cache.accepts(key)
+    if use_local:
+        entry = _local_cache.lookup(key)
+        if entry is not None:
+            if entry.remote_expires_at is None:
+                return entry.value, None
+            return entry.value, entry.remote_expires_at - time.monotonic()
+
+    try:
+        client = await get_redis()
+        # Fetch the remaining TTL in the same round trip
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            raw, pttl = await pipe.execute()
+        if not raw:
+            return _MISSING, None
+        value, size = decode_with_size(raw)
+    except Exception:
+        # Cache failures should not break the application
+        return _MISSING, None
+
+    remaining = pttl / 1000 if pttl and pttl > 0 else None
+    if use_local:
+        ttl = local_ttl(key, remaining or DEFAULT_LOCAL_TTL)
+        _local_cache.put(key, value, size, ttl, remaining)
+    return value, remaining
+
+
 async def cache_get(key: str) -> Optional[Any]:
     """Get value from cache.
 
+    Checks this worker's local cache before Redis.
+
     Args:
         key: Cache key
 
     Returns:
-        Cached value (deserialized from JSON) or None
+        Cached value (decoded) or None
     """
-    try:
-        client = await get_redis()
-        value = await client.get(key)
-        if value:
-            return json.loads(value)
-        return None
-    except Exception:
-        # Cache failures should not break the application
-        return None
+    value, _ = await _read(key)
+    return None if value is _MISSING else value
 
 
 async def cache_set(
     key: str,
     value: Any,
     ttl: int = CacheTTL.MEDIUM,
+    tags: Iterable[str] = (),
 ) -> bool:
     """Set value in cache.
 
+    Other workers are told to drop their local copies of the key.
+
     Args:
         key: Cache key
-        value: Value to cache (will be JSON serialized)
+        value: Value to cache (JSON-compatible; see core.cache_codec)
         ttl: Time-to-live in seconds
+        tags: Tags to register the key under (see invalidate_tags)
 
     Returns:
         True if successful
     """
     try:
         client = await get_redis()
-        serialized = json.dumps(value, default=str)
-        await client.setex(key, ttl, serialized)
-        return True
+        encoded = encode(value)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, encoded)
+            for tag in tags:
+                tag_key = f"{TAG_PREFIX}:{tag}"
+                pipe.sadd(tag_key, key)
+                # Tag sets live as long as their longest-lived key
+                pipe.expire(tag_key, ttl, nx=True)
+                pipe.expire(tag_key, ttl, gt=True)
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+            await pipe.execute()
     except Exception:
+        _local_cache.discard(key)
         return False
 
+    if _local_cache.accepts(key):
+        # Keep the decoded copy a Redis hit would return, not the caller's object
+        decoded, size = decode_with_size(encoded)
+        _local_cache.put(key, decoded, size, local_ttl(key, ttl))
+    return True
+
+
+# Fraction of a TTL randomly taken off each expiry, so keys written
+# together do not all expire together
+TTL_JITTER = 0.1
+# Default stale window, as a fraction of the TTL
+STALE_FRACTION = 0.25
+# Longest a refresh may hold a key's lock
+LOCK_TTL = 30
+# How long a miss waits for another worker's computation
+LOCK_WAIT = 5.0
+LOCK_POLL_INTERVAL = 0.1
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Computations in progress in this worker, by key
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def jittered(ttl: int) -> int:
+    """Shorten a TTL by a random amount up to TTL_JITTER of it."""
+    return max(1, int(ttl * (1 - random.uniform(0, TTL_JITTER))))
+
+
+async def _acquire_lock(key: str) -> Optional[str]:
+    """Take the cross-worker lock for computing a key.
+
+    Returns a token to release it with, "" if Redis is unavailable (compute
+    without a lock) or None if another worker holds it.
+    """
+    token = uuid.uuid4().hex
+    try:
+        client = await get_redis()
+        acquired = await client.set(f"lock:{key}", token, nx=True, px=LOCK_TTL * 1000)
+    except Exception:
+        return ""
+    return token if acquired else None
+
+
+async def _release_lock(key: str, token: str) -> None:
+    if not token:
+        return
+    try:
+        client = await get_redis()
+        await client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+    except Exception:
+        pass
+
+
+async def _wait_for_value(key: str) -> Any:
+    """Poll for a value another worker is computing; _MISSING on timeout."""
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        value, _ = await _read(key)
+        if value is not _MISSING:
+            return value
+    return _MISSING
+
+
+async def _compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    token: Optional[str],
+    tags: Iterable[str],
+) -> Any:
+    """Compute and store a key once per worker, sharing the result."""
+    future = _inflight.get(key)
+    if future is not None:
+        # Another caller in this worker is computing it; give up the lock
+        # so other workers are not kept from refreshing until LOCK_TTL
+        if token:
+            await _release_lock(key, token)
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    # Mark exceptions retrieved when nobody else was waiting
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = future
+    try:
+        if token is None:
+            token = await _acquire_lock(key)
+            if token is None:
+                value = await _wait_for_value(key)
+                if value is not _MISSING:
+                    future.set_result(value)
+                    return value
+        try:
+            result = await compute()
+            await cache_set(key, result, jittered(ttl) + stale_ttl, tags)
+        finally:
+            await _release_lock(key, token)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+async def cache_fetch(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int = CacheTTL.MEDIUM,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+) -> Any:
+    """Return the cached value for a key, computing it on a miss.
+
+    Values are fresh for about `ttl` seconds (jittered) and then stale for
+    `stale_ttl` more (default STALE_FRACTION of the TTL). A stale value is
+    still returned, while the one caller that takes the key's Redis lock
+    recomputes it. The refresh runs inline, since `compute` usually uses a
+    request-scoped session. On a miss, concurrent callers in a worker share
+    one computation and other workers wait up to LOCK_WAIT for it.
+
+    Args:
+        key: Cache key
+        compute: Coroutine function producing a JSON-serializable value
+        ttl: Fresh lifetime in seconds
+        stale_ttl: Seconds a stale value may be served while refreshing
+        tags: Tags to register the key under when it is stored
+
+    Returns:
+        The cached or newly computed value
+    """
+    if stale_ttl is None:
+        stale_ttl = int(ttl * STALE_FRACTION)
+
+    value, remaining = await _read(key)
+    if value is not _MISSING:
+        if remaining is None or remaining > stale_ttl or key in _inflight:
+            return value
+        token = await _acquire_lock(key)
+        if token is None:
+            return value
+        return await _compute(key, compute, ttl, stale_ttl, token, tags)
+
+    return await _compute(key, compute, ttl, stale_ttl, None, tags)
+
 
 async def cache_delete(key: str) -> bool:
     """Delete a key from cache.
@@ -165,9 +621,13 @@ async def cache_delete(key: str) -> bool:
     Returns:
         True if key was deleted
     """
+    _local_cache.discard(key)
     try:
         client = await get_redis()
-        result = await client.delete(key)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(keys=[key]))
+            result, _ = await pipe.execute()
         return result > 0
     except Exception:
         return False
@@ -176,14 +636,18 @@ async def cache_delete(key: str) -> bool:
 async def cache_delete_pattern(pattern: str) -> int:
     """Delete all keys matching a pattern.
 
+    Scans the whole keyspace; prefer invalidate_tags for data changes.
+
     Args:
         pattern: Glob-style pattern (e.g., "countries:*")
 
     Returns:
         Number of keys deleted
     """
+    _local_cache.discard_pattern(pattern)
     try:
         client = await get_redis()
+        await client.publish(INVALIDATION_CHANNEL, _invalidation_message(patterns=[pattern]))
         keys = []
         async for key in client.scan_iter(match=pattern, count=100):
             keys.append(key)
@@ -195,6 +659,48 @@ async def cache_delete_pattern(pattern: str) -> int:
         return 0
 
 
+async def invalidate_tags(*tags: str) -> int:
+    """Delete every key registered under any of the tags.
+
+    The tag sets are read and removed in one transaction, so keys tagged
+    afterwards are kept for the next invalidation.
+
+    Args:
+        *tags: Tags as passed to cache_set
+
+    Returns:
+        Number of keys deleted
+    """
+    tag_keys = [f"{TAG_PREFIX}:{tag}" for tag in dict.fromkeys(tags)]
+    if not tag_keys:
+        return 0
+    try:
+        client = await get_redis()
+        async with client.pipeline(transaction=True) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            pipe.delete(*tag_keys)
+            *members, _ = await pipe.execute()
+
+        keys = sorted({
+            key.decode() if isinstance(key, bytes) else key
+            for tagged in members
+            for key in tagged
+        })
+        for key in keys:
+            _local_cache.discard(key)
+        if not keys:
+            return 0
+
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(keys=keys))
+            deleted, _ = await pipe.execute()
+        return deleted
+    except Exception:
+        return 0
+
+
 async def invalidate_entity_cache(entity_type: str, entity_id: Optional[str] = None):
     """Invalidate cache for an entity type.
 
@@ -203,15 +709,14 @@ async def invalidate_entity_cache(entity_type: str, entity_id: Optional[str] = N
         entity_id: Optional specific entity ID
     """
     if entity_id:
-        # Delete specific entity and related patterns
-        await cache_delete(f"{entity_type}:{entity_id}")
-        await cache_delete_pattern(f"{entity_type}:{entity_id}:*")
+        # Values tagged with this entity only
+        tag = cache_tag(entity_type, entity_id)
     else:
-        # Delete all cache for this entity type
-        await cache_delete_pattern(f"{entity_type}:*")
+        # Everything depending on this entity type
+        tag = entity_type
 
     # Also invalidate stats cache since counts may have changed
-    await cache_delete_pattern(f"{CachePrefix.STATS}:*")
+    await invalidate_tags(tag, CachePrefix.STATS)
 
 
 # Token blacklist functions (for logout/token revocation)
@@ -251,16 +756,23 @@ def cached(
     prefix: str,
     ttl: int = CacheTTL.MEDIUM,
     key_builder: Optional[Callable[..., str]] = None,
+    stale_ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
 ):
     """Decorator to cache function results.
 
+    Results are fetched through cache_fetch, so concurrent misses share
+    one call and expired results are refreshed by a single caller.
+
     Args:
         prefix: Cache key prefix
         ttl: Time-to-live in seconds
         key_builder: Optional custom function to build cache key
+        stale_ttl: Seconds a stale result may be served while refreshing
+        tags: Tags to register results under (see invalidate_tags)
 
     Example:
-        @cached(prefix="countries", ttl=CacheTTL.LONG)
+        @cached(prefix="countries", ttl=CacheTTL.LONG, tags=["countries"])
         async def get_countries(year: int):
             ...
     """
@@ -278,18 +790,7 @@ def cached(
                 }
                 cache_key = make_cache_key(prefix=prefix, **cacheable_kwargs)
 
-            # Try to get from cache
-            cached_result = await cache_get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # Call function and cache result
-            result = await func(*args, **kwargs)
-
-            # Cache the result
-            await cache_set(cache_key, result, ttl)
-
-            return result
+            return await cache_fetch(cache_key, lambda: func(*args, **kwargs), ttl, stale_ttl, tags)
 
         return wrapper
     return decorator
@@ -312,9 +813,11 @@ async def get_cache_stats() -> dict:
             "misses": info.get("keyspace_misses", 0),
             "used_memory": memory.get("used_memory_human", "unknown"),
             "connected": True,
+            "local": _local_cache.stats(),
         }
     except Exception as e:
         return {
             "connected": False,
             "error": str(e),
+            "local": _local_cache.stats(),
         }
@@ -25,6 +25,9 @@ class Settings(BaseSettings):
     api_v1_prefix: str = "/api/v1"
     project_name: str = "Leftist Monitor"
 
+    # Replay popular pages and hot years into the caches on startup
+    cache_warmup: bool = True
+
     class Config:
         env_file = ".env"
         case_sensitive = False
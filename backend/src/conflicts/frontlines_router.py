@@ -3,14 +3,14 @@ from typing import Optional, List
 from uuid import UUID
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func, and_, or_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from geoalchemy2.functions import ST_AsGeoJSON
 from pydantic import BaseModel
 
+from ..core.geojson_stream import feature_collection_response
 from ..database import get_db
-import json
 
 router = APIRouter()
 
@@ -119,10 +119,12 @@ async def get_frontline_geojson(
             FROM conflict_frontlines f
             WHERE f.conflict_id = :conflict_id AND f.date = :target_date
         """)
-        result = await db.execute(query, {
-            "conflict_id": str(conflict_id),
-            "target_date": target_date
-        })
+        try:
+            params = {
+                "conflict_id": str(conflict_id), "target_date": date.fromisoformat(target_date)
+            }
+        except ValueError:
+            raise HTTPException(status_code=400, detail="target_date must be YYYY-MM-DD")
     else:
         # Get all frontlines for this conflict
         query = text("""
@@ -133,33 +135,23 @@ async def get_frontline_geojson(
             WHERE f.conflict_id = :conflict_id
             ORDER BY f.date
         """)
-        result = await db.execute(query, {"conflict_id": str(conflict_id)})
-    
-    rows = result.all()
-    
-    features = []
-    for row in rows:
-        feature = {
-            "type": "Feature",
-            "properties": {
-                "id": str(row.id),
-                "conflict_id": str(row.conflict_id),
-                "conflict_name": conflict_name,
-                "date": row.date.isoformat(),
-                "controlled_by": row.controlled_by,
-                "geometry_type": row.geometry_type,
-                "color": row.color,
-                "notes": row.notes,
-                "source": row.source,
-            },
-            "geometry": json.loads(row.geometry) if row.geometry else None,
+        params = {"conflict_id": str(conflict_id)}
+
+    def properties(row) -> dict:
+        return {
+            "id": str(row.id),
+            "conflict_id": str(row.conflict_id),
+            "conflict_name": conflict_name,
+            "date": row.date.isoformat(),
+            "controlled_by": row.controlled_by,
+            "geometry_type": row.geometry_type,
+            "color": row.color,
+            "notes": row.notes,
+            "source": row.source,
         }
-        features.append(feature)
-    
-    return {
-        "type": "FeatureCollection",
-        "features": features,
-    }
+
+    # Geometry text is streamed as-is (see core/geojson_stream.py)
+    return feature_collection_response(query, properties, params, max_age=None)
 
 
 @router.get("/{conflict_id}/timeline")
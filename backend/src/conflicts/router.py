@@ -43,6 +43,7 @@ class ConflictMapItem(BaseModel):
 def _build_conflict_response(conflict, country_names: dict) -> ConflictMapItem:
     """Build a ConflictMapItem from a Conflict with pre-loaded participants."""
     from ..geography.cities import WORLD_CITIES
+    from ..geography.gazetteer import get_gazetteer
 
     countries = []
     country_list = []
@@ -57,16 +58,7 @@ def _build_conflict_response(conflict, country_names: dict) -> ConflictMapItem:
             country_list.append(country_name)
 
     # Get coordinates from participating countries' cities
-    lat = None
-    lng = None
-    coords = []
-    for city in WORLD_CITIES:
-        if city["country"] in country_list:
-            coords.append((city["lat"], city["lng"]))
-
-    if coords:
-        lat = sum(c[0] for c in coords) / len(coords)
-        lng = sum(c[1] for c in coords) / len(coords)
+    lat, lng = get_gazetteer().centroid(country_list)
 
     # Fallback: extract location from conflict name when no participant data
     if lat is None and conflict.name:
@@ -389,7 +381,7 @@ async def get_conflict_coordinates(
     Returns all cities involved in the conflict with their coordinates.
     """
     from ..events.models import Conflict
-    from ..geography.cities import WORLD_CITIES
+    from ..geography.gazetteer import get_gazetteer
 
     result = await db.execute(
         select(Conflict)
@@ -414,8 +406,9 @@ async def get_conflict_coordinates(
     country_list = [country_names.get(cid) for cid in all_country_ids]
     country_list = [c for c in country_list if c]
 
-    for city in WORLD_CITIES:
-        if city["country"] in country_list:
+    gazetteer = get_gazetteer()
+    for country in set(country_list):
+        for city in gazetteer.cities_in(country):
             cities.append({
                 "name": city["name"],
                 "country": city["country"],
@@ -426,11 +419,7 @@ async def get_conflict_coordinates(
             })
 
     # Compute average coordinate
-    lat = None
-    lng = None
-    if cities:
-        lat = sum(c["lat"] for c in cities) / len(cities)
-        lng = sum(c["lng"] for c in cities) / len(cities)
+    lat, lng = gazetteer.centroid(country_list)
 
     return {
         "conflict_id": str(conflict.id),
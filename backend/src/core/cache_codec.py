@@ -0,0 +1,174 @@
+"""Binary encoding of cached values.
+
+Values written by the cache start with a format byte and a codec byte,
+followed by the serialized and (above a size threshold) compressed
+payload:
+
+    FORMAT_VERSION | serializer << 4 | compressor | payload
+
+Values without the header are JSON text written before this format
+existed, and still decode. FORMAT_VERSION is never a valid first byte of
+UTF-8 JSON, so the two cannot be confused; bump it when the layout
+changes, and readers will treat newer values as misses.
+
+Serializers and compressors are registered by id. JSON (through orjson
+when installed) is the default serializer, so a value reads back the same
+as it did from plain JSON. zstd is used for compression when the
+zstandard package is installed, otherwise zlib.
+"""
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+FORMAT_VERSION = 0xC1
+
+# Payloads smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 4096
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+JSON = 1
+MSGPACK = 2
+
+NONE = 0
+ZLIB = 1
+ZSTD = 2
+
+
+@dataclass(frozen=True)
+class Serializer:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+SERIALIZERS: Dict[int, Serializer] = {}
+COMPRESSORS: Dict[int, Compressor] = {}
+
+
+def register_serializer(codec_id: int, serializer: Serializer) -> None:
+    if not 0 < codec_id < 16:
+        raise ValueError("Serializer ids are 1-15")
+    SERIALIZERS[codec_id] = serializer
+
+
+def register_compressor(codec_id: int, compressor: Compressor) -> None:
+    if not 0 <= codec_id < 16:
+        raise ValueError("Compressor ids are 0-15")
+    COMPRESSORS[codec_id] = compressor
+
+
+def _json_dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        try:
+            # Datetimes go through default=str, as with the json module
+            return orjson.dumps(
+                value,
+                default=str,
+                option=(
+                    orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_SERIALIZE_NUMPY
+                ),
+            )
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            pass
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+register_serializer(JSON, Serializer("json", _json_dumps, _json_loads))
+register_compressor(NONE, Compressor("none", bytes, bytes))
+register_compressor(
+    ZLIB, Compressor("zlib", lambda data: zlib.compress(data, ZLIB_LEVEL), zlib.decompress)
+)
+
+if MSGPACK_AVAILABLE:
+    register_serializer(MSGPACK, Serializer(
+        "msgpack",
+        lambda value: msgpack.packb(value, default=str, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+    ))
+
+if ZSTD_AVAILABLE:
+    register_compressor(ZSTD, Compressor(
+        "zstd",
+        lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    ))
+
+DEFAULT_SERIALIZER = JSON
+DEFAULT_COMPRESSOR = ZSTD if ZSTD_AVAILABLE else ZLIB
+
+
+class UnknownCodecError(ValueError):
+    """Raised for values written with a format or codec this worker lacks."""
+
+
+def encode(
+    value: Any,
+    serializer: int = DEFAULT_SERIALIZER,
+    compressor: int = DEFAULT_COMPRESSOR,
+    compress_min_bytes: int = COMPRESS_MIN_BYTES,
+) -> bytes:
+    """Serialize a value, compressing it when that makes it smaller."""
+    payload = SERIALIZERS[serializer].dumps(value)
+    used = NONE
+    if compressor != NONE and len(payload) >= compress_min_bytes:
+        compressed = COMPRESSORS[compressor].compress(payload)
+        if len(compressed) < len(payload):
+            payload, used = compressed, compressor
+    return bytes((FORMAT_VERSION, serializer << 4 | used)) + payload
+
+
+def decode_with_size(data: bytes) -> Tuple[Any, int]:
+    """Decode a value and return it with its uncompressed payload size."""
+    if isinstance(data, str):
+        return json.loads(data), len(data)
+    if not data or data[0] != FORMAT_VERSION:
+        if data and data[0] > 0x7F:
+            raise UnknownCodecError(f"Unknown cache format {data[0]:#x}")
+        return _json_loads(data), len(data)
+    if len(data) < 2:
+        raise UnknownCodecError("Truncated cache value")
+    serializer = SERIALIZERS.get(data[1] >> 4)
+    compressor = COMPRESSORS.get(data[1] & 0x0F)
+    if serializer is None or compressor is None:
+        raise UnknownCodecError(f"Unknown cache codec {data[1]:#x}")
+    payload = compressor.decompress(data[2:])
+    return serializer.loads(payload), len(payload)
+
+
+def decode(data: bytes) -> Any:
+    """Decode a value written by encode, or legacy JSON text."""
+    return decode_with_size(data)[0]
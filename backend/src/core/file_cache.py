@@ -0,0 +1,151 @@
+"""Per-worker cache of data files served as pre-serialized JSON.
+
+Routers that serve static files from `data/scraped` would otherwise re-read
+and re-parse multi-megabyte JSON on every request. FileCache keeps the
+serialized response body (a CachedBody, with its ETag) per (path, loader),
+checks the file's mtime at most every few seconds, and evicts least
+recently used entries once the total size passes a byte budget.
+
+A loader that also reads other files (such as a prebuilt artifact) lists
+them in a `dependencies(path)` attribute, and their mtimes are checked
+along with the file's.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from .http_cache import CachedBody
+
+logger = logging.getLogger(__name__)
+
+# Total serialized bytes kept per worker
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# How long a cached entry is trusted before its file is stat'ed again
+DEFAULT_RECHECK_SECONDS = 5.0
+
+
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _entry_version(path: Path, loader: Callable[[Path], Any]) -> Tuple[Any, ...]:
+    """Return the versions of a file and of the other files its loader reads."""
+    dependencies = getattr(loader, "dependencies", None)
+    paths = [path, *(dependencies(path) if dependencies is not None else ())]
+    return tuple(_file_version(p) for p in paths)
+
+
+@dataclass
+class CachedFile:
+    body: CachedBody
+    version: Tuple[Any, ...]
+    checked_at: float
+
+
+class FileCache:
+    """LRU of serialized file contents keyed by path and loader.
+
+    `loader` turns a path into a JSON-compatible value, or into bytes that
+    are already serialized, and decides what to return for a missing file.
+    It is part of the key, so it must be a module-level function or another
+    object that stays the same between calls.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        recheck_seconds: float = DEFAULT_RECHECK_SECONDS,
+    ):
+        self.max_bytes = max_bytes
+        self.recheck_seconds = recheck_seconds
+        self._entries: "OrderedDict[Hashable, CachedFile]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, path: Path, loader: Callable[[Path], Any]) -> CachedBody:
+        """Return the serialized result of loader(path), loading it if needed."""
+        key = (str(path), loader)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            if now - entry.checked_at < self.recheck_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.body
+            version = _entry_version(path, loader)
+            if version == entry.version:
+                entry.checked_at = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.body
+            self._discard(key)
+        else:
+            version = _entry_version(path, loader)
+
+        self.misses += 1
+        loaded = loader(path)
+        body = CachedBody(loaded) if isinstance(loaded, bytes) else CachedBody.from_data(loaded)
+        # Compress up front so the entry's size stays fixed while cached
+        body.gzipped()
+        if body.size <= self.max_bytes:
+            self._entries[key] = CachedFile(body, version, now)
+            self._size += body.size
+            self._evict()
+        else:
+            logger.warning(f"{path} ({body.size} bytes) exceeds the file cache budget")
+        return body
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Drop cached entries for one file, or everything."""
+        if path is None:
+            self._entries.clear()
+            self._size = 0
+            return
+        for key in [k for k in self._entries if k[0] == str(path)]:
+            self._discard(key)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.body.size
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry.body.size
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global file cache instance
+_file_cache: Optional[FileCache] = None
+
+
+def get_file_cache() -> FileCache:
+    """Get or create the global file cache."""
+    global _file_cache
+    if _file_cache is None:
+        _file_cache = FileCache()
+    return _file_cache
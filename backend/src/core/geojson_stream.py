@@ -0,0 +1,91 @@
+"""Streaming GeoJSON FeatureCollection responses.
+
+Large collections (all borders, frontlines) used to be built as a list of
+feature dicts, each geometry parsed from PostGIS's ST_AsGeoJSON text, and
+then encoded again by FastAPI. Here rows come from a server-side cursor
+and the geometry text is spliced into the output as it is, so memory use
+stays at one batch of rows however large the collection is.
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from ..database import async_session_maker
+from .http_cache import dump_json
+
+# Rows fetched from the cursor per round trip
+YIELD_PER = 500
+# Output is sent in chunks of about this many bytes
+FLUSH_BYTES = 64 * 1024
+
+COLLECTION_START = b'{"type":"FeatureCollection","features":['
+COLLECTION_END = b"]}"
+
+
+def encode_feature(
+    properties: dict, geometry: Optional[str], empty_geometry: bytes = b"null"
+) -> bytes:
+    """Encode one feature around pre-serialized GeoJSON geometry text."""
+    return b"".join([
+        b'{"type":"Feature","properties":',
+        dump_json(properties),
+        b',"geometry":',
+        geometry.encode("utf-8") if geometry else empty_geometry,
+        b"}",
+    ])
+
+
+async def write_feature_collection(
+    rows: AsyncIterable[Any],
+    properties: Callable[[Any], dict],
+    geometry: Callable[[Any], Optional[str]] = lambda row: row.geometry,
+    empty_geometry: bytes = b"null",
+) -> AsyncIterator[bytes]:
+    """Yield a FeatureCollection in chunks of about FLUSH_BYTES."""
+    buffer = bytearray(COLLECTION_START)
+    first = True
+    async for row in rows:
+        if not first:
+            buffer += b","
+        first = False
+        buffer += encode_feature(properties(row), geometry(row), empty_geometry)
+        if len(buffer) >= FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += COLLECTION_END
+    yield bytes(buffer)
+
+
+async def stream_query_rows(statement: Any, params: Optional[dict] = None) -> AsyncIterator[Any]:
+    """Yield result rows through a server-side cursor.
+
+    Uses its own session, because the response body is sent after the
+    endpoint (and its request-scoped session) has returned.
+    """
+    async with async_session_maker() as session:
+        result = await session.stream(
+            statement, params, execution_options={"yield_per": YIELD_PER}
+        )
+        async for row in result:
+            yield row
+
+
+def feature_collection_response(
+    statement: Any,
+    properties: Callable[[Any], dict],
+    params: Optional[dict] = None,
+    max_age: Optional[int] = 86400,
+    empty_geometry: bytes = b"null",
+) -> StreamingResponse:
+    """Stream the rows of a query (with a `geometry` GeoJSON text column).
+
+    `max_age=None` sends no Cache-Control header.
+    """
+    headers = {"Cache-Control": f"public, max-age={max_age}"} if max_age is not None else None
+    return StreamingResponse(
+        write_feature_collection(
+            stream_query_rows(statement, params), properties, empty_geometry=empty_geometry
+        ),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,126 @@
+"""Pre-serialized JSON responses with ETag revalidation.
+
+CachedBody keeps a response body as bytes along with its content hash and
+a gzip copy. Endpoints that serve rarely changing data keep CachedBody
+objects around (see core.file_cache) and answer `If-None-Match` with 304
+before doing any other work.
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+# Bodies smaller than this are sent uncompressed (matches GZipMiddleware)
+GZIP_MIN_SIZE = 1000
+GZIP_LEVEL = 6
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize data compactly, the way cached responses are sent."""
+    return json.dumps(
+        data, separators=(",", ":"), ensure_ascii=False, default=_default
+    ).encode("utf-8")
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def derived_etag(base_etag: str, *parts: Any) -> str:
+    """ETag for a view computed from versioned data and request parameters.
+
+    Lets an endpoint answer a conditional request before computing the
+    view, because the tag depends only on the inputs.
+    """
+    key = "\x1f".join([base_etag, *(str(p) for p in parts)])
+    return content_etag(key.encode("utf-8"))
+
+
+class CachedBody:
+    """A serialized response body with its ETag and gzip copy."""
+
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or content_etag(body)
+        self._gzipped: Optional[bytes] = None
+
+    @classmethod
+    def from_data(cls, data: Any, etag: Optional[str] = None) -> "CachedBody":
+        return cls(dump_json(data), etag)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self._gzipped or b"")
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _cache_headers(etag: str, max_age: int) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def not_modified(etag: str, max_age: int) -> Response:
+    return Response(status_code=304, headers=_cache_headers(etag, max_age))
+
+
+def cached_response(
+    request: Request,
+    cached: CachedBody,
+    max_age: int,
+    media_type: str = "application/json",
+) -> Response:
+    """Send a CachedBody, or 304 if the client already has it."""
+    if etag_matches(request, cached.etag):
+        return not_modified(cached.etag, max_age)
+
+    headers = _cache_headers(cached.etag, max_age)
+    body = cached.body
+    if len(body) >= GZIP_MIN_SIZE and "gzip" in request.headers.get("accept-encoding", ""):
+        # GZipMiddleware leaves responses that already set Content-Encoding alone
+        body = cached.gzipped()
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def json_response(
+    request: Request,
+    data: Any,
+    max_age: int,
+    etag: Optional[str] = None,
+) -> Response:
+    """Serialize data once and send it with an ETag.
+
+    Unlike returning data from the endpoint, this skips FastAPI's
+    jsonable_encoder pass and still answers conditional requests with 304.
+    """
+    return cached_response(request, CachedBody.from_data(data, etag), max_age)
@@ -13,6 +13,10 @@ from ..database import get_db
 
 router = APIRouter()
 
+# Upper bounds for person network expansion
+MAX_NETWORK_NODES = 2000
+NETWORK_TIME_BUDGET_SECONDS = 2.0
+
 
 class NetworkNode(BaseModel):
     id: str
@@ -42,6 +46,7 @@ class NetworkAnalysisResponse(BaseModel):
     nodes: List[NetworkNode]
     edges: List[NetworkEdge]
     metrics: NetworkMetrics
+    truncated: bool = False  # True if node cap or time budget stopped expansion
 
 
 def calculate_degree_centrality(nodes: List[str], edges: List[tuple]) -> Dict[str, int]:
@@ -67,88 +72,92 @@ async def get_person_network(
     depth: int = Query(2, ge=1, le=4, description="Depth of connections to include"),
     include_events: bool = Query(False, description="Include shared events"),
     include_organizations: bool = Query(True, description="Include organizations"),
+    max_nodes: int = Query(
+        500, ge=1, le=MAX_NETWORK_NODES, description="Maximum people to include"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the network of connections around a person."""
-    from ..people.models import Person, PersonConnection, PersonPosition
-    from ..events.models import Event
-    
-    # Verify person exists
-    result = await db.execute(select(Person).where(Person.id == person_id))
-    root_person = result.scalar_one_or_none()
-    if not root_person:
+    """Get the network of connections around a person.
+
+    The walk runs over the in-memory person graph (see people.graph), so
+    the only database query loads the attributes of the people reached.
+    Expansion stops early (and `truncated` is set) once max_nodes people or
+    the time budget is reached. Centrality and communities come from the
+    offline metrics table (see people.graph_metrics) when it has been built.
+    """
+    from ..people.models import Person, PersonGraphMetrics
+    from ..people.graph import get_person_graph
+
+    try:
+        root_id = UUID(person_id)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Person not found")
-    
-    nodes = {}
-    edges = []
-    visited_persons = set()
-    to_visit = [(person_id, 0)]
-    
-    while to_visit:
-        current_id, current_depth = to_visit.pop(0)
-        if current_id in visited_persons or current_depth > depth:
-            continue
-        visited_persons.add(current_id)
-        
-        # Get person details
-        person_result = await db.execute(
-            select(Person).where(Person.id == current_id)
-        )
-        person = person_result.scalar_one_or_none()
+
+    graph = get_person_graph()
+    await graph.ensure_fresh()
+    person_ids, truncated = graph.traverse(
+        root_id, depth, max_nodes, time_budget_seconds=NETWORK_TIME_BUDGET_SECONDS
+    )
+
+    # Only node attributes come from the database, in one query
+    result = await db.execute(select(Person).where(Person.id.in_(person_ids)))
+    people = {person.id: person for person in result.scalars().all()}
+    if root_id not in people:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    metrics_result = await db.execute(
+        select(PersonGraphMetrics).where(PersonGraphMetrics.person_id.in_(people.keys()))
+    )
+    precomputed = {m.person_id: m for m in metrics_result.scalars().all()}
+
+    nodes: Dict[str, NetworkNode] = {}
+    communities: Dict[int, List[str]] = defaultdict(list)
+    for pid in person_ids:
+        person = people.get(pid)
         if not person:
             continue
-        
-        nodes[current_id] = NetworkNode(
-            id=str(person.id),
+        attributes = {
+            "birth_year": person.birth_date.year if person.birth_date else None,
+            "death_year": person.death_date.year if person.death_date else None,
+            "person_types": person.person_types or [],
+            "ideology_tags": person.ideology_tags or [],
+        }
+        stored = precomputed.get(pid)
+        if stored:
+            attributes.update({
+                "pagerank": stored.pagerank,
+                "betweenness": stored.betweenness,
+                "community": stored.community,
+            })
+            communities[stored.community].append(str(pid))
+        nodes[str(pid)] = NetworkNode(
+            id=str(pid),
             name=person.name,
             node_type="person",
-            attributes={
-                "birth_year": person.birth_date.year if person.birth_date else None,
-                "death_year": person.death_date.year if person.death_date else None,
-                "person_types": person.person_types or [],
-                "ideology_tags": person.ideology_tags or [],
-            }
-        )
-        
-        # Get connections
-        connections_result = await db.execute(
-            select(PersonConnection).where(
-                or_(
-                    PersonConnection.person_id == current_id,
-                    PersonConnection.connected_person_id == current_id,
-                )
-            )
+            attributes=attributes,
         )
-        
-        for conn in connections_result.scalars().all():
-            other_id = str(conn.connected_person_id) if str(conn.person_id) == current_id else str(conn.person_id)
-            
-            edges.append((
-                str(conn.person_id),
-                str(conn.connected_person_id),
-                conn.connection_type or "connected",
-            ))
-            
-            if other_id not in visited_persons and current_depth < depth:
-                to_visit.append((other_id, current_depth + 1))
-        
-        # Get positions/organizations
-        if include_organizations:
-            positions_result = await db.execute(
-                select(PersonPosition).where(PersonPosition.person_id == current_id)
-            )
-            for pos in positions_result.scalars().all():
-                if pos.organization:
-                    org_id = f"org_{pos.organization.replace(' ', '_')[:20]}"
-                    if org_id not in nodes:
-                        nodes[org_id] = NetworkNode(
-                            id=org_id,
-                            name=pos.organization,
-                            node_type="organization",
-                            attributes={"position_type": pos.position_type}
-                        )
-                    edges.append((current_id, org_id, "member_of"))
-    
+
+    edges = [
+        (str(from_id), str(to_id), connection_type)
+        for from_id, to_id, connection_type, _ in graph.edges_among(people.keys())
+    ]
+
+    # Positions held by included people, grouped into shared organization nodes
+    if include_organizations:
+        for pid in people:
+            for title, position_type in graph.positions(pid):
+                if not title:
+                    continue
+                org_id = f"org_{title.replace(' ', '_')[:20]}"
+                if org_id not in nodes:
+                    nodes[org_id] = NetworkNode(
+                        id=org_id,
+                        name=title,
+                        node_type="organization",
+                        attributes={"position_type": position_type}
+                    )
+                edges.append((str(pid), org_id, "member_of"))
+
     # Calculate metrics
     node_list = list(nodes.values())
     edge_list = [
@@ -160,17 +169,33 @@ async def get_person_network(
         )
         for e in edges
     ]
-    
+
     degrees = calculate_degree_centrality(list(nodes.keys()), edges)
     density = calculate_network_density(len(nodes), len(edges))
     avg_degree = sum(degrees.values()) / len(degrees) if degrees else 0
-    
-    most_connected = sorted(
-        [{"id": k, "name": nodes[k].name, "degree": v} for k, v in degrees.items()],
-        key=lambda x: x["degree"],
-        reverse=True,
-    )[:10]
-    
+
+    if precomputed:
+        # Rank by whole-graph PageRank rather than degree within this subgraph
+        most_connected = sorted(
+            [
+                {
+                    "id": str(m.person_id),
+                    "name": people[m.person_id].name,
+                    "degree": m.degree,
+                    "pagerank": m.pagerank,
+                }
+                for m in precomputed.values()
+            ],
+            key=lambda x: x["pagerank"],
+            reverse=True,
+        )[:10]
+    else:
+        most_connected = sorted(
+            [{"id": k, "name": nodes[k].name, "degree": v} for k, v in degrees.items()],
+            key=lambda x: x["degree"],
+            reverse=True,
+        )[:10]
+
     return NetworkAnalysisResponse(
         nodes=node_list,
         edges=edge_list,
@@ -180,7 +205,11 @@ async def get_person_network(
             density=round(density, 4),
             average_degree=round(avg_degree, 2),
             most_connected=most_connected,
+            communities=(
+                sorted(communities.values(), key=len, reverse=True) if communities else None
+            ),
         ),
+        truncated=truncated,
     )
 
 
@@ -1,19 +1,37 @@
 """Global search functionality with PostgreSQL full-text search."""
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple, Dict, Any
 import logging
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, or_, func, text, literal_column
+from sqlalchemy import select, or_, func, text, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from ..database import get_db
-from ..cache import cache_get, cache_set, make_cache_key, CachePrefix, CacheTTL
+from ..geography.gazetteer import get_gazetteer
+from ..cache import cache_fetch, make_cache_key, CachePrefix, CacheTTL
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+# Table behind each search result type
+SEARCH_TYPE_TABLES = {
+    "person": "people",
+    "event": "events",
+    "conflict": "conflicts",
+    "book": "books",
+    "country": "countries",
+    "party": "political_parties",
+}
+
+
+def search_tags(types: Optional[str]) -> List[str]:
+    """Cache tags for a comma-separated types filter (all types if empty)."""
+    requested = {t.strip().lower() for t in types.split(",")} if types else SEARCH_TYPE_TABLES
+    return [table for type_, table in SEARCH_TYPE_TABLES.items() if type_ in requested]
+
+
 def sanitize_search_query(query: str) -> str:
     """Sanitize search query for use in LIKE patterns.
 
@@ -58,331 +76,374 @@ class SearchResponse(BaseModel):
     cached: bool = False
 
 
-@router.get("/", response_model=SearchResponse)
-async def global_search(
-    q: str = Query(..., min_length=2, max_length=200, description="Search query"),
-    types: Optional[str] = Query(None, description="Comma-separated types to search: person,event,conflict,book,country"),
-    limit: int = Query(20, ge=1, le=100),
-    use_fulltext: bool = Query(True, description="Use full-text search (faster, relevance ranked)"),
-    db: AsyncSession = Depends(get_db),
-):
-    """Search across all entity types using PostgreSQL full-text search.
-
-    Full-text search provides:
-    - Relevance ranking (weighted by title > description)
-    - Stemming (searching 'running' finds 'run')
-    - Prefix matching (searching 'revo' finds 'revolution')
+# One SELECT per entity type, all projecting the same columns so they can be
+# combined with UNION ALL and ranked, counted and paginated in a single query.
+# Each branch reads the shared tsquery from the `q` CTE built in unified_search.
+UNIFIED_SEARCH_BRANCHES = {
+    "person": """
+        SELECT id::text AS id, 'person' AS type, name AS title,
+               CASE WHEN length(bio_short) > 100 THEN left(bio_short, 100) || '...'
+                    ELSE bio_short END AS subtitle,
+               EXTRACT(YEAR FROM birth_date)::int AS year,
+               NULL::text AS category, primary_country_id AS country_id,
+               NULL::float AS lat, NULL::float AS lng,
+               ts_rank(search_vector, q.tsq) AS score
+        FROM people, q
+        WHERE search_vector @@ q.tsq
+    """,
+    "event": """
+        SELECT id::text AS id, 'event' AS type, title, category AS subtitle,
+               EXTRACT(YEAR FROM start_date)::int AS year,
+               category, primary_country_id AS country_id,
+               ST_Y(location) AS lat, ST_X(location) AS lng,
+               ts_rank(search_vector, q.tsq) AS score
+        FROM events, q
+        WHERE search_vector @@ q.tsq
+    """,
+    "conflict": """
+        SELECT id::text AS id, 'conflict' AS type, name AS title, conflict_type AS subtitle,
+               EXTRACT(YEAR FROM start_date)::int AS year,
+               conflict_type AS category, NULL::uuid AS country_id,
+               NULL::float AS lat, NULL::float AS lng,
+               ts_rank(search_vector, q.tsq) AS score
+        FROM conflicts, q
+        WHERE search_vector @@ q.tsq
+    """,
+    "book": """
+        SELECT id::text AS id, 'book' AS type, title, book_type AS subtitle,
+               publication_year AS year,
+               book_type AS category, NULL::uuid AS country_id,
+               NULL::float AS lat, NULL::float AS lng,
+               ts_rank(search_vector, q.tsq) AS score
+        FROM books, q
+        WHERE search_vector @@ q.tsq
+    """,
+    "country": """
+        SELECT id::text AS id, 'country' AS type, name_en AS title, NULL::text AS subtitle,
+               NULL::int AS year,
+               NULL::text AS category, id AS country_id,
+               NULL::float AS lat, NULL::float AS lng,
+               GREATEST(ts_rank(search_vector, q.tsq), similarity(name_en, :query)) AS score
+        FROM countries, q
+        WHERE search_vector @@ q.tsq OR name_en % :query
+    """,
+    "party": """
+        SELECT id::text AS id, 'party' AS type, name AS title, party_family AS subtitle,
+               EXTRACT(YEAR FROM founded)::int AS year,
+               party_family AS category, country_id,
+               NULL::float AS lat, NULL::float AS lng,
+               ts_rank(search_vector, q.tsq) AS score
+        FROM political_parties, q
+        WHERE search_vector @@ q.tsq
+    """,
+}
+
+
+def build_unified_search_sql(types: Set[str]) -> str:
+    """Combine the per-type search branches into one UNION ALL subquery.
+
+    The result exposes the columns shared by every branch, so callers can
+    wrap it with their own filters, ordering and aggregates.
     """
+    branches = [UNIFIED_SEARCH_BRANCHES[t] for t in sorted(types) if t in UNIFIED_SEARCH_BRANCHES]
+    return "\nUNION ALL\n".join(branches)
+
+
+async def unified_search(
+    db: AsyncSession,
+    q: str,
+    tsquery: str,
+    types: Set[str],
+    limit: int,
+    offset: int = 0,
+    where_sql: str = "",
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Row], int]:
+    """Rank, count and paginate matches across entity types in one round trip.
+
+    Args:
+        db: Database session
+        q: Raw query text (used for trigram matching)
+        tsquery: Prepared tsquery string (see prepare_tsquery)
+        types: Entity types to include (keys of UNIFIED_SEARCH_BRANCHES)
+        limit: Page size
+        offset: Rows to skip across all types
+        where_sql: Optional WHERE clause applied to the combined `hits` rows
+        params: Bind parameters referenced by where_sql
+
+    Returns:
+        The requested page of rows and the total number of matches
+    """
+    if not types:
+        return [], 0
+
+    # The count comes from a one-row subquery the page is LEFT JOINed onto,
+    # so it is returned even when the offset is past the last match
+    query = text(f"""
+        WITH q AS (SELECT to_tsquery('english', :tsquery) AS tsq),
+        matches AS (
+            SELECT hits.*
+            FROM ({build_unified_search_sql(types)}) hits
+            {where_sql}
+        ),
+        page AS (
+            SELECT * FROM matches
+            ORDER BY score DESC, lower(title)
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT page.*, counts.total
+        FROM (SELECT count(*) AS total FROM matches) counts
+        LEFT JOIN page ON true
+        ORDER BY page.score DESC, lower(page.title)
+    """)
+    result = await db.execute(query, {
+        **(params or {}),
+        "tsquery": tsquery,
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+    })
+    rows = result.fetchall()
+    total = rows[0].total if rows else 0
+    return [row for row in rows if row.id is not None], total
+
+
+async def _like_search(
+    db: AsyncSession,
+    q: str,
+    allowed_types: Set[str],
+    limit: int,
+) -> List[SearchResult]:
+    """Per-type LIKE search, used when full-text search is disabled or not applicable."""
     from ..people.models import Person, Book
     from ..events.models import Event, Conflict
     from ..geography.models import Country
 
-    # Check cache first
-    cache_key = make_cache_key(prefix=CachePrefix.SEARCH, q=q, types=types, limit=limit, ft=use_fulltext)
-    cached = await cache_get(cache_key)
-    if cached:
-        return SearchResponse(**cached, cached=True)
-
     results: List[SearchResult] = []
-
-    # Validate and sanitize types parameter
-    valid_types = {"person", "event", "conflict", "book", "country"}
-    if types:
-        requested_types = {t.strip().lower() for t in types.split(",")}
-        allowed_types = requested_types & valid_types
-    else:
-        allowed_types = valid_types
-
-    if use_fulltext:
-        tsquery = prepare_tsquery(q)
-        if not tsquery:
-            # Fall back to LIKE search if query is empty after cleaning
-            use_fulltext = False
+    search_pattern = f"%{sanitize_search_query(q)}%"
 
     # Search people
     if "person" in allowed_types:
         try:
-            if use_fulltext:
-                query = text("""
-                    SELECT id::text, name, bio_short, 
-                           EXTRACT(YEAR FROM birth_date) as year,
-                           ts_rank(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(bio_short, '')), 
-                                   to_tsquery('english', :tsquery)) as score
-                    FROM people
-                    WHERE to_tsvector('english', coalesce(name, '') || ' ' || coalesce(bio_short, '')) 
-                          @@ to_tsquery('english', :tsquery)
-                    ORDER BY score DESC
-                    LIMIT :limit
-                """)
-                result = await db.execute(query, {"tsquery": tsquery, "limit": limit})
-                for row in result.fetchall():
-                    subtitle = row.bio_short[:100] + "..." if row.bio_short and len(row.bio_short) > 100 else row.bio_short
-                    results.append(SearchResult(
-                        id=row.id,
-                        type="person",
-                        title=row.name,
-                        subtitle=subtitle,
-                        year=int(row.year) if row.year else None,
-                        score=float(row.score) if row.score else None,
-                    ))
-            else:
-                # Fallback to LIKE search
-                search_pattern = f"%{sanitize_search_query(q)}%"
-                query = select(Person).where(
-                    or_(
-                        func.lower(Person.name).like(search_pattern),
-                        func.lower(Person.bio_short).like(search_pattern),
-                    )
-                ).limit(limit)
-                result = await db.execute(query)
-                for person in result.scalars().all():
-                    year = person.birth_date.year if person.birth_date else None
-                    results.append(SearchResult(
-                        id=str(person.id),
-                        type="person",
-                        title=person.name,
-                        subtitle=person.bio_short[:100] + "..." if person.bio_short and len(person.bio_short) > 100 else person.bio_short,
-                        year=year,
-                    ))
+            query = select(Person).where(
+                or_(
+                    func.lower(Person.name).like(search_pattern),
+                    func.lower(Person.bio_short).like(search_pattern),
+                )
+            ).limit(limit)
+            result = await db.execute(query)
+            for person in result.scalars().all():
+                year = person.birth_date.year if person.birth_date else None
+                results.append(SearchResult(
+                    id=str(person.id),
+                    type="person",
+                    title=person.name,
+                    subtitle=(
+                        person.bio_short[:100] + "..."
+                        if person.bio_short and len(person.bio_short) > 100
+                        else person.bio_short
+                    ),
+                    year=year,
+                ))
         except Exception as e:
             logger.warning(f"Error searching people: {e}")
 
     # Search events
     if "event" in allowed_types:
         try:
-            if use_fulltext:
-                query = text("""
-                    SELECT id::text, title, category,
-                           EXTRACT(YEAR FROM start_date) as year,
-                           ts_rank(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')),
-                                   to_tsquery('english', :tsquery)) as score
-                    FROM events
-                    WHERE to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
-                          @@ to_tsquery('english', :tsquery)
-                    ORDER BY score DESC
-                    LIMIT :limit
-                """)
-                result = await db.execute(query, {"tsquery": tsquery, "limit": limit})
-                for row in result.fetchall():
-                    results.append(SearchResult(
-                        id=row.id,
-                        type="event",
-                        title=row.title,
-                        subtitle=row.category,
-                        year=int(row.year) if row.year else None,
-                        score=float(row.score) if row.score else None,
-                    ))
-            else:
-                search_pattern = f"%{sanitize_search_query(q)}%"
-                query = select(Event).where(
-                    or_(
-                        func.lower(Event.title).like(search_pattern),
-                        func.lower(Event.description).like(search_pattern),
-                    )
-                ).limit(limit)
-                result = await db.execute(query)
-                for event in result.scalars().all():
-                    year = event.start_date.year if event.start_date else None
-
-                    # Try to extract coordinates from location name
-                    lat = None
-                    lng = None
-                    if event.location_name:
-                        from ..geography.cities import WORLD_CITIES
-                        for city in WORLD_CITIES:
-                            if event.location_name.lower() in city["name"].lower():
-                                lat = city["lat"]
-                                lng = city["lng"]
-                                break
-
-                    results.append(SearchResult(
-                        id=str(event.id),
-                        type="event",
-                        title=event.title,
-                        subtitle=event.category,
-                        year=year,
-                        lat=lat,
-                        lng=lng,
-                    ))
+            query = select(Event).where(
+                or_(
+                    func.lower(Event.title).like(search_pattern),
+                    func.lower(Event.description).like(search_pattern),
+                )
+            ).limit(limit)
+            result = await db.execute(query)
+            for event in result.scalars().all():
+                year = event.start_date.year if event.start_date else None
+
+                # Try to extract coordinates from location name
+                lat = None
+                lng = None
+                if event.location_name:
+                    city = get_gazetteer().geocode(event.location_name)
+                    if city:
+                        lat, lng = city["lat"], city["lng"]
+
+                results.append(SearchResult(
+                    id=str(event.id),
+                    type="event",
+                    title=event.title,
+                    subtitle=event.category,
+                    year=year,
+                    lat=lat,
+                    lng=lng,
+                ))
         except Exception as e:
             logger.warning(f"Error searching events: {e}")
 
     # Search conflicts
     if "conflict" in allowed_types:
         try:
-            if use_fulltext:
-                query = text("""
-                    SELECT id::text, name, conflict_type,
-                           EXTRACT(YEAR FROM start_date) as year,
-                           ts_rank(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')),
-                                   to_tsquery('english', :tsquery)) as score
-                    FROM conflicts
-                    WHERE to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))
-                          @@ to_tsquery('english', :tsquery)
-                    ORDER BY score DESC
-                    LIMIT :limit
-                """)
-                result = await db.execute(query, {"tsquery": tsquery, "limit": limit})
-                for row in result.fetchall():
-                    results.append(SearchResult(
-                        id=row.id,
-                        type="conflict",
-                        title=row.name,
-                        subtitle=row.conflict_type,
-                        year=int(row.year) if row.year else None,
-                        score=float(row.score) if row.score else None,
-                    ))
-            else:
-                search_pattern = f"%{sanitize_search_query(q)}%"
-                query = select(Conflict).where(
-                    or_(
-                        func.lower(Conflict.name).like(search_pattern),
-                        func.lower(Conflict.description).like(search_pattern),
-                    )
-                ).limit(limit)
-                result = await db.execute(query)
-                for conflict in result.scalars().all():
-                    year = conflict.start_date.year if conflict.start_date else None
-
-                    # Try to extract coordinates from conflict name
-                    lat = None
-                    lng = None
-                    if conflict.name:
-                        from ..geography.cities import WORLD_CITIES
-                        for city in WORLD_CITIES:
-                            if city["country"].lower() in conflict.name.lower():
-                                lat = city["lat"]
-                                lng = city["lng"]
-                                break
-
-                    results.append(SearchResult(
-                        id=str(conflict.id),
-                        type="conflict",
-                        title=conflict.name,
-                        subtitle=conflict.conflict_type,
-                        year=year,
-                        lat=lat,
-                        lng=lng,
-                    ))
+            query = select(Conflict).where(
+                or_(
+                    func.lower(Conflict.name).like(search_pattern),
+                    func.lower(Conflict.description).like(search_pattern),
+                )
+            ).limit(limit)
+            result = await db.execute(query)
+            for conflict in result.scalars().all():
+                year = conflict.start_date.year if conflict.start_date else None
+
+                # Try to extract coordinates from conflict name
+                lat = None
+                lng = None
+                if conflict.name:
+                    city = get_gazetteer().mentioned_country(conflict.name)
+                    if city:
+                        lat, lng = city["lat"], city["lng"]
+
+                results.append(SearchResult(
+                    id=str(conflict.id),
+                    type="conflict",
+                    title=conflict.name,
+                    subtitle=conflict.conflict_type,
+                    year=year,
+                    lat=lat,
+                    lng=lng,
+                ))
         except Exception as e:
             logger.warning(f"Error searching conflicts: {e}")
 
     # Search books
     if "book" in allowed_types:
         try:
-            if use_fulltext:
-                query = text("""
-                    SELECT id::text, title, book_type, publication_year,
-                           ts_rank(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')), 
-                                   to_tsquery('english', :tsquery)) as score
-                    FROM books
-                    WHERE to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')) 
-                          @@ to_tsquery('english', :tsquery)
-                    ORDER BY score DESC
-                    LIMIT :limit
-                """)
-                result = await db.execute(query, {"tsquery": tsquery, "limit": limit})
-                for row in result.fetchall():
-                    results.append(SearchResult(
-                        id=row.id,
-                        type="book",
-                        title=row.title,
-                        subtitle=row.book_type,
-                        year=row.publication_year,
-                        score=float(row.score) if row.score else None,
-                    ))
-            else:
-                search_pattern = f"%{sanitize_search_query(q)}%"
-                query = select(Book).where(
-                    or_(
-                        func.lower(Book.title).like(search_pattern),
-                        func.lower(Book.description).like(search_pattern),
-                    )
-                ).limit(limit)
-                result = await db.execute(query)
-                for book in result.scalars().all():
-                    results.append(SearchResult(
-                        id=str(book.id),
-                        type="book",
-                        title=book.title,
-                        subtitle=book.book_type,
-                        year=book.publication_year,
-                    ))
+            query = select(Book).where(
+                or_(
+                    func.lower(Book.title).like(search_pattern),
+                    func.lower(Book.description).like(search_pattern),
+                )
+            ).limit(limit)
+            result = await db.execute(query)
+            for book in result.scalars().all():
+                results.append(SearchResult(
+                    id=str(book.id),
+                    type="book",
+                    title=book.title,
+                    subtitle=book.book_type,
+                    year=book.publication_year,
+                ))
         except Exception as e:
             logger.warning(f"Error searching books: {e}")
 
-    # Search countries (trigram similarity for fuzzy matching)
+    # Search countries
     if "country" in allowed_types:
         try:
-            if use_fulltext:
-                # Use trigram similarity for country names
-                query = text("""
-                    SELECT id::text, name_en,
-                           similarity(name_en, :query) as score
-                    FROM countries
-                    WHERE similarity(name_en, :query) > 0.2
-                       OR name_en ILIKE :pattern
-                    ORDER BY score DESC
-                    LIMIT :limit
-                """)
-                result = await db.execute(query, {
-                    "query": q,
-                    "pattern": f"%{q}%",
-                    "limit": limit
-                })
-                for row in result.fetchall():
-                    results.append(SearchResult(
-                        id=row.id,
-                        type="country",
-                        title=row.name_en,
-                        subtitle=None,
-                        year=None,
-                        score=float(row.score) if row.score else None,
-                    ))
-            else:
-                search_pattern = f"%{sanitize_search_query(q)}%"
-                query = select(Country).where(
-                    func.lower(Country.name_en).like(search_pattern)
-                ).limit(limit)
-                result = await db.execute(query)
-                for country in result.scalars().all():
-                    results.append(SearchResult(
-                        id=str(country.id),
-                        type="country",
-                        title=country.name_en,
-                        subtitle=None,
-                        year=None,
-                    ))
+            query = select(Country).where(
+                func.lower(Country.name_en).like(search_pattern)
+            ).limit(limit)
+            result = await db.execute(query)
+            for country in result.scalars().all():
+                results.append(SearchResult(
+                    id=str(country.id),
+                    type="country",
+                    title=country.name_en,
+                    subtitle=None,
+                    year=None,
+                ))
         except Exception as e:
             logger.warning(f"Error searching countries: {e}")
 
-    # Sort by score (if available) then alphabetically
-    if use_fulltext:
-        results.sort(key=lambda r: (-(r.score or 0), r.title.lower()))
-    else:
-        q_lower = q.lower()
-        def sort_key(r: SearchResult) -> tuple:
-            title_lower = r.title.lower()
-            if title_lower == q_lower:
-                return (0, title_lower)
-            elif title_lower.startswith(q_lower):
-                return (1, title_lower)
-            else:
-                return (2, title_lower)
-        results.sort(key=sort_key)
-
-    results = results[:limit]
-
-    response_data = {
-        "query": q,
-        "total": len(results),
-        "results": [r.model_dump() for r in results],
-    }
+    q_lower = q.lower()
+    def sort_key(r: SearchResult) -> tuple:
+        title_lower = r.title.lower()
+        if title_lower == q_lower:
+            return (0, title_lower)
+        elif title_lower.startswith(q_lower):
+            return (1, title_lower)
+        else:
+            return (2, title_lower)
+    results.sort(key=sort_key)
 
-    # Cache the result
-    await cache_set(cache_key, response_data, CacheTTL.MEDIUM)
+    return results
 
-    return SearchResponse(**response_data, cached=False)
+
+@router.get("/", response_model=SearchResponse)
+async def global_search(
+    q: str = Query(..., min_length=2, max_length=200, description="Search query"),
+    types: Optional[str] = Query(
+        None, description="Comma-separated types to search: person,event,conflict,book,country"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    use_fulltext: bool = Query(True, description="Use full-text search (faster, relevance ranked)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Search across all entity types using PostgreSQL full-text search.
+
+    Full-text search provides:
+    - Relevance ranking (weighted by title > description)
+    - Stemming (searching 'running' finds 'run')
+    - Prefix matching (searching 'revo' finds 'revolution')
+
+    All entity types are ranked and paginated together in a single query,
+    so `total` counts every match and `offset` pages across types.
+    """
+    # Check cache first
+    cache_key = make_cache_key(
+        prefix=CachePrefix.SEARCH, q=q, types=types, limit=limit, offset=offset, ft=use_fulltext
+    )
+    computed = False
+
+    async def compute() -> dict:
+        nonlocal computed
+        computed = True
+
+        # Validate and sanitize types parameter
+        valid_types = {"person", "event", "conflict", "book", "country"}
+        if types:
+            requested_types = {t.strip().lower() for t in types.split(",")}
+            allowed_types = requested_types & valid_types
+        else:
+            allowed_types = valid_types
+
+        tsquery = prepare_tsquery(q) if use_fulltext else ''
+
+        if tsquery:
+            try:
+                rows, total = await unified_search(db, q, tsquery, allowed_types, limit, offset)
+                results = [
+                    SearchResult(
+                        id=row.id,
+                        type=row.type,
+                        title=row.title,
+                        subtitle=row.subtitle,
+                        year=row.year,
+                        score=float(row.score) if row.score else None,
+                        lat=row.lat,
+                        lng=row.lng,
+                    )
+                    for row in rows
+                ]
+            except Exception as e:
+                logger.warning(f"Error running unified search: {e}")
+                results, total = [], 0
+        else:
+            # Fall back to LIKE search if full-text is disabled or the query is
+            # empty after cleaning
+            matches = await _like_search(db, q, allowed_types, offset + limit)
+            results = matches[offset:offset + limit]
+            total = len(matches)
+
+        response_data = {
+            "query": q,
+            "total": total,
+            "results": [r.model_dump() for r in results],
+        }
+
+        return response_data
+
+    response_data = await cache_fetch(cache_key, compute, CacheTTL.MEDIUM, tags=search_tags(types))
+    return SearchResponse(**response_data, cached=not computed)
 
 
 @router.get("/suggest")
@@ -397,45 +458,41 @@ async def search_suggestions(
     """
     # Check cache
     cache_key = make_cache_key(prefix=f"{CachePrefix.SEARCH}:suggest", q=q, limit=limit)
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    suggestions = []
-
-    try:
-        # Get suggestions from people names
-        query = text("""
-            SELECT DISTINCT name, similarity(name, :query) as score
-            FROM people
-            WHERE similarity(name, :query) > 0.2 OR name ILIKE :pattern
-            ORDER BY score DESC
-            LIMIT :limit
-        """)
-        result = await db.execute(query, {"query": q, "pattern": f"{q}%", "limit": limit})
-        for row in result.fetchall():
-            suggestions.append({"text": row.name, "type": "person", "score": float(row.score)})
-
-        # Get suggestions from event titles
-        query = text("""
-            SELECT DISTINCT title, similarity(title, :query) as score
-            FROM events
-            WHERE similarity(title, :query) > 0.2 OR title ILIKE :pattern
-            ORDER BY score DESC
-            LIMIT :limit
-        """)
-        result = await db.execute(query, {"query": q, "pattern": f"{q}%", "limit": limit})
-        for row in result.fetchall():
-            suggestions.append({"text": row.title, "type": "event", "score": float(row.score)})
-
-        # Sort all suggestions by score and limit
-        suggestions.sort(key=lambda x: -x["score"])
-        suggestions = suggestions[:limit]
-
-    except Exception as e:
-        logger.warning(f"Error getting suggestions: {e}")
-
-    # Cache suggestions
-    await cache_set(cache_key, suggestions, CacheTTL.SHORT)
-
-    return suggestions
+    async def compute() -> list:
+        suggestions = []
+
+        try:
+            # Get suggestions from people names
+            query = text("""
+                SELECT DISTINCT name, similarity(name, :query) as score
+                FROM people
+                WHERE similarity(name, :query) > 0.2 OR name ILIKE :pattern
+                ORDER BY score DESC
+                LIMIT :limit
+            """)
+            result = await db.execute(query, {"query": q, "pattern": f"{q}%", "limit": limit})
+            for row in result.fetchall():
+                suggestions.append({"text": row.name, "type": "person", "score": float(row.score)})
+
+            # Get suggestions from event titles
+            query = text("""
+                SELECT DISTINCT title, similarity(title, :query) as score
+                FROM events
+                WHERE similarity(title, :query) > 0.2 OR title ILIKE :pattern
+                ORDER BY score DESC
+                LIMIT :limit
+            """)
+            result = await db.execute(query, {"query": q, "pattern": f"{q}%", "limit": limit})
+            for row in result.fetchall():
+                suggestions.append({"text": row.title, "type": "event", "score": float(row.score)})
+
+            # Sort all suggestions by score and limit
+            suggestions.sort(key=lambda x: -x["score"])
+            suggestions = suggestions[:limit]
+
+        except Exception as e:
+            logger.warning(f"Error getting suggestions: {e}")
+
+        return suggestions
+
+    return await cache_fetch(cache_key, compute, CacheTTL.SHORT, tags=["people", "events"])
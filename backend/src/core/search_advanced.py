@@ -1,16 +1,20 @@
 """Advanced search with facets and autocomplete."""
-from typing import Optional, List, Dict, Any
-from datetime import date
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, or_, func, distinct
-from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-
+from ..cache import CachePrefix, CacheTTL, cache_fetch, make_cache_key
+from ..database import async_session_maker, get_db
+from .search import SEARCH_TYPE_TABLES, build_unified_search_sql, prepare_tsquery, unified_search
+from .suggestions import get_suggestion_index
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 class SearchSuggestion(BaseModel):
@@ -49,99 +53,138 @@ class FacetedSearchResponse(BaseModel):
     facets: SearchFacets
 
 
-def sanitize_search_query(query: str) -> str:
-    """Sanitize search query for LIKE patterns."""
-    sanitized = query.replace('\\', '\\\\')
-    sanitized = sanitized.replace('%', '\\%')
-    sanitized = sanitized.replace('_', '\\_')
-    return sanitized.lower()
-
-
 @router.get("/suggestions", response_model=List[SearchSuggestion])
 async def get_search_suggestions(
     q: str = Query(..., min_length=2, max_length=100),
     limit: int = Query(10, ge=1, le=20),
-    db: AsyncSession = Depends(get_db),
 ):
-    """Get autocomplete suggestions for search query."""
-    from ..people.models import Person
-    from ..events.models import Event, Conflict
-    from ..geography.models import Country
-    from ..politics.models import PoliticalParty
-    
-    sanitized = sanitize_search_query(q)
-    pattern = f"{sanitized}%"  # Prefix match for autocomplete
-    
-    suggestions = []
-    
-    # Search people (prioritize starts-with matches)
-    people_query = (
-        select(Person.id, Person.name)
-        .where(func.lower(Person.name).like(pattern))
-        .order_by(Person.name)
-        .limit(limit // 3)
-    )
-    people_result = await db.execute(people_query)
-    for row in people_result.all():
-        suggestions.append(SearchSuggestion(
-            text=row.name,
-            type="person",
-            id=str(row.id),
+    """Get autocomplete suggestions for search query.
+
+    Served from the in-process prefix index (see core.suggestions), so
+    keystroke traffic never reaches the database once the index is built.
+    """
+    index = get_suggestion_index()
+    try:
+        await index.ensure_fresh()
+    except Exception as e:
+        logger.warning(f"Suggestion index unavailable: {e}")
+        return []
+
+    return [
+        SearchSuggestion(text=label, type=entity_type, id=entity_id)
+        for label, entity_type, entity_id in index.lookup(q, limit)
+    ]
+
+
+# Result types each faceted filter applies to; hits of other types pass
+# through unfiltered
+COUNTRY_FILTER_TYPES = ("person", "event", "party")
+CATEGORY_FILTER_TYPES = ("event",)
+YEAR_FILTER_TYPES = ("event", "conflict")
+
+
+def _for_types(types: Tuple[str, ...], predicate: str) -> str:
+    names = ", ".join(f"'{t}'" for t in types)
+    return f"(hits.type NOT IN ({names}) OR {predicate})"
+
+
+def build_facet_filters(
+    country_filter: Optional[Set[str]],
+    category_filter: Optional[Set[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+) -> Tuple[str, Dict[str, Any]]:
+    """Build a WHERE clause over the unified `hits` columns for faceted filters.
+
+    Each filter only constrains the types listed for it above, so a year
+    filter keeps countries and a country filter keeps conflicts.
+    """
+    clauses = []
+    params: Dict[str, Any] = {}
+    if country_filter:
+        clauses.append(_for_types(
+            COUNTRY_FILTER_TYPES, "hits.country_id::text = ANY(:country_ids)"
         ))
-    
-    # Search countries
-    countries_query = (
-        select(Country.id, Country.name_en)
-        .where(func.lower(Country.name_en).like(pattern))
-        .order_by(Country.name_en)
-        .limit(limit // 3)
+        params["country_ids"] = sorted(country_filter)
+    if category_filter:
+        clauses.append(_for_types(CATEGORY_FILTER_TYPES, "hits.category = ANY(:categories)"))
+        params["categories"] = sorted(category_filter)
+    if start_year:
+        clauses.append(_for_types(YEAR_FILTER_TYPES, "hits.year >= :start_year"))
+        params["start_year"] = start_year
+    if end_year:
+        clauses.append(_for_types(YEAR_FILTER_TYPES, "hits.year <= :end_year"))
+        params["end_year"] = end_year
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where_sql, params
+
+
+async def get_search_facets(
+    q: str,
+    tsquery: str,
+    types: Set[str],
+    where_sql: str,
+    params: Dict[str, Any],
+) -> SearchFacets:
+    """Count facet values over the full match set with one GROUPING SETS query.
+
+    Results are cached by the normalized query, types and filter values, so
+    paging through a result set only aggregates once.
+    """
+    cache_key = make_cache_key(
+        prefix=f"{CachePrefix.SEARCH}:facets",
+        q=" ".join(q.lower().split()),
+        types=",".join(sorted(types)),
+        **{k: ",".join(map(str, v)) if isinstance(v, list) else v for k, v in params.items()},
     )
-    countries_result = await db.execute(countries_query)
-    for row in countries_result.all():
-        suggestions.append(SearchSuggestion(
-            text=row.name_en,
-            type="country",
-            id=str(row.id),
-        ))
-    
-    # Search events
-    events_query = (
-        select(Event.id, Event.title)
-        .where(func.lower(Event.title).like(pattern))
-        .order_by(Event.title)
-        .limit(limit // 3)
-    )
-    events_result = await db.execute(events_query)
-    for row in events_result.all():
-        suggestions.append(SearchSuggestion(
-            text=row.title,
-            type="event",
-            id=str(row.id),
-        ))
-    
-    # Search parties
-    parties_query = (
-        select(PoliticalParty.id, PoliticalParty.name)
-        .where(func.lower(PoliticalParty.name).like(pattern))
-        .order_by(PoliticalParty.name)
-        .limit(limit // 4)
-    )
-    parties_result = await db.execute(parties_query)
-    for row in parties_result.all():
-        suggestions.append(SearchSuggestion(
-            text=row.name,
-            type="party",
-            id=str(row.id),
-        ))
-    
-    # Sort by relevance (exact prefix match first)
-    q_lower = q.lower()
-    suggestions.sort(key=lambda s: (
-        0 if s.text.lower().startswith(q_lower) else 1,
-        s.text.lower()
-    ))
-    
-    return suggestions[:limit]
+    query = text(f"""
+        WITH q AS (SELECT to_tsquery('english', :tsquery) AS tsq)
+        SELECT CASE
+                   WHEN GROUPING(f.type) = 0 THEN 'types'
+                   WHEN GROUPING(f.category) = 0 THEN 'categories'
+                   WHEN GROUPING(f.decade) = 0 THEN 'years'
+                   ELSE 'countries'
+               END AS facet,
+               COALESCE(f.type, f.category, f.decade::text, f.country_name) AS value,
+               count(*) AS count
+        FROM (
+            SELECT hits.type, hits.category, (hits.year / 10) * 10 AS decade,
+                   c.name_en AS country_name
+            FROM ({build_unified_search_sql(types)}) hits
+            LEFT JOIN countries c ON c.id = hits.country_id
+            {where_sql}
+        ) f
+        GROUP BY GROUPING SETS ((f.type), (f.category), (f.decade), (f.country_name))
+        HAVING COALESCE(f.type, f.category, f.decade::text, f.country_name) IS NOT NULL
+    """)
+
+    def by_count(v: FacetValue) -> tuple:
+        return (-v.count, v.value)
+
+    async def compute() -> Dict[str, Any]:
+        buckets: Dict[str, List[FacetValue]] = {
+            "types": [], "categories": [], "countries": [], "years": [],
+        }
+        async with async_session_maker() as session:
+            result = await session.execute(query, {**params, "tsquery": tsquery, "query": q})
+            for row in result.fetchall():
+                buckets[row.facet].append(FacetValue(value=row.value, count=row.count))
+        return SearchFacets(
+            types=sorted(buckets["types"], key=by_count),
+            categories=sorted(buckets["categories"], key=by_count)[:10],
+            countries=sorted(buckets["countries"], key=by_count)[:10],
+            years=sorted(buckets["years"], key=lambda v: int(v.value)),
+        ).model_dump()
+
+    # Facets always join countries for country names
+    tags = [SEARCH_TYPE_TABLES[t] for t in sorted(types) if t in SEARCH_TYPE_TABLES] + ["countries"]
+    try:
+        # A failed query raises, so empty facets are never cached
+        data = await cache_fetch(cache_key, compute, CacheTTL.SEARCH, tags=tags)
+    except Exception as e:
+        logger.warning(f"Error computing search facets: {e}")
+        return SearchFacets(types=[], categories=[], countries=[], years=[])
+    return SearchFacets(**data)
 
 
 @router.get("/faceted", response_model=FacetedSearchResponse)
@@ -156,183 +199,47 @@ async def faceted_search(
     offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
 ):
-    """Search with faceted filtering."""
-    from ..people.models import Person
-    from ..events.models import Event, Conflict
-    from ..geography.models import Country
-    from ..politics.models import PoliticalParty
-    
-    sanitized = sanitize_search_query(q)
-    pattern = f"%{sanitized}%"
-    
-    results = []
-    facet_types = {}
-    facet_categories = {}
-    facet_countries = {}
-    facet_years = {}
-    
-    allowed_types = set(types.split(",")) if types else {"person", "event", "conflict", "country", "party"}
+    """Search with faceted filtering.
+
+    Hits for every requested type are ranked and paginated together in one
+    query. Country filters apply to people, events and parties, category
+    filters to events and year filters to events and conflicts.
+    """
+    valid_types = {"person", "event", "conflict", "country", "party"}
+    allowed_types = set(types.split(",")) & valid_types if types else valid_types
     country_filter = set(countries.split(",")) if countries else None
     category_filter = set(categories.split(",")) if categories else None
-    
-    # Search people
-    if "person" in allowed_types:
-        query = select(Person).where(
-            or_(
-                func.lower(Person.name).like(pattern),
-                func.lower(Person.bio_short).like(pattern),
-            )
-        )
-        if country_filter:
-            query = query.where(Person.primary_country_id.in_(country_filter))
-        
-        result = await db.execute(query.limit(limit))
-        for person in result.scalars().all():
-            year = person.birth_date.year if person.birth_date else None
-            results.append(FacetedSearchResult(
-                id=str(person.id),
-                type="person",
-                title=person.name,
-                subtitle=person.bio_short[:100] if person.bio_short else None,
-                year=year,
-                country=str(person.primary_country_id) if person.primary_country_id else None,
-            ))
-            facet_types["person"] = facet_types.get("person", 0) + 1
-            if year:
-                decade = (year // 10) * 10
-                facet_years[str(decade)] = facet_years.get(str(decade), 0) + 1
-    
-    # Search events
-    if "event" in allowed_types:
-        query = select(Event).where(
-            or_(
-                func.lower(Event.title).like(pattern),
-                func.lower(Event.description).like(pattern),
-            )
-        )
-        if country_filter:
-            query = query.where(Event.primary_country_id.in_(country_filter))
-        if category_filter:
-            query = query.where(Event.category.in_(category_filter))
-        if start_year:
-            query = query.where(Event.start_date >= date(start_year, 1, 1))
-        if end_year:
-            query = query.where(Event.start_date <= date(end_year, 12, 31))
-        
-        result = await db.execute(query.limit(limit))
-        for event in result.scalars().all():
-            year = event.start_date.year if event.start_date else None
-            results.append(FacetedSearchResult(
-                id=str(event.id),
-                type="event",
-                title=event.title,
-                subtitle=event.category,
-                year=year,
-                country=str(event.primary_country_id) if event.primary_country_id else None,
-                category=event.category,
-            ))
-            facet_types["event"] = facet_types.get("event", 0) + 1
-            if event.category:
-                facet_categories[event.category] = facet_categories.get(event.category, 0) + 1
-            if year:
-                decade = (year // 10) * 10
-                facet_years[str(decade)] = facet_years.get(str(decade), 0) + 1
-    
-    # Search conflicts
-    if "conflict" in allowed_types:
-        query = select(Conflict).where(
-            or_(
-                func.lower(Conflict.name).like(pattern),
-                func.lower(Conflict.description).like(pattern),
-            )
+
+    results = []
+    total = 0
+    facets = SearchFacets(types=[], categories=[], countries=[], years=[])
+
+    tsquery = prepare_tsquery(q)
+    if tsquery:
+        where_sql, params = build_facet_filters(
+            country_filter, category_filter, start_year, end_year
         )
-        if start_year:
-            query = query.where(Conflict.start_date >= date(start_year, 1, 1))
-        if end_year:
-            query = query.where(Conflict.start_date <= date(end_year, 12, 31))
-        
-        result = await db.execute(query.limit(limit))
-        for conflict in result.scalars().all():
-            year = conflict.start_date.year if conflict.start_date else None
-            results.append(FacetedSearchResult(
-                id=str(conflict.id),
-                type="conflict",
-                title=conflict.name,
-                subtitle=conflict.conflict_type,
-                year=year,
-                category=conflict.conflict_type,
-            ))
-            facet_types["conflict"] = facet_types.get("conflict", 0) + 1
-            if year:
-                decade = (year // 10) * 10
-                facet_years[str(decade)] = facet_years.get(str(decade), 0) + 1
-    
-    # Search countries
-    if "country" in allowed_types:
-        query = select(Country).where(func.lower(Country.name_en).like(pattern))
-        result = await db.execute(query.limit(limit))
-        for country in result.scalars().all():
-            results.append(FacetedSearchResult(
-                id=str(country.id),
-                type="country",
-                title=country.name_en,
-            ))
-            facet_types["country"] = facet_types.get("country", 0) + 1
-            facet_countries[country.name_en] = facet_countries.get(country.name_en, 0) + 1
-    
-    # Search parties
-    if "party" in allowed_types:
-        query = select(PoliticalParty).where(
-            or_(
-                func.lower(PoliticalParty.name).like(pattern),
-                func.lower(PoliticalParty.abbreviation).like(pattern),
-            )
+        # Hits and facet counts are independent queries over the same match
+        # set; the facet query runs on its own session so both overlap.
+        (rows, total), facets = await asyncio.gather(
+            unified_search(db, q, tsquery, allowed_types, limit, offset, where_sql, params),
+            get_search_facets(q, tsquery, allowed_types, where_sql, params),
         )
-        if country_filter:
-            query = query.where(PoliticalParty.country_id.in_(country_filter))
-        
-        result = await db.execute(query.limit(limit))
-        for party in result.scalars().all():
-            year = party.founded.year if party.founded else None
+        for row in rows:
             results.append(FacetedSearchResult(
-                id=str(party.id),
-                type="party",
-                title=party.name,
-                subtitle=party.party_family,
-                year=year,
-                country=str(party.country_id),
-                category=party.party_family,
+                id=row.id,
+                type=row.type,
+                title=row.title,
+                subtitle=row.subtitle,
+                year=row.year,
+                country=str(row.country_id) if row.country_id else None,
+                category=row.category,
+                relevance_score=float(row.score or 0),
             ))
-            facet_types["party"] = facet_types.get("party", 0) + 1
-            if party.party_family:
-                facet_categories[party.party_family] = facet_categories.get(party.party_family, 0) + 1
-    
-    # Sort results by relevance
-    q_lower = q.lower()
-    def relevance_score(r: FacetedSearchResult) -> float:
-        title_lower = r.title.lower()
-        if title_lower == q_lower:
-            return 1.0
-        elif title_lower.startswith(q_lower):
-            return 0.8
-        elif q_lower in title_lower:
-            return 0.5
-        return 0.3
-    
-    for r in results:
-        r.relevance_score = relevance_score(r)
-    
-    results.sort(key=lambda r: (-r.relevance_score, r.title.lower()))
-    results = results[offset:offset + limit]
-    
+
     return FacetedSearchResponse(
         query=q,
-        total=len(results),
+        total=total,
         results=results,
-        facets=SearchFacets(
-            types=[FacetValue(value=k, count=v) for k, v in sorted(facet_types.items(), key=lambda x: -x[1])],
-            categories=[FacetValue(value=k, count=v) for k, v in sorted(facet_categories.items(), key=lambda x: -x[1])[:10]],
-            countries=[FacetValue(value=k, count=v) for k, v in sorted(facet_countries.items(), key=lambda x: -x[1])[:10]],
-            years=[FacetValue(value=k, count=v) for k, v in sorted(facet_years.items())],
-        ),
+        facets=facets,
     )
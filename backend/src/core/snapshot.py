@@ -0,0 +1,81 @@
+"""Base class for per-worker in-memory snapshots of database data."""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InMemorySnapshot:
+    """A structure loaded from the database and refreshed in the background.
+
+    Subclasses implement `_load()` to query the database and then call
+    `_mark_built()` once the new data is in place. The first request waits
+    for the initial load. After that, lookups keep using the current
+    snapshot while a refresh runs as a background task. A refresh starts
+    when the snapshot is older than `max_age_seconds` or after
+    `mark_stale()` is called.
+    """
+
+    name = "snapshot"
+
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+        self._built_at: Optional[float] = None
+        # Bumped by mark_stale(); a load only counts as fresh if no write
+        # happened while it was running
+        self._generation = 0
+        self._built_generation = -1
+        self._loading_generation = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    async def _load(self) -> None:
+        raise NotImplementedError
+
+    def _mark_built(self) -> None:
+        self._built_at = time.monotonic()
+        self._built_generation = self._loading_generation
+
+    def mark_stale(self) -> None:
+        """Flag the snapshot for a background rebuild on the next use."""
+        self._generation += 1
+
+    def needs_refresh(self) -> bool:
+        if self._built_at is None or self._built_generation != self._generation:
+            return True
+        return time.monotonic() - self._built_at > self.max_age_seconds
+
+    async def refresh(self) -> None:
+        """Reload the snapshot from the database."""
+        async with self._lock:
+            self._loading_generation = self._generation
+            await self._load()
+
+    async def ensure_fresh(self) -> None:
+        """Load on first use; afterwards refresh in the background when due."""
+        if self._built_at is None:
+            async with self._lock:
+                if self._built_at is None:
+                    self._loading_generation = self._generation
+                    await self._load()
+            return
+
+        if self.needs_refresh():
+            self.start_background_refresh()
+
+    def start_background_refresh(self) -> None:
+        """Schedule a refresh task unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"{self.name} refresh failed: {e}")
@@ -0,0 +1,134 @@
+"""In-process prefix index for search autocomplete.
+
+Autocomplete is called on every keystroke, so instead of running LIKE
+queries against the primary tables each worker keeps a sorted snapshot of
+entity names and answers prefix lookups with binary search. The snapshot is
+rebuilt in the background when it ages out or when an admin edit marks it
+stale.
+"""
+import logging
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..cache import CacheTTL
+from ..database import async_session_maker
+from .snapshot import InMemorySnapshot
+
+logger = logging.getLogger(__name__)
+
+# (display text, entity type, entity id)
+Suggestion = Tuple[str, str, str]
+
+# Tables feeding the index; admin writes to these mark the index stale
+SUGGESTION_SOURCES = {
+    "people": ("person", "SELECT id::text, name FROM people WHERE name IS NOT NULL"),
+    "countries": ("country", "SELECT id::text, name_en FROM countries WHERE name_en IS NOT NULL"),
+    "events": ("event", "SELECT id::text, title FROM events WHERE title IS NOT NULL"),
+    "political_parties": (
+        "party", "SELECT id::text, name FROM political_parties WHERE name IS NOT NULL"
+    ),
+}
+
+# Sorts after every character, so [prefix, prefix + _MAX_CHAR) spans all
+# keys starting with prefix
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def normalize(value: str) -> str:
+    """Case-fold and collapse whitespace for prefix comparison."""
+    return " ".join(value.casefold().split())
+
+
+class SuggestionIndex(InMemorySnapshot):
+    """Sorted prefix index over entity names.
+
+    Two sorted key arrays are kept: one over whole names (so "kar" matches
+    "Karl Marx") and one over every later word start (so "mar" also matches
+    "Karl Marx"). Whole-name matches rank first. Lookups cost two binary
+    searches plus the number of results returned.
+    """
+
+    name = "Suggestion index"
+
+    def __init__(self, max_age_seconds: int = CacheTTL.SHORT):
+        super().__init__(max_age_seconds)
+        self._entries: List[Suggestion] = []
+        self._name_keys: List[str] = []
+        self._name_refs: List[int] = []
+        self._word_keys: List[str] = []
+        self._word_refs: List[int] = []
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def build(self, entries: Iterable[Suggestion]) -> None:
+        """Replace the index contents with the given entries."""
+        entries = [e for e in entries if e[0]]
+        names = []
+        words = []
+        for ref, (label, _, _) in enumerate(entries):
+            key = normalize(label)
+            names.append((key, ref))
+            start = key.find(" ")
+            while start != -1:
+                words.append((key[start + 1:], ref))
+                start = key.find(" ", start + 1)
+
+        names.sort()
+        words.sort()
+
+        self._entries = entries
+        self._name_keys = [k for k, _ in names]
+        self._name_refs = [r for _, r in names]
+        self._word_keys = [k for k, _ in words]
+        self._word_refs = [r for _, r in words]
+        self._mark_built()
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """Return up to `limit` entries whose name or a word in it starts with prefix."""
+        key = normalize(prefix)
+        if not key:
+            return []
+
+        entries = self._entries
+        results: List[Suggestion] = []
+        seen = set()
+        for keys, refs in (
+            (self._name_keys, self._name_refs),
+            (self._word_keys, self._word_refs),
+        ):
+            lo = bisect_left(keys, key)
+            hi = bisect_left(keys, key + _MAX_CHAR, lo)
+            for i in range(lo, hi):
+                ref = refs[i]
+                if ref in seen:
+                    continue
+                seen.add(ref)
+                results.append(entries[ref])
+                if len(results) >= limit:
+                    return results
+        return results
+
+    async def _load(self) -> None:
+        entries: List[Suggestion] = []
+        async with async_session_maker() as session:
+            for entity_type, sql in SUGGESTION_SOURCES.values():
+                result = await session.execute(text(sql))
+                entries.extend((label, entity_type, id_) for id_, label in result.all())
+        self.build(entries)
+        logger.info(f"Suggestion index rebuilt with {self.size} entries")
+
+
+# Global suggestion index instance
+_index: Optional[SuggestionIndex] = None
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Get or create the global suggestion index."""
+    global _index
+    if _index is None:
+        _index = SuggestionIndex()
+    return _index
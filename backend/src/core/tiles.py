@@ -0,0 +1,488 @@
+"""Mapbox vector tiles for map layers.
+
+Instead of downloading whole FeatureCollections and filtering them in the
+browser, map clients fetch `/tiles/{layer}/{z}/{x}/{y}.mvt`, which holds
+only the features in view, clipped and quantized for that zoom by
+ST_AsMVTGeom. Database layers (borders, frontlines, Nakba villages) are
+queried directly. File-based liberation layers keep a bounding-box index
+per file version, so only the features touching a tile are sent to
+PostGIS for encoding.
+
+Encoded tiles are kept in a per-worker LRU. The database layers are
+written by the importers rather than through the API, so their tiles
+expire instead of being invalidated: border tiles follow the border
+epochs' version, which changes on every refresh, and the other database
+layers are re-encoded after DATABASE_TILE_MAX_AGE. File layer tiles are
+keyed by the file's ETag. `invalidate(layer)` drops one layer's tiles at
+once, e.g. from a script that has just imported it.
+"""
+import json
+import math
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import CacheTTL
+from ..database import get_db
+from ..geography.border_lods import LOD_TOLERANCES, snap_tolerance
+from ..geography.epochs import get_border_epochs
+from ..territories import geojson_router as files
+from .file_cache import get_file_cache
+from .http_cache import CachedBody, cached_response
+
+router = APIRouter()
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+# Tile coordinate space and the margin kept around it for line joins
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 18
+
+# Total encoded tile bytes kept per worker
+DEFAULT_TILE_BYTES = 64 * 1024 * 1024
+
+BORDERS_LAYER = "borders"
+FRONTLINES_LAYER = "frontlines"
+NAKBA_LAYER = "nakba-villages"
+
+# How long frontline and Nakba village tiles are reused before re-encoding
+DATABASE_TILE_MAX_AGE = CacheTTL.LONG
+
+# File-based layers, named after their /territories GeoJSON endpoints
+FILE_LAYERS: Dict[str, Tuple[Path, Callable[[Path], Any]]] = {
+    "palestine-separation-barrier": (
+        files.PALESTINE_DIR / "separation_barrier.geojson", files.load_geojson
+    ),
+    "palestine-checkpoints": (files.PALESTINE_DIR / "checkpoints.geojson", files.load_geojson),
+    "palestine-roadblocks": (
+        files.PALESTINE_DIR / "roadblocks_earthmounds.geojson", files.load_geojson
+    ),
+    "palestine-road-gates": (files.PALESTINE_DIR / "road_gates.geojson", files.load_geojson),
+    "palestine-firing-zones": (
+        files.PALESTINE_DIR / "israeli_firing_zones.geojson", files.load_geojson
+    ),
+    "palestine-oslo-areas": (files.PALESTINE_DIR / "oslo_areas_abc.geojson", files.load_geojson),
+    "palestine-linear-closures": (
+        files.PALESTINE_DIR / "linear_closures.geojson", files.load_geojson
+    ),
+    "palestine-settlements": (
+        files.PALESTINE_DIR / "osm_settlements_places.geojson", files.load_geojson
+    ),
+    "palestine-walls": (files.PALESTINE_DIR / "osm_walls_barriers.geojson", files.load_geojson),
+    "western-sahara-wall": (
+        files.WESTERN_SAHARA_DIR / "moroccan_wall_full.json", files.load_osm_as_geojson
+    ),
+    "western-sahara-berm": (
+        files.WESTERN_SAHARA_DIR / "sand_berm_osm.json", files.load_osm_as_geojson
+    ),
+    "western-sahara-minefields": (
+        files.WESTERN_SAHARA_DIR / "minefields_osm.json", files.load_osm_as_geojson
+    ),
+    "western-sahara-settlements": (
+        files.WESTERN_SAHARA_DIR / "settlements_osm.json", files.load_osm_as_geojson
+    ),
+    "western-sahara-refugee-camps": (
+        files.WESTERN_SAHARA_DIR / "sahrawi_refugee_camps.json", files.load_osm_as_geojson
+    ),
+    "western-sahara-boundary": (
+        files.WESTERN_SAHARA_DIR / "esh_admin0.geojson", files.load_geojson
+    ),
+    "kurdistan-destroyed-villages": (
+        files.KURDISTAN_DIR / "destroyed_villages_osm.json", files.load_osm_as_geojson
+    ),
+    "kurdistan-military": (
+        files.KURDISTAN_DIR / "military_installations_osm.json", files.load_osm_as_geojson
+    ),
+    "kurdistan-dams": (files.KURDISTAN_DIR / "turkey_dams_osm.json", files.load_osm_as_geojson),
+    "kurdistan-ilisu-dam": (files.KURDISTAN_DIR / "ilisu_dam_osm.json", files.load_osm_as_geojson),
+    "kurdistan-iraqi-kurdistan": (
+        files.KURDISTAN_DIR / "iraqi_kurdistan_osm.json", files.load_osm_as_geojson
+    ),
+    "kashmir-line-of-control": (
+        files.KASHMIR_DIR / "line_of_control_osm.json", files.load_osm_as_geojson
+    ),
+    "kashmir-boundaries": (
+        files.KASHMIR_DIR / "kashmir_boundaries_osm.json", files.load_osm_as_geojson
+    ),
+    "kashmir-checkpoints": (files.KASHMIR_DIR / "checkpoints_osm.json", files.load_osm_as_geojson),
+    "kashmir-military": (
+        files.KASHMIR_DIR / "military_installations_osm.json", files.load_osm_as_geojson
+    ),
+    "kashmir-graves": (files.KASHMIR_DIR / "graves_cemeteries_osm.json", files.load_osm_as_geojson),
+    "tibet-monasteries": (files.TIBET_DIR / "monasteries_temples.json", files.load_osm_as_geojson),
+    "tibet-military": (files.TIBET_DIR / "military_installations.json", files.load_osm_as_geojson),
+    "tibet-railway": (files.TIBET_DIR / "railway_infrastructure.json", files.load_osm_as_geojson),
+    "tibet-prisons": (files.TIBET_DIR / "prisons_detention.json", files.load_osm_as_geojson),
+    "west-papua-freeport-mine": (
+        files.WEST_PAPUA_DIR / "freeport_mine.json", files.load_osm_as_geojson
+    ),
+    "west-papua-military": (
+        files.WEST_PAPUA_DIR / "military_installations.json", files.load_osm_as_geojson
+    ),
+    "west-papua-settlements": (
+        files.WEST_PAPUA_DIR / "settlements.json", files.load_osm_as_geojson
+    ),
+    "west-papua-massacres": (files.WEST_PAPUA_DIR / "massacres.geojson", files.load_geojson),
+    "west-papua-extractive-industries": (
+        files.WEST_PAPUA_DIR / "extractive_industries.geojson", files.load_geojson
+    ),
+    "ireland-peace-walls": (
+        files.IRELAND_DIR / "peace_walls_belfast.json", files.load_osm_as_geojson
+    ),
+    "ireland-military": (
+        files.IRELAND_DIR / "military_installations.json", files.load_osm_as_geojson
+    ),
+    "ireland-border-checkpoints": (
+        files.IRELAND_DIR / "border_checkpoints.json", files.load_osm_as_geojson
+    ),
+    "ireland-partition-boundary": (
+        files.IRELAND_DIR / "partition_boundary.json", files.load_osm_as_geojson
+    ),
+    "uyghur-region-detention-facilities": (
+        files.UYGHUR_DIR / "detention_facilities.geojson", files.load_geojson
+    ),
+}
+
+# `bounds.box` is the tile plus its buffer in WGS84. Geometry is clipped
+# to it before projecting, so polar coordinates never reach ST_Transform.
+TILE_BOUNDS_CTE = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(:z, :x, :y) AS tile,
+               ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => :margin), 4326) AS box
+    )
+"""
+
+
+def _mvt_geom(column: str) -> str:
+    return (
+        f"ST_AsMVTGeom(ST_Transform(ST_ClipByBox2D({column}, bounds.box), 3857), "
+        f"bounds.tile, {EXTENT}, {BUFFER}) AS geom"
+    )
+
+
+# Borders read the LOD level for the zoom; a NULL tolerance matches no
+# LOD row and falls back to full geometry
+BORDERS_TILE_SQL = TILE_BOUNDS_CTE + f"""
+    SELECT ST_AsMVT(t, :layer, {EXTENT}, 'geom') FROM (
+        SELECT c.id::text AS id, c.name_en AS name, c.name_short, c.iso_alpha2,
+               c.iso_alpha3, c.gwcode, c.entity_type,
+               {_mvt_geom("COALESCE(l.geometry, b.geometry)")}
+        FROM bounds, countries c
+        JOIN country_borders b ON b.country_id = c.id
+        LEFT JOIN country_border_lods l ON l.border_id = b.id AND l.tolerance = :tolerance
+        WHERE b.geometry && bounds.box
+          AND c.valid_from <= :target_date AND (c.valid_to IS NULL OR c.valid_to >= :target_date)
+          AND b.valid_from <= :target_date AND (b.valid_to IS NULL OR b.valid_to >= :target_date)
+    ) t WHERE geom IS NOT NULL
+"""
+
+# Each conflict's latest frontline snapshot within [start, end]
+FRONTLINES_TILE_SQL = TILE_BOUNDS_CTE + f"""
+    SELECT ST_AsMVT(t, :layer, {EXTENT}, 'geom') FROM (
+        SELECT f.id::text AS id, f.conflict_id::text AS conflict_id, f.date::text AS date,
+               f.controlled_by, f.geometry_type, f.color,
+               {_mvt_geom("f.geometry")}
+        FROM bounds, conflict_frontlines f
+        WHERE f.geometry && bounds.box
+          AND f.date = (
+              SELECT max(g.date) FROM conflict_frontlines g
+              WHERE g.conflict_id = f.conflict_id AND g.date BETWEEN :start AND :end
+          )
+    ) t WHERE geom IS NOT NULL
+"""
+
+NAKBA_TILE_SQL = TILE_BOUNDS_CTE + f"""
+    SELECT ST_AsMVT(t, :layer, {EXTENT}, 'geom') FROM (
+        SELECT v.id::text AS id, v.name_arabic, v.name_english, v.district,
+               v.population_1945, v.depopulation_date::text AS depopulation_date,
+               v.massacre_occurred,
+               {_mvt_geom("v.geometry")}
+        FROM bounds, nakba_villages v
+        WHERE v.geometry && bounds.box
+    ) t WHERE geom IS NOT NULL
+"""
+
+# File features arrive as a JSON array of {"geometry", "properties"}
+FILE_TILE_SQL = TILE_BOUNDS_CTE + f"""
+    , features AS (
+        SELECT ST_SetSRID(ST_GeomFromGeoJSON(f->>'geometry'), 4326) AS geometry,
+               f->'properties' AS properties
+        FROM jsonb_array_elements(CAST(:features AS jsonb)) f
+    )
+    SELECT ST_AsMVT(t, :layer, {EXTENT}, 'geom') FROM (
+        SELECT properties, {_mvt_geom("features.geometry")}
+        FROM bounds, features
+        WHERE features.geometry && bounds.box
+    ) t WHERE geom IS NOT NULL
+"""
+
+
+def tile_bounds(z: int, x: int, y: int, margin: float = 0.0) -> Tuple[float, float, float, float]:
+    """Return (west, south, east, north) in degrees for a Web Mercator tile.
+
+    `margin` widens the tile by that fraction of its size on every side.
+    """
+    n = 2 ** z
+
+    def lon(px: float) -> float:
+        return px / n * 360.0 - 180.0
+
+    def lat(py: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * py / n))))
+
+    return lon(x - margin), lat(y + 1 + margin), lon(x + 1 + margin), lat(y - margin)
+
+
+def zoom_tolerance(z: int) -> Optional[float]:
+    """Border LOD level for a zoom, or None for full resolution.
+
+    A level is used while it is coarser than one screen pixel (a 256 px
+    tile) at that zoom; past the finest level borders are not simplified.
+    """
+    pixel = 360.0 / (256 * 2 ** z)
+    if pixel < min(LOD_TOLERANCES):
+        return None
+    return snap_tolerance(pixel)
+
+
+def _positions(coords: Any) -> Iterator[Tuple[float, float]]:
+    if not coords:
+        return
+    if isinstance(coords[0], (int, float)):
+        yield coords[0], coords[1]
+        return
+    for part in coords:
+        yield from _positions(part)
+
+
+def _geometry_bbox(geometry: Optional[dict]) -> Optional[Tuple[float, float, float, float]]:
+    if not geometry:
+        return None
+    if geometry.get("type") == "GeometryCollection":
+        boxes = [b for b in map(_geometry_bbox, geometry.get("geometries", [])) if b]
+        if not boxes:
+            return None
+        west, south, east, north = zip(*boxes)
+        return min(west), min(south), max(east), max(north)
+    points = np.array(list(_positions(geometry.get("coordinates"))), dtype=np.float64)
+    if points.size == 0:
+        return None
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    return float(west), float(south), float(east), float(north)
+
+
+class FileLayerIndex:
+    """Bounding boxes of one file layer's features, for tile lookups."""
+
+    def __init__(self, collection: dict):
+        boxes: List[Tuple[float, float, float, float]] = []
+        self.features: List[str] = []
+        for feature in collection.get("features", []):
+            bbox = _geometry_bbox(feature.get("geometry"))
+            if bbox is None:
+                continue
+            boxes.append(bbox)
+            self.features.append(json.dumps({
+                "geometry": feature["geometry"],
+                "properties": feature.get("properties") or {},
+            }, separators=(",", ":")))
+        self.boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> List[str]:
+        """Serialized features whose bounding box meets bounds."""
+        west, south, east, north = bounds
+        b = self.boxes
+        hits = (b[:, 0] <= east) & (b[:, 2] >= west) & (b[:, 1] <= north) & (b[:, 3] >= south)
+        return [self.features[i] for i in np.flatnonzero(hits)]
+
+
+# Per-worker file layer indexes, keyed by layer name with the body ETag
+_file_indexes: Dict[str, Tuple[str, FileLayerIndex]] = {}
+
+
+def get_file_layer_index(layer: str) -> Tuple[str, FileLayerIndex]:
+    """Return (etag, index) for a file layer's current file version."""
+    path, loader = FILE_LAYERS[layer]
+    cached = get_file_cache().get(path, loader)
+    entry = _file_indexes.get(layer)
+    if entry is None or entry[0] != cached.etag:
+        entry = _file_indexes[layer] = (cached.etag, FileLayerIndex(json.loads(cached.body)))
+    return entry
+
+
+class TileCache:
+    """LRU of encoded tiles with a version per layer."""
+
+    def __init__(self, max_bytes: int = DEFAULT_TILE_BYTES):
+        self.max_bytes = max_bytes
+        # (layer, key) -> (monotonic time stored, tile)
+        self._tiles: "OrderedDict[Tuple[str, Hashable], Tuple[float, CachedBody]]" = OrderedDict()
+        self._size = 0
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, layer: str) -> int:
+        return self._versions.get(layer, 0)
+
+    def get(
+        self, layer: str, key: Hashable, max_age: Optional[float] = None
+    ) -> Optional[CachedBody]:
+        """Return a cached tile, or None if missing or older than max_age seconds."""
+        entry = self._tiles.get((layer, key))
+        if entry is not None and max_age is not None and time.monotonic() - entry[0] > max_age:
+            self._size -= self._tiles.pop((layer, key))[1].size
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tiles.move_to_end((layer, key))
+        return entry[1]
+
+    def put(self, layer: str, key: Hashable, cached: CachedBody, version: int) -> None:
+        """Store a tile encoded while `version` was the layer's version."""
+        if version != self.version(layer):
+            return
+        previous = self._tiles.pop((layer, key), None)
+        if previous is not None:
+            self._size -= previous[1].size
+        self._tiles[(layer, key)] = (time.monotonic(), cached)
+        self._size += cached.size
+        while self._size > self.max_bytes and len(self._tiles) > 1:
+            _, (_, evicted) = self._tiles.popitem(last=False)
+            self._size -= evicted.size
+
+    def invalidate(self, layer: Optional[str] = None) -> None:
+        """Drop one layer's tiles, or every tile when layer is None."""
+        if layer is None:
+            layers = set(self._versions).union(name for name, _ in self._tiles)
+            self._tiles = OrderedDict()
+            self._size = 0
+        else:
+            layers = {layer}
+            for tile_key in [k for k in self._tiles if k[0] == layer]:
+                self._size -= self._tiles.pop(tile_key)[1].size
+        for name in layers:
+            self._versions[name] = self.version(name) + 1
+
+    def stats(self) -> dict:
+        return {
+            "tiles": len(self._tiles),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global tile cache
+_tile_cache: Optional[TileCache] = None
+
+
+def get_tile_cache() -> TileCache:
+    """Get or create the global tile cache."""
+    global _tile_cache
+    if _tile_cache is None:
+        _tile_cache = TileCache()
+    return _tile_cache
+
+
+@router.get("/layers")
+async def list_tile_layers():
+    """List the available tile layers."""
+    return {
+        "database": [BORDERS_LAYER, FRONTLINES_LAYER, NAKBA_LAYER],
+        "files": sorted(FILE_LAYERS),
+        "year_dependent": [BORDERS_LAYER, FRONTLINES_LAYER],
+        "max_zoom": MAX_ZOOM,
+    }
+
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(
+    request: Request,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    year: Optional[int] = Query(
+        None, ge=1800, le=2100, description="Year for borders (required) and frontlines"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get one Mapbox vector tile of a map layer.
+
+    - **borders**: country borders valid in `year`, simplified for the zoom
+    - **frontlines**: each conflict's latest frontline in `year` (or ever)
+    - **nakba-villages** and the file layers listed at `/tiles/layers`
+    """
+    if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    sql: Optional[str] = None
+    params: Dict[str, Any] = {}
+    max_age = 3600
+    tile_max_age: Optional[int] = None
+    if layer == BORDERS_LAYER:
+        if year is None:
+            raise HTTPException(status_code=400, detail="year is required for the borders layer")
+        epochs = get_border_epochs()
+        await epochs.ensure_fresh()
+        target_date = date(year, 7, 1)
+        epoch = epochs.epoch_for(target_date)
+        tolerance = zoom_tolerance(z)
+        sql = BORDERS_TILE_SQL
+        params = {"target_date": epoch or target_date, "tolerance": tolerance}
+        variant: Hashable = (epochs.version, epoch)
+    elif layer == FRONTLINES_LAYER:
+        sql = FRONTLINES_TILE_SQL
+        if year is None:
+            params = {"start": date.min, "end": date.max}
+        else:
+            params = {"start": date(year, 1, 1), "end": date(year, 12, 31)}
+        variant = year
+        tile_max_age = DATABASE_TILE_MAX_AGE
+    elif layer == NAKBA_LAYER:
+        sql = NAKBA_TILE_SQL
+        variant = None
+        tile_max_age = DATABASE_TILE_MAX_AGE
+    elif layer in FILE_LAYERS:
+        etag, index = get_file_layer_index(layer)
+        features = index.query(tile_bounds(z, x, y, BUFFER / EXTENT))
+        if features:
+            # Tiles that no feature touches are empty without a query
+            sql = FILE_TILE_SQL
+            params = {"features": "[" + ",".join(features) + "]"}
+        variant = etag
+        max_age = 86400
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer: {layer}")
+
+    cache = get_tile_cache()
+    key = (z, x, y, variant)
+    cached = cache.get(layer, key, tile_max_age)
+    if cached is None:
+        version = cache.version(layer)
+        tile = None
+        if sql is not None:
+            tile = await db.scalar(
+                text(sql),
+                {**params, "z": z, "x": x, "y": y, "margin": BUFFER / EXTENT, "layer": layer},
+            )
+        cached = CachedBody(bytes(tile or b""))
+        cached.gzipped()
+        cache.put(layer, key, cached, version)
+
+    return cached_response(request, cached, max_age, media_type=MVT_MEDIA_TYPE)
@@ -0,0 +1,251 @@
+"""GeoJSON to TopoJSON conversion.
+
+TopoJSON stores each line once as an "arc" shared by every geometry that
+uses it, with coordinates quantized to an integer grid and delta-encoded.
+For country borders, where every interior edge belongs to two countries,
+the result is several times smaller than the equivalent GeoJSON.
+
+Arcs are cut at junctions, the points where two lines that share a stretch
+separate. Identical arcs (in either direction) are stored once. Shared
+edges are only found when both sides have identical vertices, as with
+the coverage-simplified border levels (see geography/border_lods.py).
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Grid size per axis; 1e5 keeps ~400 m resolution across the whole globe
+DEFAULT_QUANTIZATION = 100_000
+
+Point = Tuple[int, int]
+
+
+class _Quantizer:
+    def __init__(self, bbox: Sequence[float], quantization: int):
+        x0, y0, x1, y1 = bbox
+        self.translate = (x0, y0)
+        self.scale = (
+            (x1 - x0) / (quantization - 1) if x1 > x0 else 1.0,
+            (y1 - y0) / (quantization - 1) if y1 > y0 else 1.0,
+        )
+
+    def point(self, position: Sequence[float]) -> Point:
+        return (
+            round((position[0] - self.translate[0]) / self.scale[0]),
+            round((position[1] - self.translate[1]) / self.scale[1]),
+        )
+
+    def line(self, positions: Sequence[Sequence[float]]) -> List[Point]:
+        """Quantize positions, dropping points that collapse onto the last."""
+        line: List[Point] = []
+        for position in positions:
+            p = self.point(position)
+            if not line or line[-1] != p:
+                line.append(p)
+        return line
+
+
+def _positions(geometry: Optional[dict]):
+    if not geometry:
+        return
+    kind = geometry.get("type")
+    if kind == "GeometryCollection":
+        for part in geometry.get("geometries", []):
+            yield from _positions(part)
+        return
+    coords = geometry.get("coordinates")
+    depth = {"Point": 0, "MultiPoint": 1, "LineString": 1, "MultiLineString": 2,
+             "Polygon": 2, "MultiPolygon": 3}.get(kind)
+    if depth is None or coords is None:
+        return
+
+    def walk(c, d):
+        if d == 0:
+            yield c
+        else:
+            for part in c:
+                yield from walk(part, d - 1)
+
+    yield from walk(coords, depth)
+
+
+def _bbox(features: List[dict]) -> List[float]:
+    xs, ys = [], []
+    for feature in features:
+        for position in _positions(feature.get("geometry")):
+            xs.append(position[0])
+            ys.append(position[1])
+    if not xs:
+        return [0.0, 0.0, 0.0, 0.0]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+class _Topology:
+    """Collects lines and rings, then cuts them into shared arcs."""
+
+    def __init__(self):
+        self.lines: List[List[Point]] = []
+        self.rings: List[List[Point]] = []
+        # First (prev, next) neighbour pair seen at each point
+        self._neighbours: Dict[Point, Tuple[Point, Point]] = {}
+        self.junctions: set = set()
+        self.arcs: List[List[Point]] = []
+        self._arc_index: Dict[Tuple[Point, ...], int] = {}
+
+    def _visit(self, point: Point, prev: Point, nxt: Point) -> None:
+        seen = self._neighbours.get(point)
+        if seen is None:
+            self._neighbours[point] = (prev, nxt)
+        elif seen != (prev, nxt) and seen != (nxt, prev):
+            self.junctions.add(point)
+
+    def add_line(self, line: List[Point]) -> Optional[int]:
+        if len(line) < 2:
+            return None
+        self.junctions.add(line[0])
+        self.junctions.add(line[-1])
+        for i in range(1, len(line) - 1):
+            self._visit(line[i], line[i - 1], line[i + 1])
+        self.lines.append(line)
+        return len(self.lines) - 1
+
+    def add_ring(self, ring: List[Point]) -> Optional[int]:
+        if ring and ring[0] == ring[-1]:
+            ring = ring[:-1]
+        if len(ring) < 3:
+            return None
+        n = len(ring)
+        for i in range(n):
+            self._visit(ring[i], ring[i - 1], ring[(i + 1) % n])
+        self.rings.append(ring)
+        return len(self.rings) - 1
+
+    def _store(self, arc: List[Point]) -> int:
+        key = tuple(arc)
+        index = self._arc_index.get(key)
+        if index is not None:
+            return index
+        index = self._arc_index.get(key[::-1])
+        if index is not None:
+            return ~index
+        self.arcs.append(arc)
+        self._arc_index[key] = len(self.arcs) - 1
+        return len(self.arcs) - 1
+
+    def _cut(self, points: List[Point]) -> List[int]:
+        """Split an open sequence at interior junctions into stored arcs."""
+        arcs, start = [], 0
+        for i in range(1, len(points) - 1):
+            if points[i] in self.junctions:
+                arcs.append(self._store(points[start:i + 1]))
+                start = i
+        arcs.append(self._store(points[start:]))
+        return arcs
+
+    def line_arcs(self, index: int) -> List[int]:
+        return self._cut(self.lines[index])
+
+    def ring_arcs(self, index: int) -> List[int]:
+        ring = self.rings[index]
+        starts = [i for i, p in enumerate(ring) if p in self.junctions]
+        if starts:
+            first = starts[0]
+        else:
+            # Rotate junction-free rings to a canonical start so identical
+            # rings (a hole and the enclave filling it) share one arc
+            first = ring.index(min(ring))
+        rotated = ring[first:] + ring[:first]
+        return self._cut(rotated + [rotated[0]])
+
+
+def _encode_arc(arc: List[Point]) -> List[List[int]]:
+    encoded = [list(arc[0])]
+    for (x0, y0), (x1, y1) in zip(arc, arc[1:]):
+        encoded.append([x1 - x0, y1 - y0])
+    return encoded
+
+
+def feature_collection_to_topology(
+    collection: dict,
+    object_name: str = "collection",
+    quantization: int = DEFAULT_QUANTIZATION,
+) -> dict:
+    """Convert a GeoJSON FeatureCollection into a quantized TopoJSON topology.
+
+    Features become one GeometryCollection object named `object_name`.
+    Feature ids and properties are kept.
+    """
+    features = collection.get("features", [])
+    bbox = _bbox(features)
+    quantizer = _Quantizer(bbox, quantization)
+    topology = _Topology()
+
+    # First pass registers every line and ring, so junctions are known
+    # before anything is cut into arcs
+    def register(geometry: Optional[dict]) -> Any:
+        if not geometry or not geometry.get("type"):
+            return None
+        kind, coords = geometry["type"], geometry.get("coordinates")
+        if kind == "GeometryCollection":
+            return [register(g) for g in geometry.get("geometries", [])]
+        if kind == "LineString":
+            return topology.add_line(quantizer.line(coords))
+        if kind == "MultiLineString":
+            return [topology.add_line(quantizer.line(line)) for line in coords]
+        if kind == "Polygon":
+            return [topology.add_ring(quantizer.line(ring)) for ring in coords]
+        if kind == "MultiPolygon":
+            return [
+                [topology.add_ring(quantizer.line(ring)) for ring in polygon] for polygon in coords
+            ]
+        return None
+
+    registered = [register(feature.get("geometry")) for feature in features]
+
+    def polygon_arcs(rings: List[Optional[int]]) -> Optional[List[List[int]]]:
+        # A polygon whose exterior collapsed is dropped with its holes
+        if not rings or rings[0] is None:
+            return None
+        return [topology.ring_arcs(r) for r in rings if r is not None]
+
+    def encode(geometry: Optional[dict], refs: Any) -> dict:
+        if not geometry or not geometry.get("type"):
+            return {"type": None}
+        kind, coords = geometry["type"], geometry.get("coordinates")
+        if kind == "GeometryCollection":
+            return {
+                "type": kind,
+                "geometries": [encode(g, r) for g, r in zip(geometry.get("geometries", []), refs)],
+            }
+        if kind == "Point":
+            return {"type": kind, "coordinates": list(quantizer.point(coords))}
+        if kind == "MultiPoint":
+            return {"type": kind, "coordinates": [list(quantizer.point(p)) for p in coords]}
+        if kind == "LineString":
+            if refs is None:
+                return {"type": None}
+            return {"type": kind, "arcs": topology.line_arcs(refs)}
+        if kind == "MultiLineString":
+            lines = [topology.line_arcs(r) for r in refs if r is not None]
+            return {"type": kind, "arcs": lines} if lines else {"type": None}
+        if kind == "Polygon":
+            arcs = polygon_arcs(refs)
+            return {"type": kind, "arcs": arcs} if arcs else {"type": None}
+        if kind == "MultiPolygon":
+            polygons = [p for p in map(polygon_arcs, refs) if p]
+            return {"type": kind, "arcs": polygons} if polygons else {"type": None}
+        return {"type": None}
+
+    geometries = []
+    for feature, refs in zip(features, registered):
+        geometry = encode(feature.get("geometry"), refs)
+        if "id" in feature:
+            geometry["id"] = feature["id"]
+        geometry["properties"] = feature.get("properties") or {}
+        geometries.append(geometry)
+
+    return {
+        "type": "Topology",
+        "bbox": bbox,
+        "transform": {"scale": list(quantizer.scale), "translate": list(quantizer.translate)},
+        "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": [_encode_arc(arc) for arc in topology.arcs],
+    }
@@ -0,0 +1,303 @@
+"""Cache warm-up after deploys and Redis flushes.
+
+Each worker replays a list of GET requests through the app on startup,
+so the first users after a restart hit warm caches instead of paying for
+the cold queries. Requests go through the normal endpoints, which fill
+Redis (with the usual single-flight locking, so workers starting together
+compute each value once) and the worker's own file and local caches.
+
+Targets, most important first:
+
+- the most viewed API pages, counted by every worker (see
+  record_page_view) and added up in Redis
+- per-year globe payloads (events, active conflicts, borders) for the hot
+  timeline years: those in popular pages, and the timeline's default
+- the active conflicts layer and every static territories GeoJSON layer
+
+Only pages under WARMUP_PREFIXES are counted and replayed. Workers keep
+their counts in memory and add them to Redis every
+POPULAR_PAGES_FLUSH_SECONDS and on shutdown. A bounded number of requests
+run at once, so warm-up never takes more than a few database connections
+from live traffic.
+
+Run from the command line to precompute a range of years:
+
+    python -m src.core.warmup --years 1900-2024
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from fastapi import FastAPI
+
+from ..cache import CacheTTL, close_redis, get_redis
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CONCURRENCY = 4
+WARMUP_PAGE_LIMIT = 50
+MAX_HOT_YEARS = 20
+REQUEST_TIMEOUT = 60.0
+
+# The timeline's default year (the last with complete border data)
+DEFAULT_YEARS = (2019,)
+# Matches the simplification the map requests
+BORDER_SIMPLIFY = 0.01
+
+# Relative to the API prefix
+WARMUP_PREFIXES = ("/globe/", "/geography/borders/", "/territories/", "/stats/")
+
+# Page view counts shared across workers and restarts
+POPULAR_PAGES_KEY = "analytics:popular_pages"
+POPULAR_PAGES_TTL = CacheTTL.DAY * 30
+POPULAR_PAGES_FLUSH_SECONDS = 60
+# Distinct pages counted between flushes; further new pages are ignored
+MAX_COUNTED_PAGES = 10000
+
+# Set on replayed requests; middleware can skip them (e.g. rate limiting)
+WARMUP_SCOPE_KEY = "cache_warmup"
+
+# Page views not yet added to POPULAR_PAGES_KEY by this worker
+_page_views: Counter = Counter()
+_warmup_task: Optional[asyncio.Task] = None
+_flush_task: Optional[asyncio.Task] = None
+
+
+def _api_path(path: str) -> str:
+    return f"{get_settings().api_v1_prefix}{path}"
+
+
+def is_warmable(page: str) -> bool:
+    """Whether a page is a cacheable API read worth replaying."""
+    path = urlsplit(page).path
+    return any(path.startswith(_api_path(prefix)) for prefix in WARMUP_PREFIXES)
+
+
+def record_page_view(path: str, query: str = "") -> None:
+    """Count one view of a page, if it is warmable."""
+    page = f"{path}?{query}" if query else path
+    if not is_warmable(page):
+        return
+    if page in _page_views or len(_page_views) < MAX_COUNTED_PAGES:
+        _page_views[page] += 1
+
+
+def page_years(pages: Iterable[str]) -> List[int]:
+    """Years requested by pages, in page order."""
+    years = []
+    for page in pages:
+        for value in parse_qs(urlsplit(page).query).get("year", []):
+            if value.isdigit() and 1800 <= int(value) <= 2100:
+                years.append(int(value))
+    return list(dict.fromkeys(years))
+
+
+def year_targets(year: int) -> List[str]:
+    """The globe payloads for one timeline year."""
+    return [
+        _api_path(f"/globe/events/year?year={year}"),
+        _api_path(f"/globe/conflicts/active?year={year}"),
+        _api_path(f"/geography/borders/geojson?year={year}&simplify={BORDER_SIMPLIFY}"),
+    ]
+
+
+def static_targets(app: FastAPI) -> List[str]:
+    """Layers that do not depend on the year."""
+    territories = _api_path("/territories/")
+    layers = [
+        path
+        for path, operations in app.openapi()["paths"].items()
+        if "get" in operations
+        and path.startswith(territories)
+        and path.endswith("/geojson")
+        and "{" not in path
+    ]
+    return [_api_path("/globe/conflicts/active")] + layers
+
+
+async def popular_pages(limit: int = WARMUP_PAGE_LIMIT) -> List[str]:
+    """Most viewed warmable pages, from this worker and from Redis."""
+    views: Counter = Counter(_page_views)
+    try:
+        client = await get_redis()
+        saved = await client.zrevrange(POPULAR_PAGES_KEY, 0, limit * 4 - 1, withscores=True)
+        for page, score in saved:
+            views[page.decode() if isinstance(page, bytes) else page] += int(score)
+    except Exception as e:
+        logger.warning(f"Could not read popular pages: {e}")
+    return [page for page, _ in views.most_common() if is_warmable(page)][:limit]
+
+
+async def save_popular_pages() -> None:
+    """Add this worker's new page views to the shared counts."""
+    if not _page_views:
+        return
+    new_views = dict(_page_views)
+    _page_views.clear()
+    try:
+        client = await get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            for page, views in new_views.items():
+                pipe.zincrby(POPULAR_PAGES_KEY, views, page)
+            pipe.expire(POPULAR_PAGES_KEY, POPULAR_PAGES_TTL)
+            await pipe.execute()
+    except Exception as e:
+        # Keep the views for the next flush
+        _page_views.update(new_views)
+        logger.warning(f"Could not save popular pages: {e}")
+
+
+async def _flush_page_views() -> None:
+    while True:
+        await asyncio.sleep(POPULAR_PAGES_FLUSH_SECONDS)
+        await save_popular_pages()
+
+
+async def build_targets(
+    app: FastAPI,
+    years: Optional[Sequence[int]] = None,
+    limit: int = WARMUP_PAGE_LIMIT,
+) -> List[str]:
+    """Paths to replay, most important first, without duplicates."""
+    pages = await popular_pages(limit)
+    if years is None:
+        years = (page_years(pages) + list(DEFAULT_YEARS))[:MAX_HOT_YEARS]
+    targets = list(pages)
+    for year in years:
+        targets.extend(year_targets(year))
+    targets.extend(static_targets(app))
+    return list(dict.fromkeys(targets))
+
+
+def _mark_warmup(app: FastAPI):
+    async def asgi(scope, receive, send):
+        scope[WARMUP_SCOPE_KEY] = True
+        await app(scope, receive, send)
+    return asgi
+
+
+async def warm_cache(
+    app: FastAPI,
+    targets: Sequence[str],
+    concurrency: int = WARMUP_CONCURRENCY,
+) -> Dict[str, float]:
+    """Request each target through the app, a few at a time.
+
+    Returns:
+        Counts of warmed and failed targets, and the time taken
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {"warmed": 0, "failed": 0}
+    started = time.monotonic()
+
+    async def fetch(client: httpx.AsyncClient, path: str) -> None:
+        async with semaphore:
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+                if not ok:
+                    logger.warning(f"Warm-up of {path} returned {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Warm-up of {path} failed: {e}")
+                ok = False
+            results["warmed" if ok else "failed"] += 1
+
+    transport = httpx.ASGITransport(app=_mark_warmup(app))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://warmup", timeout=REQUEST_TIMEOUT
+    ) as client:
+        await asyncio.gather(*(fetch(client, path) for path in targets))
+
+    return {**results, "seconds": round(time.monotonic() - started, 2)}
+
+
+async def run_warmup(
+    app: FastAPI,
+    years: Optional[Sequence[int]] = None,
+    concurrency: int = WARMUP_CONCURRENCY,
+) -> Dict[str, float]:
+    """Build the target list and warm it."""
+    targets = await build_targets(app, years)
+    results = await warm_cache(app, targets, concurrency)
+    logger.info(
+        f"Cache warm-up: {results['warmed']} warmed, {results['failed']} failed "
+        f"in {results['seconds']}s"
+    )
+    return results
+
+
+def start_cache_warmup(app: FastAPI) -> None:
+    """Warm the caches in the background without blocking startup.
+
+    Also starts saving this worker's page views for later warm-ups.
+    """
+    global _warmup_task, _flush_task
+    if _warmup_task is None or _warmup_task.done():
+        _warmup_task = asyncio.create_task(_warm_in_background(app))
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_page_views())
+
+
+async def _warm_in_background(app: FastAPI) -> None:
+    try:
+        await run_warmup(app)
+    except Exception as e:
+        logger.warning(f"Cache warm-up failed: {e}")
+
+
+async def stop_cache_warmup() -> None:
+    """Cancel a running warm-up and save page views for the next one."""
+    global _warmup_task, _flush_task
+    for task in (_warmup_task, _flush_task):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _warmup_task = _flush_task = None
+    await save_popular_pages()
+
+
+def _parse_years(value: str) -> List[int]:
+    years = []
+    for part in value.split(","):
+        start, _, end = part.partition("-")
+        years.extend(range(int(start), int(end or start) + 1))
+    return years
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Warm the API caches")
+    parser.add_argument(
+        "--years", type=_parse_years, default=None,
+        help="Years to precompute, e.g. 1917,1945-1991 (default: hot years)",
+    )
+    parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    from ..main import app
+
+    print("=" * 60)
+    print("WARMING CACHES")
+    print("=" * 60)
+
+    try:
+        results = await run_warmup(app, args.years, args.concurrency)
+    finally:
+        await close_redis()
+
+    print(
+        f"WARMED: {results['warmed']} pages ({results['failed']} failed) "
+        f"in {results['seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,16 @@
 """Database connection and session management."""
+import inspect
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 # Create async engine with PostGIS support
@@ -30,6 +37,48 @@ class Base(DeclarativeBase):
     pass
 
 
+# Session.info keys for callbacks waiting on, and released by, a commit
+_PENDING_CALLBACKS = "after_commit"
+_COMMITTED_CALLBACKS = "committed"
+
+AfterCommitCallback = Callable[[], Optional[Awaitable[None]]]
+
+
+def run_after_commit(session: AsyncSession, callback: AfterCommitCallback) -> None:
+    """Run a callback once the session's current transaction commits.
+
+    Use this for cache and in-memory invalidation, so a reader cannot
+    refill a cache from rows that are about to change (or be rolled back).
+    Callbacks are dropped if the transaction rolls back. get_db runs them
+    after the request's final commit; other callers use
+    run_committed_callbacks.
+    """
+    session.info.setdefault(_PENDING_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _release_callbacks(session: Session) -> None:
+    committed = session.info.pop(_PENDING_CALLBACKS, [])
+    if committed:
+        session.info.setdefault(_COMMITTED_CALLBACKS, []).extend(committed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_callbacks(session: Session) -> None:
+    session.info.pop(_PENDING_CALLBACKS, None)
+
+
+async def run_committed_callbacks(session: AsyncSession) -> None:
+    """Run the callbacks released by the session's commits so far."""
+    for callback in session.info.pop(_COMMITTED_CALLBACKS, []):
+        try:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"After-commit callback failed: {e}")
+
+
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
     async with async_session_maker() as session:
@@ -41,3 +90,4 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+            await run_committed_callbacks(session)
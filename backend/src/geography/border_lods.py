@@ -0,0 +1,94 @@
+"""Precomputed border geometries at fixed simplification levels.
+
+Border endpoints accept a `simplify` tolerance. Rather than run
+ST_SimplifyPreserveTopology on every row of every request, requests snap
+to the nearest of LOD_TOLERANCES and read `country_border_lods`, which
+this module fills offline. Borders that share an edge are simplified
+together with ST_CoverageSimplify (PostGIS 3.4+), one coverage per border
+epoch, so neighbouring countries keep a common edge at every level.
+Older PostGIS versions fall back to simplifying each border on its own.
+
+Run after importing borders with:
+    python -m src.geography.border_lods
+"""
+import asyncio
+import math
+from typing import Optional
+
+from sqlalchemy import text
+
+from ..database import async_session_maker
+
+# Tolerances in degrees, from close zoom to whole-globe views
+LOD_TOLERANCES = (0.001, 0.005, 0.01, 0.05, 0.1)
+
+# Simplify each epoch's borders as one coverage; a border is taken from the
+# epoch it starts in, together with the neighbours it had then
+COVERAGE_LOD_SQL = """
+    INSERT INTO country_border_lods (border_id, tolerance, geometry)
+    SELECT id, :tolerance, ST_Multi(ST_CollectionExtract(ST_MakeValid(geom), 3))
+    FROM (
+        SELECT b.id, b.valid_from, e.epoch,
+               ST_CoverageSimplify(b.geometry, :tolerance) OVER (PARTITION BY e.epoch) AS geom
+        FROM (SELECT DISTINCT valid_from AS epoch FROM country_borders) e
+        JOIN country_borders b
+          ON b.valid_from <= e.epoch AND (b.valid_to IS NULL OR b.valid_to >= e.epoch)
+    ) s
+    WHERE valid_from = epoch AND geom IS NOT NULL AND NOT ST_IsEmpty(geom)
+"""
+
+PER_BORDER_LOD_SQL = """
+    INSERT INTO country_border_lods (border_id, tolerance, geometry)
+    SELECT id, :tolerance,
+           ST_Multi(ST_CollectionExtract(
+               ST_MakeValid(ST_SimplifyPreserveTopology(geometry, :tolerance)), 3
+           ))
+    FROM country_borders
+"""
+
+
+def snap_tolerance(simplify: Optional[float]) -> Optional[float]:
+    """Snap a requested tolerance to the nearest precomputed level.
+
+    Levels are compared on a log scale, since each is a zoom step. None or
+    0 means full-resolution geometry.
+    """
+    if not simplify or simplify <= 0:
+        return None
+    return min(LOD_TOLERANCES, key=lambda level: abs(math.log(level / simplify)))
+
+
+async def build_border_lods() -> dict:
+    """Recompute every level of country_border_lods in one transaction.
+
+    Returns the number of rows written per tolerance.
+    """
+    counts = {}
+    async with async_session_maker() as session:
+        has_coverage = await session.scalar(
+            text("SELECT to_regproc('st_coveragesimplify') IS NOT NULL")
+        )
+        sql = COVERAGE_LOD_SQL if has_coverage else PER_BORDER_LOD_SQL
+
+        await session.execute(text("DELETE FROM country_border_lods"))
+        for tolerance in LOD_TOLERANCES:
+            result = await session.execute(text(sql), {"tolerance": tolerance})
+            counts[tolerance] = result.rowcount
+        await session.commit()
+    return counts
+
+
+async def main():
+    print("=" * 60)
+    print("BUILDING BORDER LEVELS OF DETAIL")
+    print("=" * 60)
+
+    counts = await build_border_lods()
+
+    for tolerance, count in counts.items():
+        print(f"  tolerance {tolerance}: {count} borders")
+    print(f"BUILT: {len(counts)} levels")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""Border change-point index and per-epoch snapshot cache.
+
+The set of countries and borders valid on a date only changes on the
+dates where some row starts or ends, a few hundred over 1886-2019.
+BorderEpochs keeps those change points sorted, so any date maps to its
+epoch (the last change point on or before it) with a bisect. Serialized
+border collections are cached per epoch and simplification, so moving the
+timeline slider within an epoch never reaches the database.
+"""
+import asyncio
+import bisect
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from sqlalchemy import text
+
+from ..cache import CacheTTL
+from ..core.http_cache import CachedBody
+from ..core.snapshot import InMemorySnapshot
+from ..database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Total serialized snapshot bytes kept per worker
+DEFAULT_SNAPSHOT_BYTES = 128 * 1024 * 1024
+
+# valid_to is inclusive, so a row stops applying the day after it
+CHANGE_POINTS_SQL = """
+    SELECT valid_from AS d FROM countries
+    UNION SELECT valid_to + 1 FROM countries WHERE valid_to IS NOT NULL
+    UNION SELECT valid_from FROM country_borders
+    UNION SELECT valid_to + 1 FROM country_borders WHERE valid_to IS NOT NULL
+    ORDER BY d
+"""
+
+
+class BorderEpochs(InMemorySnapshot):
+    """Sorted border change points plus an LRU of serialized snapshots.
+
+    Every rebuild of the change points also drops the snapshots, so edits
+    to border geometry show up after `mark_stale()` or the refresh
+    interval even when no dates changed.
+    """
+
+    name = "Border epochs"
+
+    def __init__(
+        self,
+        max_age_seconds: int = CacheTTL.LONG,
+        max_bytes: int = DEFAULT_SNAPSHOT_BYTES,
+    ):
+        super().__init__(max_age_seconds)
+        self.max_bytes = max_bytes
+        self._change_points: List[date] = []
+        self._snapshots: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._snapshot_bytes = 0
+        self._build_locks: Dict[Hashable, asyncio.Lock] = {}
+        # Bumped on every rebuild so snapshots begun before it are discarded
+        self.version = 0
+
+    @property
+    def epoch_count(self) -> int:
+        return len(self._change_points)
+
+    def build(self, change_points: Iterable[date]) -> None:
+        """Replace the change points and drop every cached snapshot."""
+        self._change_points = sorted(set(change_points))
+        self._snapshots = OrderedDict()
+        self._snapshot_bytes = 0
+        # Keys name epochs of the old change points, so their locks go too
+        self._build_locks = {}
+        self.version += 1
+        self._mark_built()
+
+    def epoch_for(self, target: date) -> Optional[date]:
+        """Return the change point whose epoch contains target.
+
+        None means target is before any border exists.
+        """
+        i = bisect.bisect_right(self._change_points, target)
+        return self._change_points[i - 1] if i else None
+
+    def get_snapshot(self, key: Hashable) -> Optional[CachedBody]:
+        cached = self._snapshots.get(key)
+        if cached is not None:
+            self._snapshots.move_to_end(key)
+        return cached
+
+    def put_snapshot(self, key: Hashable, cached: CachedBody, version: int) -> None:
+        """Store a snapshot built while `version` was current."""
+        if version != self.version:
+            return
+        previous = self._snapshots.pop(key, None)
+        if previous is not None:
+            self._snapshot_bytes -= previous.size
+        self._snapshots[key] = cached
+        self._snapshot_bytes += cached.size
+        while self._snapshot_bytes > self.max_bytes and len(self._snapshots) > 1:
+            _, evicted = self._snapshots.popitem(last=False)
+            self._snapshot_bytes -= evicted.size
+
+    def build_lock(self, key: Hashable) -> asyncio.Lock:
+        """Lock that lets only one request build a given snapshot.
+
+        Keys must come from a bounded set, so tolerances are snapped to a
+        LOD level (see border_lods.snap_tolerance) before they are used.
+        """
+        lock = self._build_locks.get(key)
+        if lock is None:
+            lock = self._build_locks[key] = asyncio.Lock()
+        return lock
+
+    def stats(self) -> dict:
+        return {
+            "epochs": len(self._change_points),
+            "snapshots": len(self._snapshots),
+            "bytes": self._snapshot_bytes,
+        }
+
+    async def _load(self) -> None:
+        async with async_session_maker() as session:
+            result = await session.execute(text(CHANGE_POINTS_SQL))
+            self.build(row.d for row in result)
+        logger.info(f"Border epoch index rebuilt with {self.epoch_count} change points")
+
+
+# Global border epoch index
+_epochs: Optional[BorderEpochs] = None
+
+
+def get_border_epochs() -> BorderEpochs:
+    """Get or create the global border epoch index."""
+    global _epochs
+    if _epochs is None:
+        _epochs = BorderEpochs()
+    return _epochs
@@ -0,0 +1,186 @@
+"""In-process gazetteer over WORLD_CITIES.
+
+Globe, conflict and search endpoints geocode location and country names
+against the static city list. Gazetteer indexes it once per worker:
+
+- normalized city name -> city (hash lookup, with fallbacks memoized)
+- country -> its cities and their coordinate sums, for conflict centroids
+- a uniform grid over 3D unit vectors for exact nearest-city queries,
+  which avoids special cases at the poles and the antimeridian
+"""
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cities import WORLD_CITIES
+
+EARTH_RADIUS_KM = 6371.0
+
+# Grid cell edge in unit-vector space (a chord of ~640 km)
+CELL_SIZE = 0.1
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = _PUNCTUATION.sub(" ", name.lower())
+    return _SPACES.sub(" ", name).strip()
+
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+class Gazetteer:
+    """Name, country and nearest-neighbour indexes over a city list."""
+
+    def __init__(self, cities: Iterable[dict]):
+        self.cities: List[dict] = list(cities)
+        self._by_name: Dict[str, dict] = {}
+        self._by_country: Dict[str, List[dict]] = defaultdict(list)
+        self._country_sums: Dict[str, Tuple[float, float, int]] = {}
+        self._grid: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        self._vectors: List[Tuple[float, float, float]] = []
+        # Results of fallback lookups, including misses
+        self._memo: Dict[str, Optional[dict]] = {}
+
+        for i, city in enumerate(self.cities):
+            # Cities listed under several types keep their first entry
+            self._by_name.setdefault(normalize_name(city["name"]), city)
+            self._by_country[city["country"]].append(city)
+            lat_sum, lng_sum, count = self._country_sums.get(city["country"], (0.0, 0.0, 0))
+            self._country_sums[city["country"]] = (
+                lat_sum + city["lat"], lng_sum + city["lng"], count + 1
+            )
+
+            vector = _unit_vector(city["lat"], city["lng"])
+            self._vectors.append(vector)
+            self._grid[self._cell(vector)].append(i)
+
+        self._country_names = {normalize_name(c): c for c in self._by_country}
+        self._by_country_normalized = {normalize_name(c): v for c, v in self._by_country.items()}
+        self._mention_memo: Dict[str, Optional[dict]] = {}
+
+    @staticmethod
+    def _cell(vector: Tuple[float, float, float]) -> Tuple[int, int, int]:
+        return tuple(math.floor(v / CELL_SIZE) for v in vector)
+
+    def city(self, name: str) -> Optional[dict]:
+        """Exact (normalized) city name lookup."""
+        return self._by_name.get(normalize_name(name))
+
+    def cities_in(self, country: str) -> List[dict]:
+        return self._by_country.get(country, [])
+
+    def geocode(self, location_name: str) -> Optional[dict]:
+        """Find the city for a free-text location name.
+
+        Tries the exact name, then the leading part of names like
+        "Paris, France", then a country name (its capital), and last the
+        substring match the endpoints used before. Fallback results are
+        memoized, so each distinct name is scanned at most once.
+        """
+        key = normalize_name(location_name)
+        if not key:
+            return None
+        city = self._by_name.get(key)
+        if city is not None:
+            return city
+        if key in self._memo:
+            return self._memo[key]
+
+        head = normalize_name(location_name.split(",")[0])
+        city = self._by_name.get(head)
+        if city is None and key in self._country_names:
+            city = self.capital(self._country_names[key])
+        if city is None:
+            city = next((c for name, c in self._by_name.items() if key in name), None)
+        self._memo[key] = city
+        return city
+
+    def mentioned_country(self, text: str) -> Optional[dict]:
+        """First listed city of the first country named anywhere in text.
+
+        Countries are checked in list order, as for names like
+        "Iraq War" or "Soviet-Afghan War". Results are memoized per text.
+        """
+        key = normalize_name(text)
+        if key in self._mention_memo:
+            return self._mention_memo[key]
+        city = next(
+            (cities[0] for name, cities in self._by_country_normalized.items() if name in key),
+            None,
+        )
+        self._mention_memo[key] = city
+        return city
+
+    def capital(self, country: str) -> Optional[dict]:
+        cities = self.cities_in(country)
+        return next((c for c in cities if c["type"] == "capital"), cities[0] if cities else None)
+
+    def centroid(self, countries: Iterable[str]) -> Tuple[Optional[float], Optional[float]]:
+        """Mean coordinates of every listed city in the given countries."""
+        lat_sum = lng_sum = 0.0
+        count = 0
+        for country in set(countries):
+            sums = self._country_sums.get(country)
+            if sums:
+                lat_sum += sums[0]
+                lng_sum += sums[1]
+                count += sums[2]
+        if not count:
+            return None, None
+        return lat_sum / count, lng_sum / count
+
+    def nearest(self, lat: float, lng: float, max_km: Optional[float] = None) -> Optional[dict]:
+        """Closest city by great-circle distance, or None beyond max_km.
+
+        Searches grid shells outwards from the query cell. Any point in
+        shell r+1 or beyond is at least r * CELL_SIZE away, so the search
+        stops once the best chord found is within that bound.
+        """
+        if not self.cities:
+            return None
+        query = _unit_vector(lat, lng)
+        cx, cy, cz = self._cell(query)
+        best, best_chord = None, math.inf
+        max_shell = int(2 / CELL_SIZE) + 1
+
+        for r in range(max_shell + 1):
+            for dx, dy, dz in product(range(-r, r + 1), repeat=3):
+                if max(abs(dx), abs(dy), abs(dz)) != r:
+                    continue
+                for i in self._grid.get((cx + dx, cy + dy, cz + dz), ()):
+                    chord = math.dist(query, self._vectors[i])
+                    if chord < best_chord:
+                        best, best_chord = i, chord
+            if best is not None and best_chord <= r * CELL_SIZE:
+                break
+
+        if max_km is not None and _chord_to_km(best_chord) > max_km:
+            return None
+        return self.cities[best]
+
+
+# Global gazetteer
+_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Get or build the global gazetteer."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(WORLD_CITIES)
+    return _gazetteer
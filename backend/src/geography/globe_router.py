@@ -13,13 +13,18 @@ from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 
 from ..database import get_db
-from ..cache import cache_get, cache_set, make_cache_key, CachePrefix, CacheTTL
+from ..cache import cache_fetch, cache_tag, make_cache_key, CachePrefix, CacheTTL
 from .cities import WORLD_CITIES
+from .gazetteer import get_gazetteer
+from .heatmap import DEFAULT_RESOLUTION, HEATMAP_TYPES, build_heatmap, heatmap_tags
 from .models import Country, CountryCapital
 from ..events.models import Event, Conflict
 
 router = APIRouter()
 
+# Events without a primary country take the country of a city this close
+NEAREST_CITY_KM = 250
+
 
 class CityData(BaseModel):
     """City data optimized for globe rendering."""
@@ -57,10 +62,11 @@ class EventGlobeData(BaseModel):
 
 
 class HeatmapData(BaseModel):
-    """Heatmap point for density visualization."""
+    """Heatmap cell for density visualization."""
     lat: float
     lng: float
-    intensity: float
+    intensity: float  # Cell weight relative to the heaviest cell
+    count: int = 1  # Points aggregated into the cell
 
 
 @router.get("/cities", response_model=list[CityData])
@@ -88,25 +94,21 @@ async def get_cities(
         importance_min=importance_min,
     )
 
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    # Filter cities
-    filtered_cities = WORLD_CITIES
+    async def compute():
+        # Filter cities
+        filtered_cities = WORLD_CITIES
 
-    if type_filter:
-        filtered_cities = [c for c in filtered_cities if c["type"] == type_filter]
+        if type_filter:
+            filtered_cities = [c for c in filtered_cities if c["type"] == type_filter]
 
-    if importance_min > 1:
-        filtered_cities = [c for c in filtered_cities if c["importance"] >= importance_min]
+        if importance_min > 1:
+            filtered_cities = [c for c in filtered_cities if c["importance"] >= importance_min]
 
-    result = [CityData(**city) for city in filtered_cities]
+        result = [CityData(**city) for city in filtered_cities]
 
-    # Cache result
-    await cache_set(cache_key, [r.model_dump() for r in result], CacheTTL.DAY)
+        return [r.model_dump() for r in result]
 
-    return result
+    return await cache_fetch(cache_key, compute, CacheTTL.DAY)
 
 
 @router.get("/conflicts/active", response_model=list[ConflictGlobeData])
@@ -130,66 +132,54 @@ async def get_active_conflicts_globe(
         limit=limit,
     )
 
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    query = select(Conflict).options(selectinload(Conflict.participants))
-
-    if year:
-        target_date = date(year, 7, 1)
-        query = query.where(
-            and_(
-                Conflict.start_date.isnot(None),
-                Conflict.start_date <= target_date,
-                or_(
-                    Conflict.end_date.is_(None),
-                    Conflict.end_date >= target_date,
-                ),
+    async def compute():
+        query = select(Conflict).options(selectinload(Conflict.participants))
+
+        if year:
+            target_date = date(year, 7, 1)
+            query = query.where(
+                and_(
+                    Conflict.start_date.isnot(None),
+                    Conflict.start_date <= target_date,
+                    or_(
+                        Conflict.end_date.is_(None),
+                        Conflict.end_date >= target_date,
+                    ),
+                )
             )
-        )
-    else:
-        query = query.where(Conflict.start_date.isnot(None))
-
-    result = await db.execute(query.order_by(Conflict.start_date.desc()).limit(limit))
-    conflicts = result.scalars().all()
-
-    # Build response with coordinates from participants
-    conflict_data = []
-    for conflict in conflicts:
-        countries = [
-            p.actor_name or f"Country {p.country_id}"
-            for p in conflict.participants
-        ]
-
-        # Get average coordinates from cities in participating countries
-        avg_lat = None
-        avg_lng = None
-        coords = []
-        for city in WORLD_CITIES:
-            if city["country"] in countries:
-                coords.append((city["lat"], city["lng"]))
-
-        if coords:
-            avg_lat = sum(c[0] for c in coords) / len(coords)
-            avg_lng = sum(c[1] for c in coords) / len(coords)
-
-        conflict_data.append(ConflictGlobeData(
-            id=str(conflict.id),
-            name=conflict.name,
-            start_year=conflict.start_date.year if conflict.start_date else None,
-            end_year=conflict.end_date.year if conflict.end_date else None,
-            type=conflict.conflict_type,
-            intensity=conflict.intensity,
-            lat=avg_lat,
-            lng=avg_lng,
-            countries=countries,
-        ))
-
-    # Cache result
-    await cache_set(cache_key, [c.model_dump() for c in conflict_data], CacheTTL.LONG)
-
-    return conflict_data
+        else:
+            query = query.where(Conflict.start_date.isnot(None))
+
+        result = await db.execute(query.order_by(Conflict.start_date.desc()).limit(limit))
+        conflicts = result.scalars().all()
+
+        # Build response with coordinates from participants
+        gazetteer = get_gazetteer()
+        conflict_data = []
+        for conflict in conflicts:
+            countries = [
+                p.actor_name or f"Country {p.country_id}"
+                for p in conflict.participants
+            ]
+
+            # Get average coordinates from cities in participating countries
+            avg_lat, avg_lng = gazetteer.centroid(countries)
+
+            conflict_data.append(ConflictGlobeData(
+                id=str(conflict.id),
+                name=conflict.name,
+                start_year=conflict.start_date.year if conflict.start_date else None,
+                end_year=conflict.end_date.year if conflict.end_date else None,
+                type=conflict.conflict_type,
+                intensity=conflict.intensity,
+                lat=avg_lat,
+                lng=avg_lng,
+                countries=countries,
+            ))
+
+        return [c.model_dump() for c in conflict_data]
+
+    return await cache_fetch(cache_key, compute, CacheTTL.LONG, tags=["conflicts", "countries"])
 
 
 @router.get("/events/year", response_model=list[EventGlobeData])
@@ -215,60 +205,61 @@ async def get_events_for_year(
         limit=limit,
     )
 
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    query = select(Event).where(
-        and_(
-            func.extract("year", Event.start_date) == year,
-            Event.location.isnot(None),
+    async def compute():
+        # Sargable year range on start_date, coordinates read straight from
+        # the point geometry
+        query = (
+            select(
+                Event.id,
+                Event.title,
+                Event.start_date,
+                Event.category,
+                Event.importance,
+                func.ST_Y(Event.location).label("lat"),
+                func.ST_X(Event.location).label("lng"),
+                Country.name_en.label("country"),
+            )
+            .outerjoin(Country, Country.id == Event.primary_country_id)
+            .where(
+                and_(
+                    Event.start_date >= date(year, 1, 1),
+                    Event.start_date < date(year + 1, 1, 1),
+                    Event.location.isnot(None),
+                )
+            )
         )
-    )
 
-    if category:
-        query = query.where(Event.category == category)
-
-    result = await db.execute(query.order_by(Event.start_date).limit(limit))
-    events = result.scalars().all()
-
-    event_data = []
-    for event in events:
-        # Extract coordinates from PostGIS geometry if available
-        lat = None
-        lng = None
-        if event.location:
-            # PostGIS geometry is returned as WKT, try to extract coordinates
-            try:
-                # The location column contains geometry data
-                # This is a simplified approach; in production use ST_AsText()
-                pass
-            except Exception:
-                pass
-
-        # Fallback: try to find city by location name
-        if not lat and event.location_name:
-            for city in WORLD_CITIES:
-                if event.location_name.lower() in city["name"].lower():
-                    lat = city["lat"]
-                    lng = city["lng"]
-                    break
-
-        event_data.append(EventGlobeData(
-            id=str(event.id),
-            title=event.title,
-            year=event.start_date.year if event.start_date else None,
-            category=event.category,
-            lat=lat,
-            lng=lng,
-            country=None,  # Would need to join with countries table
-            importance=event.importance,
-        ))
-
-    # Cache result
-    await cache_set(cache_key, [e.model_dump() for e in event_data], CacheTTL.LONG)
-
-    return event_data
+        if category:
+            query = query.where(Event.category == category)
+
+        result = await db.execute(query.order_by(Event.start_date).limit(limit))
+
+        gazetteer = get_gazetteer()
+        event_data = []
+        for event in result.all():
+            lat, lng, country = event.lat, event.lng, event.country
+
+            # Fall back to the closest listed city for the country name
+            if country is None and lat is not None:
+                city = gazetteer.nearest(lat, lng, max_km=NEAREST_CITY_KM)
+                if city:
+                    country = city["country"]
+
+            event_data.append(EventGlobeData(
+                id=str(event.id),
+                title=event.title,
+                year=event.start_date.year if event.start_date else None,
+                category=event.category,
+                lat=lat,
+                lng=lng,
+                country=country,
+                importance=event.importance,
+            ))
+
+        return [e.model_dump() for e in event_data]
+
+    tags = [cache_tag("events", "year", year), "countries"]
+    return await cache_fetch(cache_key, compute, CacheTTL.LONG, tags=tags)
 
 
 @router.get("/liberation-data", response_model=dict)
@@ -288,34 +279,30 @@ async def get_liberation_data(
     """
     response.headers["Cache-Control"] = "public, max-age=21600"
 
-    cache_key = make_cache_key(prefix=CachePrefix.GEOJSON, endpoint="liberation_combined")
-
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
+    cache_key = make_cache_key(prefix=CachePrefix.GEOJSON, endpoint="liberation_globe")
 
-    # For now, return structure with placeholder data
-    # Would be extended with actual database queries
-    liberation_data = {
-        "occupations": [],
-        "resistance_movements": [],
-        "conflicts": [],
-        "events": [],
-        "metadata": {
-            "total_regions": 0,
-            "total_cities": 0,
-        },
-    }
+    async def compute():
+        # For now, return structure with placeholder data
+        # Would be extended with actual database queries
+        liberation_data = {
+            "occupations": [],
+            "resistance_movements": [],
+            "conflicts": [],
+            "events": [],
+            "metadata": {
+                "total_regions": 0,
+                "total_cities": 0,
+            },
+        }
 
-    # Get liberation struggle cities
-    liberation_cities = [c for c in WORLD_CITIES if c["type"] in ["liberation", "occupation"]]
-    liberation_data["cities"] = [CityData(**c).model_dump() for c in liberation_cities]
-    liberation_data["metadata"]["total_cities"] = len(liberation_cities)
+        # Get liberation struggle cities
+        liberation_cities = [c for c in WORLD_CITIES if c["type"] in ["liberation", "occupation"]]
+        liberation_data["cities"] = [CityData(**c).model_dump() for c in liberation_cities]
+        liberation_data["metadata"]["total_cities"] = len(liberation_cities)
 
-    # Cache result
-    await cache_set(cache_key, liberation_data, CacheTTL.VERY_LONG)
+        return liberation_data
 
-    return liberation_data
+    return await cache_fetch(cache_key, compute, CacheTTL.VERY_LONG)
 
 
 @router.get("/heatmap", response_model=list[HeatmapData])
@@ -323,65 +310,38 @@ async def get_heatmap_data(
     response: Response,
     type_filter: str = Query("conflicts", description="Type: conflicts, events, protests"),
     year: Optional[int] = Query(None, ge=1800, le=2100),
+    resolution: float = Query(
+        DEFAULT_RESOLUTION, ge=0.25, le=30, description="Grid cell size in degrees"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     """Get density heatmap data for visualization.
 
-    Generates heatmap points based on event/conflict density for specified type.
+    Aggregates event, protest or conflict locations into grid cells,
+    weighted by importance or intensity.
     Cached for 1 hour.
 
     Parameters:
     - type_filter: Type of data to generate heatmap for (conflicts, events, protests)
     - year: Optional year filter
+    - resolution: Grid cell size in degrees
     """
     response.headers["Cache-Control"] = "public, max-age=3600"
 
+    if type_filter not in HEATMAP_TYPES:
+        return []
+
     cache_key = make_cache_key(
         prefix=CachePrefix.GEOJSON,
         endpoint="heatmap",
         type_filter=type_filter,
         year=year,
+        resolution=resolution,
     )
 
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    heatmap_points = []
-
-    if type_filter == "conflicts":
-        # Generate heatmap from conflict cities
-        conflict_cities = [c for c in WORLD_CITIES if c["type"] == "conflict"]
-        for city in conflict_cities:
-            # Intensity based on importance score (1-10)
-            heatmap_points.append(HeatmapData(
-                lat=city["lat"],
-                lng=city["lng"],
-                intensity=city["importance"] / 10.0,
-            ))
-
-    elif type_filter == "protests":
-        # Generate heatmap from protest cities
-        protest_cities = [c for c in WORLD_CITIES if c["type"] in ["protest", "labor"]]
-        for city in protest_cities:
-            heatmap_points.append(HeatmapData(
-                lat=city["lat"],
-                lng=city["lng"],
-                intensity=city["importance"] / 10.0,
-            ))
-
-    elif type_filter == "events":
-        # Would generate from events in database
-        # For now use all significant cities
-        significant_cities = [c for c in WORLD_CITIES if c["importance"] >= 7]
-        for city in significant_cities:
-            heatmap_points.append(HeatmapData(
-                lat=city["lat"],
-                lng=city["lng"],
-                intensity=city["importance"] / 10.0,
-            ))
-
-    # Cache result
-    await cache_set(cache_key, [p.model_dump() for p in heatmap_points], CacheTTL.LONG)
-
-    return heatmap_points
+    return await cache_fetch(
+        cache_key,
+        lambda: build_heatmap(db, type_filter, year, resolution),
+        CacheTTL.LONG,
+        tags=heatmap_tags(type_filter, year),
+    )
@@ -0,0 +1,181 @@
+"""Heatmap aggregation over events, protests and conflicts.
+
+Locations are loaded for a year (or all years), weighted, and binned into
+a regular lat/lng grid with numpy. Each occupied cell is returned once,
+placed at the weighted mean of its points, so the globe renders a few
+hundred cells instead of every event.
+
+- events: located events, weighted by importance
+- protests: located protest and strike events, plus located strikes
+- conflicts: the participant-country centroid of each conflict (as on
+  the conflict map), weighted by intensity
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import cache_tag
+from ..events.models import Conflict, ConflictParticipant, Event
+from ..labor.models import Strike
+from .gazetteer import get_gazetteer
+from .models import Country
+
+HEATMAP_TYPES = ("conflicts", "events", "protests")
+
+DEFAULT_RESOLUTION = 2.0
+DEFAULT_WEIGHT = 5.0
+PROTEST_EVENT_TYPES = ("protest", "strike")
+# UCDP imports use "war" and "minor"; older scraped data "major" and "minor"
+CONFLICT_WEIGHTS = {"war": 10.0, "major": 10.0, "minor": 3.0}
+
+Points = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def bin_points(
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    weights: Sequence[float],
+    resolution: float = DEFAULT_RESOLUTION,
+) -> List[dict]:
+    """Aggregate weighted points into grid cells of `resolution` degrees.
+
+    Returns one dict per occupied cell with the weighted mean position,
+    the point count and an intensity scaled so the heaviest cell is 1.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if not len(lats):
+        return []
+
+    columns = int(np.ceil(360 / resolution))
+    rows = np.clip(((lats + 90) // resolution).astype(np.int64), 0, None)
+    cols = np.clip(((lngs + 180) // resolution).astype(np.int64), 0, columns - 1)
+    cells, inverse = np.unique(rows * columns + cols, return_inverse=True)
+
+    total = np.bincount(inverse, weights=weights, minlength=len(cells))
+    counts = np.bincount(inverse, minlength=len(cells))
+    # Zero-weight cells fall back to the unweighted mean
+    divisor = np.where(total > 0, total, counts)
+    w = np.where(total[inverse] > 0, weights, 1.0)
+    lat = np.bincount(inverse, weights=lats * w, minlength=len(cells)) / divisor
+    lng = np.bincount(inverse, weights=lngs * w, minlength=len(cells)) / divisor
+    peak = total.max() or 1.0
+
+    return [
+        {
+            "lat": round(float(lat[i]), 4),
+            "lng": round(float(lng[i]), 4),
+            "intensity": round(float(total[i] / peak), 4),
+            "count": int(counts[i]),
+        }
+        for i in np.argsort(-total, kind="stable")
+    ]
+
+
+def _year_range(column, year: Optional[int]):
+    return and_(column >= date(year, 1, 1), column < date(year + 1, 1, 1))
+
+
+def _as_arrays(rows: List[Tuple[float, float, float]]) -> Points:
+    if not rows:
+        return np.empty(0), np.empty(0), np.empty(0)
+    lats, lngs, weights = zip(*rows)
+    return np.array(lats, dtype=float), np.array(lngs, dtype=float), np.array(weights, dtype=float)
+
+
+def conflict_weight(intensity: Optional[str]) -> float:
+    """Heatmap weight for a conflict intensity value."""
+    return CONFLICT_WEIGHTS.get((intensity or "").strip().lower(), DEFAULT_WEIGHT)
+
+
+async def _event_points(
+    db: AsyncSession, year: Optional[int], event_types: Optional[Sequence[str]] = None
+) -> list:
+    query = select(
+        func.ST_Y(Event.location),
+        func.ST_X(Event.location),
+        func.coalesce(Event.importance, DEFAULT_WEIGHT),
+    ).where(Event.location.isnot(None))
+    if year is not None:
+        query = query.where(_year_range(Event.start_date, year))
+    if event_types:
+        query = query.where(Event.event_type.in_(event_types))
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+async def _strike_points(db: AsyncSession, year: Optional[int]) -> list:
+    query = select(
+        func.ST_Y(Strike.location), func.ST_X(Strike.location)
+    ).where(Strike.location.isnot(None))
+    if year is not None:
+        query = query.where(_year_range(Strike.start_date, year))
+    return [(lat, lng, DEFAULT_WEIGHT) for lat, lng in (await db.execute(query)).all()]
+
+
+async def _conflict_points(db: AsyncSession, year: Optional[int]) -> list:
+    query = (
+        select(
+            Conflict.id,
+            Conflict.intensity,
+            func.coalesce(Country.name_en, ConflictParticipant.actor_name),
+        )
+        .join(ConflictParticipant, ConflictParticipant.conflict_id == Conflict.id)
+        .outerjoin(Country, Country.id == ConflictParticipant.country_id)
+        .where(Conflict.start_date.isnot(None))
+    )
+    if year is not None:
+        target_date = date(year, 7, 1)
+        query = query.where(
+            Conflict.start_date <= target_date,
+            or_(Conflict.end_date.is_(None), Conflict.end_date >= target_date),
+        )
+
+    conflicts: Dict[object, Tuple[Optional[str], List[str]]] = {}
+    for conflict_id, intensity, country in (await db.execute(query)).all():
+        conflicts.setdefault(conflict_id, (intensity, []))[1].append(country)
+
+    gazetteer = get_gazetteer()
+    points = []
+    for intensity, countries in conflicts.values():
+        lat, lng = gazetteer.centroid(c for c in countries if c)
+        if lat is not None:
+            points.append((lat, lng, conflict_weight(intensity)))
+    return points
+
+
+async def load_points(db: AsyncSession, type_filter: str, year: Optional[int] = None) -> Points:
+    """Load (lats, lngs, weights) for one heatmap type."""
+    if type_filter == "events":
+        rows = await _event_points(db, year)
+    elif type_filter == "protests":
+        rows = await _event_points(db, year, PROTEST_EVENT_TYPES) + await _strike_points(db, year)
+    elif type_filter == "conflicts":
+        rows = await _conflict_points(db, year)
+    else:
+        rows = []
+    return _as_arrays(rows)
+
+
+def heatmap_tags(type_filter: str, year: Optional[int] = None) -> List[str]:
+    """Cache tags for a heatmap: the tables it reads, narrowed to the year."""
+    if type_filter == "conflicts":
+        return ["conflicts", "countries"]
+    tags = [cache_tag("events", "year", year) if year is not None else "events"]
+    if type_filter == "protests":
+        tags.append("strikes")
+    return tags
+
+
+async def build_heatmap(
+    db: AsyncSession,
+    type_filter: str,
+    year: Optional[int] = None,
+    resolution: float = DEFAULT_RESOLUTION,
+) -> List[dict]:
+    """Weighted heatmap cells for a type and year."""
+    lats, lngs, weights = await load_points(db, type_filter, year)
+    return bin_points(lats, lngs, weights, resolution)
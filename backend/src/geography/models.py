@@ -26,6 +26,8 @@ class Country(Base):
     iso_alpha2: Mapped[Optional[str]] = mapped_column(String(2))
     iso_alpha3: Mapped[Optional[str]] = mapped_column(String(3))
     wikidata_id: Mapped[Optional[str]] = mapped_column(String(20))
+    # World Bank ISO3 code, resolved on import (see geography/worldbank.py)
+    worldbank_code: Mapped[Optional[str]] = mapped_column(String(3), index=True)
     
     # Names
     name_en: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -100,6 +102,29 @@ class CountryBorder(Base):
     country: Mapped["Country"] = relationship("Country", back_populates="borders")
 
 
+class CountryBorderLOD(Base):
+    """Border geometry simplified to one fixed tolerance (see border_lods)."""
+
+    __tablename__ = "country_border_lods"
+
+    border_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("country_borders.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Simplification tolerance in degrees; one of border_lods.LOD_TOLERANCES
+    tolerance: Mapped[float] = mapped_column(Float, primary_key=True)
+
+    geometry = mapped_column(
+        Geometry(geometry_type="MULTIPOLYGON", srid=4326, spatial_index=False),
+        nullable=False,
+    )
+
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class CountryCapital(Base):
     """Country capital with temporal validity."""
     
@@ -11,14 +11,15 @@ OPTIMIZATION NOTES:
 - All queries use selectinload for N+1 prevention
 - Response compression enabled via GZipMiddleware
 """
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Response
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..core.exceptions import NotFoundError
+from ..core.http_cache import cached_response
 from ..core.pagination import PaginatedResponse
 from ..database import get_db
 from .schemas import CountryListItem, CountryResponse, GeoJSONFeatureCollection, CountryRelationshipResponse
@@ -71,47 +72,12 @@ async def get_global_country_stats(
     db: AsyncSession = Depends(get_db),
 ) -> List[dict]:
     """Get statistics for all countries for global rankings."""
-    from .economic_router import load_worldbank_data, get_country_code
-    
-    wb_data, _ = load_worldbank_data()
-    
+    from .economic_router import latest_country_stats
+
     result = await db.execute(select(Country).where(Country.entity_type == 'sovereign_state'))
     countries = result.scalars().all()
-    
-    stats = []
-    for country in countries:
-        country_code = get_country_code(country.name_en)
-        
-        stat = {
-            "id": str(country.id),
-            "name": country.name_en,
-            "iso_alpha3": country.iso_alpha3,
-            "gdp": None,
-            "population": None,
-            "military_spending_pct": None,
-        }
-        
-        if country_code and country_code in wb_data:
-            country_wb = wb_data[country_code]
-            for year in range(2023, 2000, -1):
-                year_str = str(year)
-                year_data = country_wb.get("data", {}).get(year_str, {})
-                
-                if stat["gdp"] is None and year_data.get("gdp_current_usd"):
-                    stat["gdp"] = year_data["gdp_current_usd"]
-                
-                if stat["population"] is None and year_data.get("population"):
-                    stat["population"] = year_data["population"]
-                
-                if stat["military_spending_pct"] is None and year_data.get("military_spending_gdp_pct"):
-                    stat["military_spending_pct"] = year_data["military_spending_gdp_pct"]
-                
-                if all([stat["gdp"], stat["population"], stat["military_spending_pct"]]):
-                    break
-        
-        stats.append(stat)
-    
-    return stats
+
+    return latest_country_stats(countries)
 
 
 @router.get("/countries/{country_id}", response_model=CountryResponse)
@@ -131,11 +97,14 @@ async def get_country(
 
 @router.get("/borders/geojson", response_model=GeoJSONFeatureCollection)
 async def get_borders_geojson(
-    response: Response,
+    request: Request,
     year: int = Query(..., ge=1800, le=2100, description="Year for borders"),
     simplify: Optional[float] = Query(
-        None, ge=0, le=1, description="Simplification tolerance (0-1)"
+        None, ge=0, le=1, description=(
+            "Simplification tolerance (0-1), snapped to the nearest precomputed level"
+        ),
     ),
+    format: Literal["geojson", "topojson"] = Query("geojson"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -143,12 +112,14 @@ async def get_borders_geojson(
 
     - **year**: The year to get borders for
     - **simplify**: Optional simplification tolerance for reducing geometry complexity
+    - **format**: `topojson` returns a quantized topology with shared arcs
+
+    Years within the same border epoch share one cached snapshot (and ETag).
     """
-    # Cache for 1 hour - borders don't change often
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    
     service = GeographyService(db)
-    return await service.get_borders_geojson(year=year, simplify=simplify)
+    snapshot = await service.get_borders_geojson(year=year, simplify=simplify, format=format)
+    # Cache for 1 hour - borders don't change often
+    return cached_response(request, snapshot, max_age=3600)
 
 
 @router.get("/countries/{country_id}/borders")
@@ -169,10 +140,13 @@ async def get_country_border(
 
 @router.get("/borders/all")
 async def get_all_borders_geojson(
-    response: Response,
+    request: Request,
     simplify: Optional[float] = Query(
-        0.01, ge=0, le=1, description="Simplification tolerance (0-1)"
+        0.01, ge=0, le=1, description=(
+            "Simplification tolerance (0-1), snapped to the nearest precomputed level"
+        ),
     ),
+    format: Literal["geojson", "topojson"] = Query("geojson"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -180,12 +154,14 @@ async def get_all_borders_geojson(
 
     Returns all borders at once, allowing the frontend to filter by year
     without additional API calls. This enables fluid time slider animation.
+    The collection is streamed and cached by clients for 24 hours.
+    `format=topojson` returns a quantized topology with shared arcs instead.
     """
-    # Cache for 24 hours - this is static data
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    
     service = GeographyService(db)
-    return await service.get_all_borders_geojson(simplify=simplify)
+    if format == "topojson":
+        topology = await service.get_all_borders_topojson(simplify=simplify)
+        return cached_response(request, topology, max_age=86400)
+    return service.get_all_borders_geojson(simplify=simplify)
 
 
 @router.get("/relationships", response_model=list[CountryRelationshipResponse])
@@ -1,6 +1,6 @@
 """Geography business logic."""
 from datetime import date
-from typing import Optional
+from typing import Any, Awaitable, Callable, Hashable, Optional
 from uuid import UUID
 
 from geoalchemy2.functions import ST_AsGeoJSON, ST_SimplifyPreserveTopology
@@ -9,11 +9,73 @@ from sqlalchemy.orm import aliased
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Country, CountryBorder, CountryCapital
+from fastapi.responses import StreamingResponse
+
+from ..core.geojson_stream import feature_collection_response
+from ..core.http_cache import CachedBody
+from ..core.topojson import feature_collection_to_topology
+from .border_lods import snap_tolerance
+from .epochs import get_border_epochs
+from .models import Country, CountryBorder, CountryBorderLOD, CountryCapital
 from .schemas import GeoJSONFeature, GeoJSONFeatureCollection
 import json
 
 
+def _with_border_geometry(query, tolerance: Optional[float]):
+    """Add the GeoJSON border geometry column at a snapped tolerance.
+
+    Simplified levels come from country_border_lods; borders missing
+    there (added since the last LOD build) are simplified on the fly.
+    """
+    if tolerance is None:
+        return query.add_columns(ST_AsGeoJSON(CountryBorder.geometry).label("geometry"))
+    geometry = func.coalesce(
+        CountryBorderLOD.geometry,
+        ST_SimplifyPreserveTopology(CountryBorder.geometry, tolerance),
+    )
+    return query.add_columns(ST_AsGeoJSON(geometry).label("geometry")).outerjoin(
+        CountryBorderLOD,
+        and_(
+            CountryBorderLOD.border_id == CountryBorder.id,
+            CountryBorderLOD.tolerance == tolerance,
+        ),
+    )
+
+
+def _all_borders_query(tolerance: Optional[float]):
+    """Every border row with its country and date range."""
+    query = (
+        select(
+            Country.id,
+            Country.name_en,
+            Country.name_short,
+            Country.iso_alpha2,
+            Country.iso_alpha3,
+            Country.gwcode,
+            Country.entity_type,
+            CountryBorder.valid_from,
+            CountryBorder.valid_to,
+        )
+        .join(CountryBorder, Country.id == CountryBorder.country_id)
+        .order_by(Country.name_en, CountryBorder.valid_from)
+    )
+    return _with_border_geometry(query, tolerance)
+
+
+def _border_properties(row) -> dict:
+    return {
+        "id": str(row.id),
+        "name": row.name_en,
+        "name_short": row.name_short,
+        "iso_alpha2": row.iso_alpha2,
+        "iso_alpha3": row.iso_alpha3,
+        "gwcode": row.gwcode,
+        "entity_type": row.entity_type,
+        "valid_from": row.valid_from.isoformat(),
+        "valid_to": row.valid_to.isoformat() if row.valid_to else None,
+    }
+
+
 class GeographyService:
     """Service for geography operations."""
     
@@ -69,23 +131,61 @@ class GeographyService:
         )
         return result.scalar_one_or_none()
     
+    async def _border_snapshot(
+        self,
+        key: Hashable,
+        build: Callable[[], Awaitable[Any]],
+    ) -> CachedBody:
+        """Serve a snapshot from the border epoch cache, building it once."""
+        epochs = get_border_epochs()
+        cached = epochs.get_snapshot(key)
+        if cached is not None:
+            return cached
+
+        async with epochs.build_lock(key):
+            cached = epochs.get_snapshot(key)
+            if cached is None:
+                version = epochs.version
+                cached = CachedBody.from_data(await build())
+                cached.gzipped()
+                epochs.put_snapshot(key, cached, version)
+        return cached
+
     async def get_borders_geojson(
         self,
         year: int,
         simplify: Optional[float] = None,
-    ) -> GeoJSONFeatureCollection:
-        """Get all borders as GeoJSON for a specific year."""
+        format: str = "geojson",
+    ) -> CachedBody:
+        """Get all borders valid in a year as serialized GeoJSON or TopoJSON.
+
+        Years map to border epochs (see epochs.py) and `simplify` snaps to
+        a precomputed level (see border_lods.py). Each epoch, level and
+        format is queried and serialized once per worker, then served from
+        memory.
+        """
+        epochs = get_border_epochs()
+        await epochs.ensure_fresh()
+
         target_date = date(year, 7, 1)
-        
-        # Build geometry expression
-        if simplify and simplify > 0:
-            geom_expr = ST_AsGeoJSON(
-                ST_SimplifyPreserveTopology(CountryBorder.geometry, simplify)
-            )
-        else:
-            geom_expr = ST_AsGeoJSON(CountryBorder.geometry)
-        
-        # Query borders valid for the target year
+        epoch = epochs.epoch_for(target_date)
+        tolerance = snap_tolerance(simplify)
+
+        async def build():
+            collection = await self._query_borders(epoch or target_date, tolerance)
+            if format == "topojson":
+                return feature_collection_to_topology(collection.model_dump(), "borders")
+            return collection
+
+        return await self._border_snapshot((epoch, tolerance, format), build)
+
+    async def _query_borders(
+        self,
+        target_date: date,
+        tolerance: Optional[float] = None,
+    ) -> GeoJSONFeatureCollection:
+        """Query the borders valid on a date at a precomputed tolerance."""
+        # Query borders valid for the target date
         query = (
             select(
                 Country.id,
@@ -95,7 +195,6 @@ class GeographyService:
                 Country.iso_alpha3,
                 Country.gwcode,
                 Country.entity_type,
-                geom_expr.label("geometry"),
             )
             .join(CountryBorder, Country.id == CountryBorder.country_id)
             .where(
@@ -113,6 +212,7 @@ class GeographyService:
                 )
             )
         )
+        query = _with_border_geometry(query, tolerance)
         
         result = await self.db.execute(query)
         rows = result.all()
@@ -178,61 +278,45 @@ class GeographyService:
             "area_km2": row.area_km2,
         }
 
-    async def get_all_borders_geojson(
+    def get_all_borders_geojson(
         self,
         simplify: Optional[float] = None,
-    ) -> dict:
-        """Get all borders with date ranges for client-side temporal filtering."""
-        if simplify and simplify > 0:
-            geom_expr = ST_AsGeoJSON(
-                ST_SimplifyPreserveTopology(CountryBorder.geometry, simplify)
-            )
-        else:
-            geom_expr = ST_AsGeoJSON(CountryBorder.geometry)
+    ) -> StreamingResponse:
+        """Stream all borders with date ranges for client-side temporal filtering.
 
-        query = (
-            select(
-                Country.id,
-                Country.name_en,
-                Country.name_short,
-                Country.iso_alpha2,
-                Country.iso_alpha3,
-                Country.gwcode,
-                Country.entity_type,
-                CountryBorder.valid_from,
-                CountryBorder.valid_to,
-                geom_expr.label("geometry"),
-            )
-            .join(CountryBorder, Country.id == CountryBorder.country_id)
-            .order_by(Country.name_en, CountryBorder.valid_from)
-        )
+        `simplify` snaps to the nearest precomputed level (see border_lods.py).
+        Geometry text from PostGIS is written out without being parsed (see
+        core/geojson_stream.py).
+        """
+        query = _all_borders_query(snap_tolerance(simplify))
+        return feature_collection_response(query, _border_properties, empty_geometry=b"{}")
 
-        result = await self.db.execute(query)
-        rows = result.all()
+    async def get_all_borders_topojson(
+        self,
+        simplify: Optional[float] = None,
+    ) -> CachedBody:
+        """Get all borders with date ranges as one TopoJSON topology.
 
-        features = []
-        for row in rows:
-            feature = {
-                "type": "Feature",
-                "properties": {
-                    "id": str(row.id),
-                    "name": row.name_en,
-                    "name_short": row.name_short,
-                    "iso_alpha2": row.iso_alpha2,
-                    "iso_alpha3": row.iso_alpha3,
-                    "gwcode": row.gwcode,
-                    "entity_type": row.entity_type,
-                    "valid_from": row.valid_from.isoformat(),
-                    "valid_to": row.valid_to.isoformat() if row.valid_to else None,
-                },
-                "geometry": json.loads(row.geometry) if row.geometry else {},
-            }
-            features.append(feature)
+        Built once per worker and level, and dropped with the border epoch
+        snapshots whenever borders change.
+        """
+        epochs = get_border_epochs()
+        await epochs.ensure_fresh()
+        tolerance = snap_tolerance(simplify)
 
-        return {
-            "type": "FeatureCollection",
-            "features": features,
-        }
+        async def build():
+            result = await self.db.execute(_all_borders_query(tolerance))
+            features = [
+                {
+                    "type": "Feature",
+                    "properties": _border_properties(row),
+                    "geometry": json.loads(row.geometry) if row.geometry else None,
+                }
+                for row in result
+            ]
+            return feature_collection_to_topology({"features": features}, "borders")
+
+        return await self._border_snapshot(("all", tolerance, "topojson"), build)
 
     async def get_relationships_for_year(
         self,
@@ -0,0 +1,273 @@
+"""Columnar World Bank indicator store.
+
+`worldbank_combined.json` is a list of countries, each with a dict of
+years holding a dict of indicators. Economic endpoints used to walk those
+nested dicts year by year on every request. WorldBankStore loads the file
+once into a float array indexed [country, indicator, year] (NaN where a
+value is missing). It precomputes each country's latest value per
+indicator and memoizes name to ISO3 resolution, so lookups are array
+slices.
+
+Countries store their resolved code in `countries.worldbank_code`, set by
+the CShapes importer. Backfill or re-resolve existing rows with:
+    python -m src.geography.worldbank [--all]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..database import async_session_maker
+from .models import Country
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data" / "scraped" / "economic"
+COMBINED_FILE = DATA_DIR / "worldbank_combined.json"
+
+INDICATORS = (
+    "gdp_current_usd",
+    "gdp_per_capita",
+    "gdp_growth",
+    "inflation",
+    "unemployment",
+    "debt_to_gdp",
+    "population",
+    "urban_population_pct",
+    "military_spending_gdp_pct",
+    "education_spending_gdp_pct",
+    "health_spending_gdp_pct",
+)
+
+# Names the World Bank spells differently from our countries table
+COUNTRY_ALIASES = {
+    "united states": "USA",
+    "usa": "USA",
+    "uk": "GBR",
+    "united kingdom": "GBR",
+    "russia": "RUS",
+    "russian federation": "RUS",
+    "south korea": "KOR",
+    "north korea": "PRK",
+    "iran": "IRN",
+    "syria": "SYR",
+    "vietnam": "VNM",
+    "laos": "LAO",
+}
+
+
+def _name_variants(name: str) -> List[str]:
+    """Spellings to try for historical names like "Zimbabwe (Rhodesia)".
+
+    Only leading name parts are used, never generic tails such as
+    "Democratic Republic of", which would match the wrong country.
+    """
+    name = name.lower().strip()
+    bare = re.sub(r"\s*\(.*?\)", "", name).strip()
+    variants = [name, bare, bare.split(",")[0].strip()]
+    variants.extend(part.strip() for part in bare.split("/"))
+    return [v for i, v in enumerate(variants) if v and v not in variants[:i]]
+
+
+def present(values: np.ndarray) -> np.ndarray:
+    """Mask of usable values; zero counts as missing, as in the source data."""
+    return ~np.isnan(values) & (values != 0)
+
+
+def to_optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class WorldBankStore:
+    """World Bank indicators as numpy arrays with a latest-value table."""
+
+    def __init__(self, records: List[dict]):
+        self.codes: List[str] = [r["country_code"] for r in records]
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.indicator_index = {name: i for i, name in enumerate(INDICATORS)}
+
+        years = sorted({int(y) for r in records for y in r.get("data", {})})
+        self.first_year = years[0] if years else 0
+        self.years = np.arange(self.first_year, (years[-1] + 1) if years else 0)
+
+        self.values = np.full((len(self.codes), len(INDICATORS), len(self.years)), np.nan)
+        for c, record in enumerate(records):
+            for year, indicators in record.get("data", {}).items():
+                y = int(year) - self.first_year
+                for name, value in (indicators or {}).items():
+                    i = self.indicator_index.get(name)
+                    if i is not None and value is not None:
+                        self.values[c, i, y] = value
+
+        # Latest usable year per [country, indicator]; -1 when there is none
+        mask = present(self.values)
+        if len(self.years):
+            last = mask.shape[2] - 1 - np.argmax(mask[:, :, ::-1], axis=2)
+            self.latest_year_index = np.where(mask.any(axis=2), last, -1)
+        else:
+            self.latest_year_index = np.full(mask.shape[:2], -1)
+        self.latest = np.where(
+            self.latest_year_index >= 0,
+            np.take_along_axis(
+                self.values, np.maximum(self.latest_year_index, 0)[..., None], axis=2
+            )[..., 0],
+            np.nan,
+        )
+
+        self._names: Dict[str, Optional[str]] = dict(COUNTRY_ALIASES)
+        self._wb_names = {r["country_name"].lower(): r["country_code"] for r in records}
+        self._names.update(self._wb_names)
+
+    @classmethod
+    def from_file(cls, path: Path = COMBINED_FILE) -> "WorldBankStore":
+        if not path.exists():
+            logger.warning(f"{path} not found; economic endpoints will return no data")
+            return cls([])
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def __contains__(self, code: Optional[str]) -> bool:
+        return code in self.index
+
+    def resolve(self, country_name: str) -> Optional[str]:
+        """Resolve a country name to its World Bank ISO3 code.
+
+        Exact names and aliases come from a dict; other names fall back to
+        a substring match once and the result is remembered.
+        """
+        name = country_name.lower()
+        if name in self._names:
+            return self._names[name]
+        code = None
+        for wb_name, wb_code in self._wb_names.items():
+            if name in wb_name or wb_name in name:
+                code = wb_code
+                break
+        self._names[name] = code
+        return code
+
+    def resolve_country(self, country_name: str, iso_alpha3: Optional[str] = None) -> Optional[str]:
+        """Resolve a country, preferring its own ISO3 code when listed."""
+        if iso_alpha3 and iso_alpha3.upper() in self.index:
+            return iso_alpha3.upper()
+        variants = _name_variants(country_name)
+        for variant in variants:
+            code = self._names.get(variant)
+            if code:
+                return code
+        for variant in variants:
+            code = self.resolve(variant)
+            if code:
+                return code
+        return None
+
+    def resolve_many(
+        self, countries: Iterable[Tuple[str, Optional[str]]]
+    ) -> Dict[Tuple[str, Optional[str]], Optional[str]]:
+        """Resolve (name, iso_alpha3) pairs in bulk; unmatched map to None."""
+        return {country: self.resolve_country(*country) for country in countries}
+
+    def year_range(self, start: int, end: int) -> slice:
+        """Array slice for the years start..end inclusive."""
+        lo = max(start - self.first_year, 0)
+        hi = max(min(end - self.first_year + 1, len(self.years)), lo)
+        return slice(lo, hi)
+
+    def series(
+        self, code: str, indicators: Tuple[str, ...], start: int, end: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (years, values[indicator, year]) for a country."""
+        span = self.year_range(start, end)
+        rows = [self.indicator_index[name] for name in indicators]
+        return self.years[span], self.values[self.index[code], rows, span]
+
+    def latest_value(self, code: str, indicator: str) -> Tuple[Optional[float], Optional[int]]:
+        """Latest usable value of an indicator and its year."""
+        c, i = self.index[code], self.indicator_index[indicator]
+        y = self.latest_year_index[c, i]
+        if y < 0:
+            return None, None
+        return float(self.latest[c, i]), int(self.years[y])
+
+    def year_values(self, code: str, year: int) -> Dict[str, Optional[float]]:
+        """Every indicator for one country and year."""
+        column = self.values[self.index[code], :, year - self.first_year]
+        return {name: to_optional(v) for name, v in zip(INDICATORS, column)}
+
+
+# Global World Bank store
+_store: Optional[WorldBankStore] = None
+
+
+def get_worldbank_store() -> WorldBankStore:
+    """Get or load the global World Bank store."""
+    global _store
+    if _store is None:
+        _store = WorldBankStore.from_file()
+    return _store
+
+
+def store_worldbank_codes(session: Session, codes: Dict[object, str]) -> int:
+    """Set worldbank_code on the countries with the given ids."""
+    if not codes:
+        return 0
+    # ORM bulk UPDATE by primary key
+    session.execute(
+        update(Country),
+        [{"id": row_id, "worldbank_code": code} for row_id, code in codes.items()],
+    )
+    return len(codes)
+
+
+async def assign_worldbank_codes(only_missing: bool = True) -> Tuple[int, List[str]]:
+    """Resolve and store World Bank codes for countries.
+
+    Returns the number of rows updated and the names left unmatched.
+    """
+    store = get_worldbank_store()
+    async with async_session_maker() as session:
+        query = select(Country.id, Country.name_en, Country.iso_alpha3)
+        if only_missing:
+            query = query.where(Country.worldbank_code.is_(None))
+        rows = (await session.execute(query)).all()
+
+        codes = store.resolve_many({(row.name_en, row.iso_alpha3) for row in rows})
+        updates = {
+            row.id: codes[(row.name_en, row.iso_alpha3)]
+            for row in rows
+            if codes[(row.name_en, row.iso_alpha3)]
+        }
+        updated = await session.run_sync(store_worldbank_codes, updates)
+        await session.commit()
+
+    unmatched = sorted({name for (name, _), code in codes.items() if code is None})
+    return updated, unmatched
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Store World Bank codes on countries")
+    parser.add_argument(
+        "--all", action="store_true", help="Re-resolve countries that already have a code"
+    )
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("RESOLVING WORLD BANK COUNTRY CODES")
+    print("=" * 60)
+
+    updated, unmatched = await assign_worldbank_codes(only_missing=not args.all)
+
+    for name in unmatched:
+        print(f"  unmatched: {name}")
+    print(f"UPDATED: {updated} countries, {len(unmatched)} names unmatched")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
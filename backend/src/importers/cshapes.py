@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from geoalchemy2.shape import from_shape
 
 from ..geography.models import Country, CountryBorder, CountryCapital
+from ..geography.worldbank import get_worldbank_store
 from .base import BaseImporter
 
 
@@ -130,6 +131,7 @@ class CShapesImporter(BaseImporter):
                 "gwcode": int(raw["gwcode"]) if raw.get("gwcode") else None,
                 "cowcode": int(raw["cowcode"]) if raw.get("cowcode") else None,
                 "name_en": str(raw["country_name"]).strip(),
+                "worldbank_code": get_worldbank_store().resolve_country(str(raw["country_name"])),
                 "valid_from": start_date,
                 "valid_to": end_date,
                 "entity_type": "sovereign_state",
@@ -7,8 +7,21 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
 from .config import get_settings
-from .cache import get_redis, close_redis, get_cache_stats
+from .cache import (
+    get_redis,
+    close_redis,
+    get_cache_stats,
+    start_cache_invalidation,
+    stop_cache_invalidation,
+)
+from .core.warmup import (
+    WARMUP_SCOPE_KEY,
+    record_page_view,
+    start_cache_warmup,
+    stop_cache_warmup,
+)
 from .middleware.rate_limit import RateLimitMiddleware
+from .people.graph import get_person_graph
 
 # Configure logging
 logging.basicConfig(
@@ -32,11 +45,23 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Redis connection failed (caching disabled): {e}")
 
+    # Enable the in-process cache tier once subscribed to invalidations
+    start_cache_invalidation()
+
+    # Load the in-memory person graph without blocking startup
+    get_person_graph().start_background_refresh()
+
+    # Precompute popular pages and hot timeline years in the background
+    if settings.cache_warmup:
+        start_cache_warmup(app)
+
     logger.info("Application startup complete")
     yield
 
     # Shutdown
     logger.info("Application shutdown started")
+    await stop_cache_warmup()
+    await stop_cache_invalidation()
     await close_redis()
     logger.info("Redis connection closed")
     logger.info("Application shutdown complete")
@@ -93,6 +118,20 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+# Page view counting for startup cache warm-up
+@app.middleware("http")
+async def count_page_views(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        settings.cache_warmup
+        and request.method == "GET"
+        and response.status_code < 400
+        and not request.scope.get(WARMUP_SCOPE_KEY)
+    ):
+        record_page_view(request.url.path, request.url.query)
+    return response
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -130,6 +169,7 @@ from .core.search_advanced import router as search_advanced_router
 from .core.citations import router as citations_router
 from .core.export import router as export_router
 from .core.network import router as network_router
+from .core.tiles import router as tiles_router
 from .labor.router import router as labor_router
 from .research.router import router as research_router
 from .media.router import router as media_router
@@ -237,6 +277,12 @@ app.include_router(
     tags=["network"],
 )
 
+app.include_router(
+    tiles_router,
+    prefix=f"{settings.api_v1_prefix}/tiles",
+    tags=["tiles"],
+)
+
 app.include_router(
     labor_router,
     prefix=f"{settings.api_v1_prefix}/labor",
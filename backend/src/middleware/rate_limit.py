@@ -147,8 +147,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return f"ip:{hashlib.sha256(ip.encode()).hexdigest()[:16]}"
     
     async def dispatch(self, request: Request, call_next) -> Response:
-        # Skip rate limiting for exempt paths
-        if any(request.url.path.startswith(path) for path in self.exempt_paths):
+        # Skip rate limiting for exempt paths and in-process cache warm-up
+        if request.scope.get("cache_warmup") or any(
+            request.url.path.startswith(path) for path in self.exempt_paths
+        ):
             return await call_next(request)
         
         identifier = self.get_identifier(request)
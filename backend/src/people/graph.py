@@ -0,0 +1,286 @@
+"""In-memory adjacency graph of person connections.
+
+Each worker keeps the whole `person_connections` table as compressed sparse
+row (CSR) integer arrays, along with the positions each person held. Network
+traversals then run in memory, and the database is only asked for the
+attributes of the nodes that end up in a response.
+"""
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+
+from ..cache import CacheTTL
+from ..core.snapshot import InMemorySnapshot
+from ..database import async_session_maker
+from .models import PersonConnection, PersonPosition
+
+logger = logging.getLogger(__name__)
+
+# (person_from_id, person_to_id, connection_type, strength)
+Connection = Tuple[UUID, UUID, str, float]
+# (person_id, title, position_type)
+Position = Tuple[UUID, str, str]
+
+
+class PersonGraph(InMemorySnapshot):
+    """CSR adjacency over person connections.
+
+    Every connection is stored once in the edge arrays and appears in the
+    adjacency lists of both endpoints, so neighbour lookups ignore direction
+    while edges keep their original orientation. People deleted since the
+    last build are masked out until the next rebuild.
+    """
+
+    name = "Person graph"
+
+    def __init__(self, max_age_seconds: int = CacheTTL.MEDIUM):
+        super().__init__(max_age_seconds)
+        self._ids: List[UUID] = []
+        self._index: Dict[UUID, int] = {}
+        self._types: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+
+        # Edge arrays, indexed by edge number
+        self._edge_from = np.zeros(0, dtype=np.int32)
+        self._edge_to = np.zeros(0, dtype=np.int32)
+        self._edge_type = np.zeros(0, dtype=np.int16)
+        self._edge_strength = np.zeros(0, dtype=np.float32)
+
+        # CSR adjacency: neighbours of node i are _adj[_indptr[i]:_indptr[i + 1]]
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._adj = np.zeros(0, dtype=np.int32)
+        self._adj_edge = np.zeros(0, dtype=np.int32)
+
+        # People deleted since the last build
+        self._removed: Set[int] = set()
+
+        self._positions: Dict[UUID, List[Tuple[str, str]]] = {}
+
+    @property
+    def node_count(self) -> int:
+        return len(self._ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_from)
+
+    def _node(self, person_id: UUID) -> int:
+        index = self._index.get(person_id)
+        if index is None:
+            index = len(self._ids)
+            self._ids.append(person_id)
+            self._index[person_id] = index
+        return index
+
+    def _type_code(self, connection_type: str) -> int:
+        code = self._type_codes.get(connection_type)
+        if code is None:
+            code = len(self._types)
+            self._types.append(connection_type)
+            self._type_codes[connection_type] = code
+        return code
+
+    def build(self, connections: Iterable[Connection], positions: Iterable[Position] = ()) -> None:
+        """Replace the graph with the given connections and positions."""
+        self._ids = []
+        self._index = {}
+        self._types = []
+        self._type_codes = {}
+
+        sources, targets, types, strengths = [], [], [], []
+        for from_id, to_id, connection_type, strength in connections:
+            sources.append(self._node(from_id))
+            targets.append(self._node(to_id))
+            types.append(self._type_code(connection_type or "connected"))
+            strengths.append(1.0 if strength is None else strength)
+
+        self._edge_from = np.asarray(sources, dtype=np.int32)
+        self._edge_to = np.asarray(targets, dtype=np.int32)
+        self._edge_type = np.asarray(types, dtype=np.int16)
+        self._edge_strength = np.asarray(strengths, dtype=np.float32)
+
+        # Each edge contributes an adjacency entry to both endpoints
+        node_count = len(self._ids)
+        edge_numbers = np.arange(len(sources), dtype=np.int32)
+        owners = np.concatenate([self._edge_from, self._edge_to])
+        order = np.argsort(owners, kind="stable")
+        self._adj = np.concatenate([self._edge_to, self._edge_from])[order]
+        self._adj_edge = np.concatenate([edge_numbers, edge_numbers])[order]
+        self._indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=node_count), out=self._indptr[1:])
+
+        self._removed = set()
+
+        self._positions = defaultdict(list)
+        for person_id, title, position_type in positions:
+            self._positions[person_id].append((title, position_type))
+        self._positions = dict(self._positions)
+
+        self._mark_built()
+
+    def _adjacent(self, node: int) -> Iterable[Tuple[int, int]]:
+        """Yield (neighbour, edge number) pairs for a node index."""
+        start, end = self._indptr[node], self._indptr[node + 1]
+        return zip(self._adj[start:end].tolist(), self._adj_edge[start:end].tolist())
+
+    def _edge(self, edge: int) -> Tuple[int, int, int, float]:
+        return (
+            int(self._edge_from[edge]),
+            int(self._edge_to[edge]),
+            int(self._edge_type[edge]),
+            float(self._edge_strength[edge]),
+        )
+
+    def neighbors(self, person_id: UUID) -> List[UUID]:
+        """Return the distinct people directly connected to a person."""
+        node = self._index.get(person_id)
+        if node is None or node in self._removed:
+            return []
+        seen = {
+            other for other, _ in self._adjacent(node) if other not in self._removed
+        }
+        return [self._ids[i] for i in seen]
+
+    def degree(self, person_id: UUID) -> int:
+        """Return the number of connections a person takes part in."""
+        node = self._index.get(person_id)
+        if node is None or node in self._removed:
+            return 0
+        return sum(1 for other, _ in self._adjacent(node) if other not in self._removed)
+
+    def traverse(
+        self,
+        root: UUID,
+        depth: int,
+        max_nodes: int,
+        time_budget_seconds: Optional[float] = None,
+    ) -> Tuple[List[UUID], bool]:
+        """Breadth-first walk from root, one level at a time.
+
+        Returns the people reached in BFS order (root first) and whether
+        the walk stopped early because of max_nodes or the time budget.
+        """
+        deadline = time.monotonic() + time_budget_seconds if time_budget_seconds else None
+        root_node = self._index.get(root)
+        if root_node is None or root_node in self._removed:
+            return [root], False
+
+        order = [root_node]
+        visited = {root_node}
+        frontier = [root_node]
+        for _ in range(depth):
+            next_frontier = []
+            for node in frontier:
+                for other, _ in self._adjacent(node):
+                    if other in visited or other in self._removed:
+                        continue
+                    if len(order) >= max_nodes:
+                        return [self._ids[i] for i in order], True
+                    visited.add(other)
+                    order.append(other)
+                    next_frontier.append(other)
+            if not next_frontier:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                return [self._ids[i] for i in order], True
+            frontier = next_frontier
+        return [self._ids[i] for i in order], False
+
+    def edges_among(self, people: Iterable[UUID]) -> List[Connection]:
+        """Return every connection whose endpoints are both in `people`."""
+        nodes = {self._index[p] for p in people if p in self._index}
+        nodes -= self._removed
+        edges = []
+        for node in nodes:
+            for other, edge in self._adjacent(node):
+                source, target, type_code, strength = self._edge(edge)
+                # Report each edge once, from its source endpoint
+                if source == node and other in nodes:
+                    edges.append((
+                        self._ids[source], self._ids[target], self._types[type_code], strength,
+                    ))
+        return edges
+
+    def positions(self, person_id: UUID) -> List[Tuple[str, str]]:
+        """Return (title, position_type) pairs for a person."""
+        return self._positions.get(person_id, [])
+
+    def edge_arrays(self) -> Tuple[List[object], np.ndarray, np.ndarray]:
+        """Export the graph, including organizations, as directed edge arrays.
+
+        Returns the node keys (person UUIDs first, then one "org:<title>"
+        key per distinct position title) and parallel source/target index
+        arrays. Connections keep their direction. Memberships link person
+        and organization both ways.
+        """
+        keys: List[object] = list(self._ids)
+
+        org_index: Dict[str, int] = {}
+        members, orgs = [], []
+        for person_id, held in self._positions.items():
+            person = self._index.get(person_id)
+            if person is None:
+                person = len(keys)
+                keys.append(person_id)
+            for title, _ in held:
+                if not title:
+                    continue
+                org = org_index.get(title)
+                if org is None:
+                    org = len(keys)
+                    keys.append(f"org:{title}")
+                    org_index[title] = org
+                members.append(person)
+                orgs.append(org)
+        members = np.asarray(members, dtype=np.int32)
+        orgs = np.asarray(orgs, dtype=np.int32)
+
+        src = np.concatenate([self._edge_from, members, orgs])
+        dst = np.concatenate([self._edge_to, orgs, members])
+        if self._removed:
+            removed = np.fromiter(self._removed, dtype=np.int32)
+            keep = ~(np.isin(src, removed) | np.isin(dst, removed))
+            src, dst = src[keep], dst[keep]
+        return keys, src, dst
+
+    def remove_person(self, person_id: UUID) -> None:
+        """Hide a deleted person (and their connections) until the next rebuild."""
+        node = self._index.get(person_id)
+        if node is not None:
+            self._removed.add(node)
+        self._positions.pop(person_id, None)
+
+    async def _load(self) -> None:
+        async with async_session_maker() as session:
+            connections = await session.execute(
+                select(
+                    PersonConnection.person_from_id,
+                    PersonConnection.person_to_id,
+                    PersonConnection.connection_type,
+                    PersonConnection.strength,
+                )
+            )
+            positions = await session.execute(
+                select(PersonPosition.person_id, PersonPosition.title, PersonPosition.position_type)
+            )
+            self.build(connections.all(), positions.all())
+        logger.info(
+            f"Person graph rebuilt with {self.node_count} people and {self.edge_count} connections"
+        )
+
+
+# Global person graph instance
+_graph: Optional[PersonGraph] = None
+
+
+def get_person_graph() -> PersonGraph:
+    """Get or create the global person graph."""
+    global _graph
+    if _graph is None:
+        _graph = PersonGraph()
+    return _graph
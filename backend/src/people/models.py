@@ -133,6 +133,28 @@ class PersonPosition(Base):
     person: Mapped[Person] = relationship(back_populates="positions")
 
 
+class PersonGraphMetrics(Base):
+    """Precomputed network metrics for a person (see people.graph_metrics)."""
+    __tablename__ = "person_graph_metrics"
+
+    person_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('people.id', ondelete='CASCADE'), primary_key=True
+    )
+
+    # Connections in the full graph, including organization memberships
+    degree: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pagerank: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Sampled estimate
+    betweenness: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    # Label propagation community; people sharing a label form one community
+    community: Mapped[Optional[int]] = mapped_column(Integer)
+
+    computed_at: Mapped[date] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class Book(Base):
     """Important books, publications, and texts."""
     __tablename__ = "books"
@@ -1,6 +1,6 @@
 """People business logic."""
 from datetime import date
-from typing import Optional, List, Set
+from typing import Optional, List
 from uuid import UUID
 
 from sqlalchemy import and_, or_, select, func, desc
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 
 from .models import Person, PersonConnection, PersonPosition, Book, BookAuthor
+from .graph import get_person_graph
 from ..geography.models import Country
 from .schemas import (
     PersonListItem, PersonResponse, PersonConnectionResponse,
@@ -219,66 +220,42 @@ class PeopleService:
         self,
         person_id: UUID,
         depth: int = 2,
+        max_nodes: int = 500,
     ) -> ConnectionGraphResponse:
-        """Get a network graph of connections starting from a person."""
-        nodes: dict[str, ConnectionGraphNode] = {}
-        links: List[ConnectionGraphLink] = []
-        visited: Set[UUID] = set()
-
-        async def explore_connections(pid: UUID, current_depth: int):
-            if current_depth > depth or pid in visited:
-                return
-            visited.add(pid)
-
-            # Get person info
-            result = await self.db.execute(
-                select(Person).where(Person.id == pid)
-            )
-            person = result.scalar_one_or_none()
-            if not person:
-                return
-
-            nodes[str(pid)] = ConnectionGraphNode(
-                id=str(pid),
-                name=person.name,
-                image=person.image_url,
-                person_types=person.person_types,
-            )
+        """Get a network graph of connections starting from a person.
+
+        Walks the in-memory person graph and loads node details in one query.
+        """
+        graph = get_person_graph()
+        await graph.ensure_fresh()
+        person_ids, _ = graph.traverse(person_id, depth, max_nodes)
 
-            # Get connections from this person
-            conn_query = (
-                select(PersonConnection)
-                .where(PersonConnection.person_from_id == pid)
+        result = await self.db.execute(
+            select(Person.id, Person.name, Person.image_url, Person.person_types)
+            .where(Person.id.in_(person_ids))
+        )
+        nodes = {
+            row.id: ConnectionGraphNode(
+                id=str(row.id),
+                name=row.name,
+                image=row.image_url,
+                person_types=row.person_types,
             )
-            result = await self.db.execute(conn_query)
-            for conn in result.scalars().all():
-                links.append(ConnectionGraphLink(
-                    source=str(pid),
-                    target=str(conn.person_to_id),
-                    type=conn.connection_type,
-                    strength=conn.strength or 1.0,
-                ))
-                await explore_connections(conn.person_to_id, current_depth + 1)
-
-            # Get connections to this person
-            conn_query = (
-                select(PersonConnection)
-                .where(PersonConnection.person_to_id == pid)
+            for row in result.all()
+        }
+
+        links = [
+            ConnectionGraphLink(
+                source=str(from_id),
+                target=str(to_id),
+                type=connection_type,
+                strength=strength,
             )
-            result = await self.db.execute(conn_query)
-            for conn in result.scalars().all():
-                links.append(ConnectionGraphLink(
-                    source=str(conn.person_from_id),
-                    target=str(pid),
-                    type=conn.connection_type,
-                    strength=conn.strength or 1.0,
-                ))
-                await explore_connections(conn.person_from_id, current_depth + 1)
-
-        await explore_connections(person_id, 0)
+            for from_id, to_id, connection_type, strength in graph.edges_among(nodes.keys())
+        ]
 
         return ConnectionGraphResponse(
-            nodes=list(nodes.values()),
+            nodes=[nodes[pid] for pid in person_ids if pid in nodes],
             links=links,
         )
 
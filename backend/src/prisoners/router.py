@@ -4,28 +4,47 @@ Political prisoner data API endpoints.
 
 import json
 from pathlib import Path
-from typing import Optional
-from fastapi import APIRouter, Query, Response
+from typing import Optional, Tuple
+from fastapi import APIRouter, Query, Request
+
+from ..core.file_cache import get_file_cache
+from ..core.http_cache import (
+    cached_response, derived_etag, etag_matches, json_response, not_modified,
+)
 
 router = APIRouter(prefix="/prisoners", tags=["political-prisoners"])
 
 DATA_DIR = Path(__file__).parent.parent.parent.parent / "data" / "scraped" / "prisoners"
+DATA_FILE = DATA_DIR / "political_prisoners.json"
+
+# Parsed copy of the data file, tagged with the ETag it was parsed from
+_parsed: Tuple[Optional[str], dict] = (None, {})
 
 
-def load_prisoner_data():
+def load_prisoner_data(data_file: Path = DATA_FILE) -> dict:
     """Load political prisoner data from JSON file."""
-    data_file = DATA_DIR / "political_prisoners.json"
     if data_file.exists():
         with open(data_file, "r", encoding="utf-8") as f:
             return json.load(f)
     return {"current_prisoners": [], "historical_prisoners": [], "statistics": {}}
 
 
-@router.get("/")
-async def get_prisoners_overview(response: Response):
-    """Get overview of political prisoner database."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    data = load_prisoner_data()
+def prisoner_data_etag() -> str:
+    """ETag of the current data file version, from the file cache."""
+    return get_file_cache().get(DATA_FILE, load_prisoner_data).etag
+
+
+def get_prisoner_data() -> dict:
+    """Parsed prisoner data, re-parsed only when the file changes."""
+    global _parsed
+    cached = get_file_cache().get(DATA_FILE, load_prisoner_data)
+    if _parsed[0] != cached.etag:
+        _parsed = (cached.etag, json.loads(cached.body))
+    return _parsed[1]
+
+
+def prisoner_overview(data_file: Path) -> dict:
+    data = load_prisoner_data(data_file)
     return {
         "metadata": data.get("metadata", {}),
         "statistics": data.get("statistics", {}),
@@ -34,17 +53,39 @@ async def get_prisoners_overview(response: Response):
     }
 
 
+def prisoner_statistics(data_file: Path) -> dict:
+    return load_prisoner_data(data_file).get("statistics", {})
+
+
+def nobel_laureates(data_file: Path) -> dict:
+    data = load_prisoner_data(data_file)
+    laureates = []
+    for prisoner in data.get("current_prisoners", []) + data.get("historical_prisoners", []):
+        awards = prisoner.get("awards", [])
+        if any("Nobel" in award for award in awards):
+            laureates.append(prisoner)
+    return {"total": len(laureates), "data": laureates}
+
+
+@router.get("/")
+async def get_prisoners_overview(request: Request):
+    """Get overview of political prisoner database."""
+    return cached_response(request, get_file_cache().get(DATA_FILE, prisoner_overview), 3600)
+
+
 @router.get("/current")
 async def get_current_prisoners(
-    response: Response,
+    request: Request,
     country: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
     offset: int = Query(0),
 ):
     """Get currently detained political prisoners."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    data = load_prisoner_data()
+    etag = derived_etag(prisoner_data_etag(), "current", country, category, limit, offset)
+    if etag_matches(request, etag):
+        return not_modified(etag, 3600)
+    data = get_prisoner_data()
     prisoners = data.get("current_prisoners", [])
     
     if country:
@@ -55,19 +96,23 @@ async def get_current_prisoners(
     total = len(prisoners)
     prisoners = prisoners[offset:offset + limit]
     
-    return {"total": total, "offset": offset, "limit": limit, "data": prisoners}
+    return json_response(
+        request, {"total": total, "offset": offset, "limit": limit, "data": prisoners}, 3600, etag
+    )
 
 
 @router.get("/historical")
 async def get_historical_prisoners(
-    response: Response,
+    request: Request,
     country: Optional[str] = Query(None),
     limit: int = Query(100, le=500),
     offset: int = Query(0),
 ):
     """Get historical political prisoners."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    data = load_prisoner_data()
+    etag = derived_etag(prisoner_data_etag(), "historical", country, limit, offset)
+    if etag_matches(request, etag):
+        return not_modified(etag, 3600)
+    data = get_prisoner_data()
     prisoners = data.get("historical_prisoners", [])
     
     if country:
@@ -76,53 +121,47 @@ async def get_historical_prisoners(
     total = len(prisoners)
     prisoners = prisoners[offset:offset + limit]
     
-    return {"total": total, "offset": offset, "limit": limit, "data": prisoners}
+    return json_response(
+        request, {"total": total, "offset": offset, "limit": limit, "data": prisoners}, 3600, etag
+    )
 
 
 @router.get("/statistics")
-async def get_prisoner_statistics(response: Response):
+async def get_prisoner_statistics(request: Request):
     """Get statistics about political prisoners."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    data = load_prisoner_data()
-    return data.get("statistics", {})
+    return cached_response(request, get_file_cache().get(DATA_FILE, prisoner_statistics), 3600)
 
 
 @router.get("/search")
 async def search_prisoners(
-    response: Response,
+    request: Request,
     q: str = Query(..., min_length=2),
     limit: int = Query(50, le=200),
 ):
     """Search political prisoners by name."""
-    response.headers["Cache-Control"] = "public, max-age=1800"
-    data = load_prisoner_data()
+    etag = derived_etag(prisoner_data_etag(), "search", q, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag, 1800)
+    data = get_prisoner_data()
     
     query = q.lower()
     results = []
     
+    # Copies, so the shared parsed data is never modified
     for prisoner in data.get("current_prisoners", []):
         if query in prisoner.get("name", "").lower():
-            prisoner["status_type"] = "current"
-            results.append(prisoner)
+            results.append({**prisoner, "status_type": "current"})
     
     for prisoner in data.get("historical_prisoners", []):
         if query in prisoner.get("name", "").lower():
-            prisoner["status_type"] = "historical"
-            results.append(prisoner)
+            results.append({**prisoner, "status_type": "historical"})
     
-    return {"query": q, "total": len(results), "data": results[:limit]}
+    return json_response(
+        request, {"query": q, "total": len(results), "data": results[:limit]}, 1800, etag
+    )
 
 
 @router.get("/nobel-laureates")
-async def get_nobel_laureates(response: Response):
+async def get_nobel_laureates(request: Request):
     """Get political prisoners who received Nobel Peace Prize."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    data = load_prisoner_data()
-    
-    laureates = []
-    for prisoner in data.get("current_prisoners", []) + data.get("historical_prisoners", []):
-        awards = prisoner.get("awards", [])
-        if any("Nobel" in award for award in awards):
-            laureates.append(prisoner)
-    
-    return {"total": len(laureates), "data": laureates}
+    return cached_response(request, get_file_cache().get(DATA_FILE, nobel_laureates), 86400)
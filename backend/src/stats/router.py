@@ -5,10 +5,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from ..database import get_db
-from ..cache import cache_get, cache_set, CachePrefix, CacheTTL
+from ..cache import cache_fetch, CachePrefix, CacheTTL
 
 router = APIRouter()
 
+# Tables counted in the overview
+STATS_TAGS = (CachePrefix.STATS, "countries", "people", "books", "events", "conflicts", "elections")
+
 
 class StatsOverview(BaseModel):
     countries: int
@@ -24,34 +27,28 @@ async def get_stats_overview(db: AsyncSession = Depends(get_db)):
     """Get database statistics overview (cached for 5 minutes)."""
     cache_key = f"{CachePrefix.STATS}:overview"
 
-    # Try cache first
-    cached = await cache_get(cache_key)
-    if cached:
-        return StatsOverview(**cached)
-
-    # Cache miss - query database
-    from ..geography.models import Country
-    from ..people.models import Person, Book
-    from ..events.models import Event, Conflict
-    from ..politics.models import Election
-
-    countries = await db.execute(select(func.count(Country.id)))
-    people = await db.execute(select(func.count(Person.id)))
-    books = await db.execute(select(func.count(Book.id)))
-    events = await db.execute(select(func.count(Event.id)))
-    conflicts = await db.execute(select(func.count(Conflict.id)))
-    elections = await db.execute(select(func.count(Election.id)))
-
-    result = StatsOverview(
-        countries=countries.scalar() or 0,
-        people=people.scalar() or 0,
-        books=books.scalar() or 0,
-        events=events.scalar() or 0,
-        conflicts=conflicts.scalar() or 0,
-        elections=elections.scalar() or 0,
-    )
-
-    # Cache the result
-    await cache_set(cache_key, result.model_dump(), CacheTTL.SHORT)
-
-    return result
+    async def compute() -> dict:
+        from ..geography.models import Country
+        from ..people.models import Person, Book
+        from ..events.models import Event, Conflict
+        from ..politics.models import Election
+
+        countries = await db.execute(select(func.count(Country.id)))
+        people = await db.execute(select(func.count(Person.id)))
+        books = await db.execute(select(func.count(Book.id)))
+        events = await db.execute(select(func.count(Event.id)))
+        conflicts = await db.execute(select(func.count(Conflict.id)))
+        elections = await db.execute(select(func.count(Election.id)))
+
+        return StatsOverview(
+            countries=countries.scalar() or 0,
+            people=people.scalar() or 0,
+            books=books.scalar() or 0,
+            events=events.scalar() or 0,
+            conflicts=conflicts.scalar() or 0,
+            elections=elections.scalar() or 0,
+        ).model_dump()
+
+    # Concurrent misses share one set of count queries
+    data = await cache_fetch(cache_key, compute, CacheTTL.SHORT, tags=STATS_TAGS)
+    return StatsOverview(**data)
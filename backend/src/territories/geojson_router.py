@@ -1,9 +1,25 @@
 """Serve GeoJSON files directly for liberation struggle overlays."""
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Literal, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from ..core.file_cache import get_file_cache
+from ..core.http_cache import cached_response
+from ..core.topojson import feature_collection_to_topology
+from .osm_build import artifact_path, convert_osm_to_geojson
+
+GeoFormat = Literal["geojson", "topojson"]
+
+
+def geo_format(
+    format: GeoFormat = Query(
+        "geojson", description="`topojson` returns the layer as a quantized topology"
+    ),
+) -> str:
+    return format
 
-from fastapi import APIRouter, Response, Query
 
 router = APIRouter()
 
@@ -23,54 +39,18 @@ def load_geojson(filepath: Path) -> dict:
     return {"type": "FeatureCollection", "features": []}
 
 
-def convert_osm_to_geojson(osm_data: dict) -> dict:
-    """Convert OSM Overpass JSON to GeoJSON format."""
-    features = []
-    elements = osm_data.get("elements", [])
-    
-    for el in elements:
-        if el.get("type") == "node":
-            features.append({
-                "type": "Feature",
-                "properties": el.get("tags", {}),
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [el.get("lon", 0), el.get("lat", 0)]
-                }
-            })
-        elif el.get("type") == "way" and el.get("geometry"):
-            coords = [[g["lon"], g["lat"]] for g in el["geometry"]]
-            # Check if it's a closed way (polygon)
-            if len(coords) > 2 and coords[0] == coords[-1]:
-                features.append({
-                    "type": "Feature",
-                    "properties": el.get("tags", {}),
-                    "geometry": {"type": "Polygon", "coordinates": [coords]}
-                })
-            else:
-                features.append({
-                    "type": "Feature",
-                    "properties": el.get("tags", {}),
-                    "geometry": {"type": "LineString", "coordinates": coords}
-                })
-        elif el.get("type") == "relation" and el.get("members"):
-            # Handle relations - simplified approach
-            coords = []
-            for member in el.get("members", []):
-                if member.get("geometry"):
-                    coords.extend([[g["lon"], g["lat"]] for g in member["geometry"]])
-            if coords:
-                features.append({
-                    "type": "Feature",
-                    "properties": el.get("tags", {}),
-                    "geometry": {"type": "LineString", "coordinates": coords}
-                })
-    
-    return {"type": "FeatureCollection", "features": features}
-
-
-def load_osm_as_geojson(filepath: Path) -> dict:
-    """Load OSM JSON and convert to GeoJSON."""
+def load_osm_as_geojson(filepath: Path) -> Union[dict, bytes]:
+    """Load OSM JSON as GeoJSON, preferring the prebuilt artifact.
+
+    Artifacts come from `python -m src.territories.osm_build`. They are
+    used as-is when at least as new as the source file. Otherwise the
+    source is converted here.
+    """
+    artifact = artifact_path(filepath)
+    if artifact.exists() and (
+        not filepath.exists() or artifact.stat().st_mtime_ns >= filepath.stat().st_mtime_ns
+    ):
+        return artifact.read_bytes()
     if filepath.exists():
         with open(filepath, 'r') as f:
             data = json.load(f)
@@ -81,82 +61,157 @@ def load_osm_as_geojson(filepath: Path) -> dict:
     return {"type": "FeatureCollection", "features": []}
 
 
+def _osm_artifacts(filepath: Path) -> List[Path]:
+    return [artifact_path(filepath)]
+
+
+# The file cache also checks the artifact, so a rebuild is picked up
+# without the source file changing
+load_osm_as_geojson.dependencies = _osm_artifacts
+
+
+def load_index(filepath: Path) -> Any:
+    """Load a region's _index.json file summary."""
+    if filepath.exists():
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    return {"error": "Index file not found"}
+
+
+def load_overview(filepath: Path) -> Any:
+    """Load a region overview JSON file."""
+    if filepath.exists():
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    return {"error": "Overview file not found"}
+
+
+def load_json_list(filepath: Path) -> Any:
+    """Load a JSON list file, or an empty list if missing."""
+    if filepath.exists():
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    return []
+
+
+# TopoJSON variants of the GeoJSON loaders, one per loader so that file
+# cache keys stay stable
+_topojson_loaders: Dict[Callable[[Path], Any], Callable[[Path], Any]] = {}
+
+
+def topojson_loader(loader: Callable[[Path], Any]) -> Callable[[Path], Any]:
+    """Wrap a GeoJSON loader to return a TopoJSON topology instead."""
+    wrapped = _topojson_loaders.get(loader)
+    if wrapped is None:
+        def wrapped(filepath: Path) -> dict:
+            data = loader(filepath)
+            if isinstance(data, bytes):
+                data = json.loads(data)
+            if not isinstance(data, dict) or data.get("type") != "FeatureCollection":
+                raise HTTPException(
+                    status_code=400, detail="TopoJSON is only available for GeoJSON layers"
+                )
+            return feature_collection_to_topology(data, filepath.stem)
+
+        if hasattr(loader, "dependencies"):
+            wrapped.dependencies = loader.dependencies
+        _topojson_loaders[loader] = wrapped
+    return wrapped
+
+
+def cached_json_response(
+    request: Request,
+    filepath: Path,
+    loader: Callable[[Path], Any] = load_geojson,
+    max_age: int = 86400,
+    format: GeoFormat = "geojson",
+) -> Response:
+    """Serve a data file from the per-worker file cache.
+
+    Parsing, OSM conversion, serialization and gzip happen once per file
+    version. Later hits send the cached bytes as they are, or a 304 when
+    the client's ETag still matches. Layer endpoints pass the `format`
+    they were asked for; TopoJSON is converted and cached as its own entry.
+    """
+    if format == "topojson":
+        loader = topojson_loader(loader)
+    return cached_response(request, get_file_cache().get(filepath, loader), max_age)
+
+
 # ==========================================
 # PALESTINE ENDPOINTS
 # ==========================================
 
 @router.get("/palestine/separation-barrier/geojson")
-async def get_palestine_separation_barrier(response: Response):
+async def get_palestine_separation_barrier(
+    request: Request, format: GeoFormat = Depends(geo_format)
+):
     """Get separation barrier/wall as GeoJSON from OCHA data."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "separation_barrier.geojson")
+    return cached_json_response(
+        request, PALESTINE_DIR / "separation_barrier.geojson", format=format
+    )
 
 
 @router.get("/palestine/checkpoints/geojson")
-async def get_palestine_checkpoints(response: Response):
+async def get_palestine_checkpoints(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get checkpoints as GeoJSON from OCHA data."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "checkpoints.geojson")
+    return cached_json_response(request, PALESTINE_DIR / "checkpoints.geojson", format=format)
 
 
 @router.get("/palestine/roadblocks/geojson")
-async def get_palestine_roadblocks(response: Response):
+async def get_palestine_roadblocks(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get roadblocks and earthmounds as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "roadblocks_earthmounds.geojson")
+    return cached_json_response(
+        request, PALESTINE_DIR / "roadblocks_earthmounds.geojson", format=format
+    )
 
 
 @router.get("/palestine/road-gates/geojson")
-async def get_palestine_road_gates(response: Response):
+async def get_palestine_road_gates(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get road gates as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "road_gates.geojson")
+    return cached_json_response(request, PALESTINE_DIR / "road_gates.geojson", format=format)
 
 
 @router.get("/palestine/firing-zones/geojson")
-async def get_palestine_firing_zones(response: Response):
+async def get_palestine_firing_zones(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Israeli firing zones (closed military areas) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "israeli_firing_zones.geojson")
+    return cached_json_response(
+        request, PALESTINE_DIR / "israeli_firing_zones.geojson", format=format
+    )
 
 
 @router.get("/palestine/oslo-areas/geojson")
-async def get_palestine_oslo_areas(response: Response):
+async def get_palestine_oslo_areas(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Oslo Agreement areas (A, B, C) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "oslo_areas_abc.geojson")
+    return cached_json_response(request, PALESTINE_DIR / "oslo_areas_abc.geojson", format=format)
 
 
 @router.get("/palestine/linear-closures/geojson")
-async def get_palestine_linear_closures(response: Response):
+async def get_palestine_linear_closures(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get linear road closures as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "linear_closures.geojson")
+    return cached_json_response(request, PALESTINE_DIR / "linear_closures.geojson", format=format)
 
 
 @router.get("/palestine/settlements/geojson")
-async def get_palestine_settlements(response: Response):
+async def get_palestine_settlements(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get settlements from OSM data as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "osm_settlements_places.geojson")
+    return cached_json_response(
+        request, PALESTINE_DIR / "osm_settlements_places.geojson", format=format
+    )
 
 
 @router.get("/palestine/walls/geojson")
-async def get_palestine_walls(response: Response):
+async def get_palestine_walls(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get walls and barriers from OSM as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(PALESTINE_DIR / "osm_walls_barriers.geojson")
+    return cached_json_response(
+        request, PALESTINE_DIR / "osm_walls_barriers.geojson", format=format
+    )
 
 
 @router.get("/palestine/file-summary")
-async def get_palestine_file_summary(response: Response):
+async def get_palestine_file_summary(request: Request):
     """Get summary of available Palestine data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = PALESTINE_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, PALESTINE_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -164,56 +219,62 @@ async def get_palestine_file_summary(response: Response):
 # ==========================================
 
 @router.get("/western-sahara/wall/geojson")
-async def get_western_sahara_wall(response: Response):
+async def get_western_sahara_wall(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get the Moroccan Sand Wall/Berm (2,700km) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WESTERN_SAHARA_DIR / "moroccan_wall_full.json")
+    return cached_json_response(
+        request, WESTERN_SAHARA_DIR / "moroccan_wall_full.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/western-sahara/berm/geojson")
-async def get_western_sahara_berm(response: Response):
+async def get_western_sahara_berm(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get additional sand berm data as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WESTERN_SAHARA_DIR / "sand_berm_osm.json")
+    return cached_json_response(
+        request, WESTERN_SAHARA_DIR / "sand_berm_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/western-sahara/minefields/geojson")
-async def get_western_sahara_minefields(response: Response):
+async def get_western_sahara_minefields(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get minefield locations as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WESTERN_SAHARA_DIR / "minefields_osm.json")
+    return cached_json_response(
+        request, WESTERN_SAHARA_DIR / "minefields_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/western-sahara/settlements/geojson")
-async def get_western_sahara_settlements(response: Response):
+async def get_western_sahara_settlements(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get settlements as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WESTERN_SAHARA_DIR / "settlements_osm.json")
+    return cached_json_response(
+        request, WESTERN_SAHARA_DIR / "settlements_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/western-sahara/refugee-camps/geojson")
-async def get_western_sahara_refugee_camps(response: Response):
+async def get_western_sahara_refugee_camps(
+    request: Request, format: GeoFormat = Depends(geo_format)
+):
     """Get Sahrawi refugee camps in Tindouf as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WESTERN_SAHARA_DIR / "sahrawi_refugee_camps.json")
+    return cached_json_response(
+        request,
+        WESTERN_SAHARA_DIR / "sahrawi_refugee_camps.json",
+        load_osm_as_geojson,
+        format=format,
+    )
 
 
 @router.get("/western-sahara/boundary/geojson")
-async def get_western_sahara_boundary(response: Response):
+async def get_western_sahara_boundary(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Western Sahara administrative boundaries."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(WESTERN_SAHARA_DIR / "esh_admin0.geojson")
+    return cached_json_response(request, WESTERN_SAHARA_DIR / "esh_admin0.geojson", format=format)
 
 
 @router.get("/western-sahara/file-summary")
-async def get_western_sahara_file_summary(response: Response):
+async def get_western_sahara_file_summary(request: Request):
     """Get summary of available Western Sahara data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = WESTERN_SAHARA_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(
+        request, WESTERN_SAHARA_DIR / "_index.json", load_index, max_age=3600
+    )
 
 
 # ==========================================
@@ -221,49 +282,54 @@ async def get_western_sahara_file_summary(response: Response):
 # ==========================================
 
 @router.get("/kurdistan/destroyed-villages/geojson")
-async def get_kurdistan_destroyed_villages(response: Response):
+async def get_kurdistan_destroyed_villages(
+    request: Request, format: GeoFormat = Depends(geo_format)
+):
     """Get destroyed Kurdish villages as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KURDISTAN_DIR / "destroyed_villages_osm.json")
+    return cached_json_response(
+        request, KURDISTAN_DIR / "destroyed_villages_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kurdistan/military/geojson")
-async def get_kurdistan_military(response: Response):
+async def get_kurdistan_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military installations in Kurdish regions as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KURDISTAN_DIR / "military_installations_osm.json")
+    return cached_json_response(
+        request,
+        KURDISTAN_DIR / "military_installations_osm.json",
+        load_osm_as_geojson,
+        format=format,
+    )
 
 
 @router.get("/kurdistan/dams/geojson")
-async def get_kurdistan_dams(response: Response):
+async def get_kurdistan_dams(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get dam projects in Kurdish areas as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KURDISTAN_DIR / "turkey_dams_osm.json")
+    return cached_json_response(
+        request, KURDISTAN_DIR / "turkey_dams_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kurdistan/ilisu-dam/geojson")
-async def get_kurdistan_ilisu_dam(response: Response):
+async def get_kurdistan_ilisu_dam(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Ilisu Dam (flooded Hasankeyf) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KURDISTAN_DIR / "ilisu_dam_osm.json")
+    return cached_json_response(
+        request, KURDISTAN_DIR / "ilisu_dam_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kurdistan/iraqi-kurdistan/geojson")
-async def get_iraqi_kurdistan(response: Response):
+async def get_iraqi_kurdistan(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Iraqi Kurdistan Region data as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KURDISTAN_DIR / "iraqi_kurdistan_osm.json")
+    return cached_json_response(
+        request, KURDISTAN_DIR / "iraqi_kurdistan_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kurdistan/file-summary")
-async def get_kurdistan_file_summary(response: Response):
+async def get_kurdistan_file_summary(request: Request):
     """Get summary of available Kurdistan data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = KURDISTAN_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, KURDISTAN_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -271,49 +337,49 @@ async def get_kurdistan_file_summary(response: Response):
 # ==========================================
 
 @router.get("/kashmir/line-of-control/geojson")
-async def get_kashmir_loc(response: Response):
+async def get_kashmir_loc(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Line of Control as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KASHMIR_DIR / "line_of_control_osm.json")
+    return cached_json_response(
+        request, KASHMIR_DIR / "line_of_control_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kashmir/boundaries/geojson")
-async def get_kashmir_boundaries(response: Response):
+async def get_kashmir_boundaries(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Kashmir administrative boundaries as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KASHMIR_DIR / "kashmir_boundaries_osm.json")
+    return cached_json_response(
+        request, KASHMIR_DIR / "kashmir_boundaries_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kashmir/checkpoints/geojson")
-async def get_kashmir_checkpoints(response: Response):
+async def get_kashmir_checkpoints(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military checkpoints as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KASHMIR_DIR / "checkpoints_osm.json")
+    return cached_json_response(
+        request, KASHMIR_DIR / "checkpoints_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kashmir/military/geojson")
-async def get_kashmir_military(response: Response):
+async def get_kashmir_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military installations as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KASHMIR_DIR / "military_installations_osm.json")
+    return cached_json_response(
+        request, KASHMIR_DIR / "military_installations_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kashmir/graves/geojson")
-async def get_kashmir_graves(response: Response):
+async def get_kashmir_graves(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get cemeteries and martyrs' graveyards as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(KASHMIR_DIR / "graves_cemeteries_osm.json")
+    return cached_json_response(
+        request, KASHMIR_DIR / "graves_cemeteries_osm.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/kashmir/file-summary")
-async def get_kashmir_file_summary(response: Response):
+async def get_kashmir_file_summary(request: Request):
     """Get summary of available Kashmir data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = KASHMIR_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, KASHMIR_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -323,42 +389,41 @@ async def get_kashmir_file_summary(response: Response):
 TIBET_DIR = BASE_DIR / "tibet"
 
 @router.get("/tibet/monasteries/geojson")
-async def get_tibet_monasteries(response: Response):
+async def get_tibet_monasteries(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Buddhist monasteries and temples as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(TIBET_DIR / "monasteries_temples.json")
+    return cached_json_response(
+        request, TIBET_DIR / "monasteries_temples.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/tibet/military/geojson")
-async def get_tibet_military(response: Response):
+async def get_tibet_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military installations as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(TIBET_DIR / "military_installations.json")
+    return cached_json_response(
+        request, TIBET_DIR / "military_installations.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/tibet/railway/geojson")
-async def get_tibet_railway(response: Response):
+async def get_tibet_railway(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get railway infrastructure (Qinghai-Tibet Railway) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(TIBET_DIR / "railway_infrastructure.json")
+    return cached_json_response(
+        request, TIBET_DIR / "railway_infrastructure.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/tibet/prisons/geojson")
-async def get_tibet_prisons(response: Response):
+async def get_tibet_prisons(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get prisons and detention facilities as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(TIBET_DIR / "prisons_detention.json")
+    return cached_json_response(
+        request, TIBET_DIR / "prisons_detention.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/tibet/file-summary")
-async def get_tibet_file_summary(response: Response):
+async def get_tibet_file_summary(request: Request):
     """Get summary of available Tibet data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = TIBET_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, TIBET_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -368,35 +433,33 @@ async def get_tibet_file_summary(response: Response):
 WEST_PAPUA_DIR = BASE_DIR / "west_papua"
 
 @router.get("/west-papua/freeport-mine/geojson")
-async def get_west_papua_freeport(response: Response):
+async def get_west_papua_freeport(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Freeport/Grasberg mine area as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WEST_PAPUA_DIR / "freeport_mine.json")
+    return cached_json_response(
+        request, WEST_PAPUA_DIR / "freeport_mine.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/west-papua/military/geojson")
-async def get_west_papua_military(response: Response):
+async def get_west_papua_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military installations as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WEST_PAPUA_DIR / "military_installations.json")
+    return cached_json_response(
+        request, WEST_PAPUA_DIR / "military_installations.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/west-papua/settlements/geojson")
-async def get_west_papua_settlements(response: Response):
+async def get_west_papua_settlements(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get settlements (including transmigration) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(WEST_PAPUA_DIR / "settlements.json")
+    return cached_json_response(
+        request, WEST_PAPUA_DIR / "settlements.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/west-papua/file-summary")
-async def get_west_papua_file_summary(response: Response):
+async def get_west_papua_file_summary(request: Request):
     """Get summary of available West Papua data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = WEST_PAPUA_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, WEST_PAPUA_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -406,42 +469,41 @@ async def get_west_papua_file_summary(response: Response):
 IRELAND_DIR = BASE_DIR / "ireland"
 
 @router.get("/ireland/peace-walls/geojson")
-async def get_ireland_peace_walls(response: Response):
+async def get_ireland_peace_walls(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Belfast peace walls and interface barriers as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(IRELAND_DIR / "peace_walls_belfast.json")
+    return cached_json_response(
+        request, IRELAND_DIR / "peace_walls_belfast.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/ireland/military/geojson")
-async def get_ireland_military(response: Response):
+async def get_ireland_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get military installations, forts, and castles as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(IRELAND_DIR / "military_installations.json")
+    return cached_json_response(
+        request, IRELAND_DIR / "military_installations.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/ireland/border-checkpoints/geojson")
-async def get_ireland_border_checkpoints(response: Response):
+async def get_ireland_border_checkpoints(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get border checkpoints and customs posts as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(IRELAND_DIR / "border_checkpoints.json")
+    return cached_json_response(
+        request, IRELAND_DIR / "border_checkpoints.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/ireland/partition-boundary/geojson")
-async def get_ireland_partition_boundary(response: Response):
+async def get_ireland_partition_boundary(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Northern Ireland partition boundary (1921) as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_osm_as_geojson(IRELAND_DIR / "partition_boundary.json")
+    return cached_json_response(
+        request, IRELAND_DIR / "partition_boundary.json", load_osm_as_geojson, format=format
+    )
 
 
 @router.get("/ireland/file-summary")
-async def get_ireland_file_summary(response: Response):
+async def get_ireland_file_summary(request: Request):
     """Get summary of available Ireland data files."""
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    index_file = IRELAND_DIR / "_index.json"
-    if index_file.exists():
-        with open(index_file, 'r') as f:
-            return json.load(f)
-    return {"error": "Index file not found"}
+    return cached_json_response(request, IRELAND_DIR / "_index.json", load_index, max_age=3600)
 
 
 # ==========================================
@@ -452,31 +514,29 @@ WEST_PAPUA_DIR = BASE_DIR / "west_papua"
 
 
 @router.get("/west-papua/overview")
-async def get_west_papua_overview(response: Response):
+async def get_west_papua_overview(request: Request):
     """Get West Papua occupation overview data."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(WEST_PAPUA_DIR / "overview.json")
+    return cached_json_response(request, WEST_PAPUA_DIR / "overview.json")
 
 
 @router.get("/west-papua/massacres/geojson")
-async def get_west_papua_massacres(response: Response):
+async def get_west_papua_massacres(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get West Papua massacres as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(WEST_PAPUA_DIR / "massacres.geojson")
+    return cached_json_response(request, WEST_PAPUA_DIR / "massacres.geojson", format=format)
 
 
 @router.get("/west-papua/military/geojson")
-async def get_west_papua_military(response: Response):
+async def get_west_papua_military(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get Indonesian military installations in West Papua as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(WEST_PAPUA_DIR / "military.geojson")
+    return cached_json_response(request, WEST_PAPUA_DIR / "military.geojson", format=format)
 
 
 @router.get("/west-papua/extractive-industries/geojson")
-async def get_west_papua_extractive(response: Response):
+async def get_west_papua_extractive(request: Request, format: GeoFormat = Depends(geo_format)):
     """Get extractive industries (mines, gas) in West Papua as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(WEST_PAPUA_DIR / "extractive_industries.geojson")
+    return cached_json_response(
+        request, WEST_PAPUA_DIR / "extractive_industries.geojson", format=format
+    )
 
 
 # ==========================================
@@ -487,51 +547,32 @@ UYGHUR_DIR = BASE_DIR / "uyghur_region"
 
 
 @router.get("/uyghur-region/overview")
-async def get_uyghur_overview(response: Response):
+async def get_uyghur_overview(request: Request):
     """Get Uyghur Region overview data."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    overview_file = UYGHUR_DIR / "overview.json"
-    if overview_file.exists():
-        with open(overview_file, "r") as f:
-            return json.load(f)
-    return {"error": "Overview file not found"}
+    return cached_json_response(request, UYGHUR_DIR / "overview.json", load_overview)
 
 
 @router.get("/uyghur-region/detention-facilities/geojson")
-async def get_uyghur_detention_facilities(response: Response):
+async def get_uyghur_detention_facilities(
+    request: Request, format: GeoFormat = Depends(geo_format)
+):
     """Get detention/re-education facilities as GeoJSON."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    return load_geojson(UYGHUR_DIR / "detention_facilities.geojson")
+    return cached_json_response(request, UYGHUR_DIR / "detention_facilities.geojson", format=format)
 
 
 @router.get("/uyghur-region/detention-facilities")
-async def get_uyghur_detention_list(response: Response):
+async def get_uyghur_detention_list(request: Request):
     """Get detention facilities as JSON list."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    facilities_file = UYGHUR_DIR / "detention_facilities.json"
-    if facilities_file.exists():
-        with open(facilities_file, "r") as f:
-            return json.load(f)
-    return []
+    return cached_json_response(request, UYGHUR_DIR / "detention_facilities.json", load_json_list)
 
 
 @router.get("/uyghur-region/historical-events")
-async def get_uyghur_historical_events(response: Response):
+async def get_uyghur_historical_events(request: Request):
     """Get historical events timeline."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    events_file = UYGHUR_DIR / "historical_events.json"
-    if events_file.exists():
-        with open(events_file, "r") as f:
-            return json.load(f)
-    return []
+    return cached_json_response(request, UYGHUR_DIR / "historical_events.json", load_json_list)
 
 
 @router.get("/uyghur-region/key-figures")
-async def get_uyghur_key_figures(response: Response):
+async def get_uyghur_key_figures(request: Request):
     """Get key figures (activists, scholars, political prisoners)."""
-    response.headers["Cache-Control"] = "public, max-age=86400"
-    figures_file = UYGHUR_DIR / "key_figures.json"
-    if figures_file.exists():
-        with open(figures_file, "r") as f:
-            return json.load(f)
-    return []
+    return cached_json_response(request, UYGHUR_DIR / "key_figures.json", load_json_list)
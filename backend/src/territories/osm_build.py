@@ -0,0 +1,319 @@
+"""Offline build of GeoJSON artifacts from raw OSM Overpass files.
+
+The liberation overlays are scraped as Overpass JSON, either with inline
+`geometry` or as `out body; >; out skel` dumps where ways only reference
+node ids. This module resolves node references, assembles multipolygon
+and boundary relations into rings, drops degenerate geometries and writes
+one compact GeoJSON artifact per source file. It also writes a manifest
+that records each artifact's size and feature count.
+
+Run with:
+    python -m src.territories.osm_build [--region kashmir]
+"""
+import argparse
+import json
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.http_cache import dump_json
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
+SOURCE_DIR = DATA_DIR / "scraped" / "liberation"
+BUILD_DIR = DATA_DIR / "built" / "liberation"
+MANIFEST_NAME = "manifest.json"
+
+# ~10 cm at the equator; keeps artifacts small without visible loss
+COORDINATE_PRECISION = 6
+
+# Closed ways with these keys are lines (walls, fences), not areas
+LINEAR_KEYS = {"barrier", "highway", "railway", "waterway", "power", "route"}
+
+Coord = Tuple[float, float]
+
+
+def _coord(lon: float, lat: float) -> Optional[Coord]:
+    if lon is None or lat is None or not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        return None
+    return (round(lon, COORDINATE_PRECISION), round(lat, COORDINATE_PRECISION))
+
+
+def _clean_line(coords: Iterable[Optional[Coord]]) -> List[Coord]:
+    """Drop invalid points and consecutive duplicates."""
+    line: List[Coord] = []
+    for c in coords:
+        if c is not None and (not line or line[-1] != c):
+            line.append(c)
+    return line
+
+
+def _is_area(tags: Dict[str, Any]) -> bool:
+    if tags.get("area") == "yes":
+        return True
+    if tags.get("area") == "no":
+        return False
+    return not LINEAR_KEYS.intersection(tags)
+
+
+def merge_lines(lines: List[List[Coord]]) -> Tuple[List[List[Coord]], List[List[Coord]]]:
+    """Join way segments end to end.
+
+    Returns (closed rings, open chains). Segments may be reversed to
+    connect, as relation members have no guaranteed direction.
+    """
+    rings: List[List[Coord]] = []
+    pending = [line for line in lines if len(line) >= 2]
+    by_end: Dict[Coord, List[int]] = defaultdict(list)
+    for i, line in enumerate(pending):
+        by_end[line[0]].append(i)
+        by_end[line[-1]].append(i)
+    used = [False] * len(pending)
+
+    def take(point: Coord) -> Optional[List[Coord]]:
+        for i in by_end.get(point, ()):
+            if not used[i]:
+                used[i] = True
+                line = pending[i]
+                return line if line[0] == point else line[::-1]
+        return None
+
+    chains: List[List[Coord]] = []
+    for i, line in enumerate(pending):
+        if used[i]:
+            continue
+        used[i] = True
+        chain = list(line)
+        # Grow forwards, then backwards, until the chain closes or stalls
+        while chain[0] != chain[-1]:
+            nxt = take(chain[-1])
+            if nxt is None:
+                break
+            chain.extend(nxt[1:])
+        while chain[0] != chain[-1]:
+            prev = take(chain[0])
+            if prev is None:
+                break
+            chain[:0] = prev[::-1][:-1]
+        if chain[0] == chain[-1] and len(chain) >= 4:
+            rings.append(chain)
+        else:
+            chains.append(chain)
+    return rings, chains
+
+
+def _point_in_ring(point: Coord, ring: List[Coord]) -> bool:
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _polygon_geometry(outers: List[List[Coord]], inners: List[List[Coord]]) -> Optional[dict]:
+    """Attach each inner ring to the outer ring containing it."""
+    if not outers:
+        return None
+    polygons = [[outer] for outer in outers]
+    for inner in inners:
+        for polygon in polygons:
+            if _point_in_ring(inner[0], polygon[0]):
+                polygon.append(inner)
+                break
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _line_geometry(lines: List[List[Coord]]) -> Optional[dict]:
+    lines = [line for line in lines if len(line) >= 2]
+    if not lines:
+        return None
+    if len(lines) == 1:
+        return {"type": "LineString", "coordinates": lines[0]}
+    return {"type": "MultiLineString", "coordinates": lines}
+
+
+def convert_osm_to_geojson(osm_data: dict) -> dict:
+    """Convert OSM Overpass JSON to a GeoJSON FeatureCollection.
+
+    Untagged nodes and ways that only exist as parts of other elements
+    are not emitted as features of their own.
+    """
+    elements = osm_data.get("elements", [])
+    nodes: Dict[int, Coord] = {}
+    ways: Dict[int, List[Coord]] = {}
+    way_members, relation_members = set(), set()
+
+    for el in elements:
+        if el.get("type") == "node":
+            c = _coord(el.get("lon"), el.get("lat"))
+            if c is not None:
+                nodes[el["id"]] = c
+        elif el.get("type") == "relation":
+            relation_members.update(
+                (m["type"], m["ref"]) for m in el.get("members", []) if "ref" in m
+            )
+
+    for el in elements:
+        if el.get("type") != "way":
+            continue
+        if el.get("geometry"):
+            coords = (_coord(g.get("lon"), g.get("lat")) for g in el["geometry"] if g)
+        else:
+            coords = (nodes.get(ref) for ref in el.get("nodes", []))
+        ways[el["id"]] = _clean_line(coords)
+        way_members.update(el.get("nodes", []))
+
+    features = []
+
+    def add(el: dict, geometry: Optional[dict]) -> None:
+        # `out center` queries only give ways and relations a centre point
+        if geometry is None and el.get("center"):
+            c = _coord(el["center"].get("lon"), el["center"].get("lat"))
+            geometry = {"type": "Point", "coordinates": c} if c else None
+        if geometry is not None:
+            features.append({
+                "type": "Feature",
+                "id": f"{el['type']}/{el['id']}",
+                "properties": el.get("tags", {}),
+                "geometry": geometry,
+            })
+
+    for el in elements:
+        kind, tags = el.get("type"), el.get("tags")
+        if kind == "node":
+            if not tags and (el["id"] in way_members or ("node", el["id"]) in relation_members):
+                continue
+            c = nodes.get(el["id"])
+            add(el, {"type": "Point", "coordinates": c} if c else None)
+
+        elif kind == "way":
+            if not tags and ("way", el["id"]) in relation_members:
+                continue
+            coords = ways.get(el["id"], [])
+            if len(coords) >= 4 and coords[0] == coords[-1] and _is_area(tags or {}):
+                add(el, {"type": "Polygon", "coordinates": [coords]})
+            else:
+                add(el, _line_geometry([coords]))
+
+        elif kind == "relation":
+            outers, inners = [], []
+            for member in el.get("members", []):
+                if member.get("type") != "way":
+                    continue
+                if member.get("geometry"):
+                    line = _clean_line(
+                        _coord(g.get("lon"), g.get("lat")) for g in member["geometry"] if g
+                    )
+                else:
+                    line = ways.get(member.get("ref"), [])
+                if member.get("role") == "inner":
+                    inners.append(line)
+                elif member.get("role") in ("outer", "", None):
+                    outers.append(line)
+                else:
+                    continue
+
+            if (tags or {}).get("type") in ("multipolygon", "boundary"):
+                outer_rings, open_chains = merge_lines(outers)
+                inner_rings, _ = merge_lines(inners)
+                geometry = _polygon_geometry(outer_rings, inner_rings)
+                # Incomplete boundaries (clipped downloads) fall back to lines
+                add(el, geometry or _line_geometry(open_chains))
+            else:
+                rings, chains = merge_lines(outers + inners)
+                add(el, _line_geometry(rings + chains))
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def is_osm_file(data: Any) -> bool:
+    return isinstance(data, dict) and "elements" in data
+
+
+def artifact_path(source: Path, source_dir: Path = SOURCE_DIR, build_dir: Path = BUILD_DIR) -> Path:
+    """Return where the built artifact for a source file lives."""
+    return build_dir / source.relative_to(source_dir).with_suffix(".geojson")
+
+
+def build_file(
+    source: Path, source_dir: Path = SOURCE_DIR, build_dir: Path = BUILD_DIR
+) -> Optional[dict]:
+    """Build one artifact; returns its manifest entry, or None if not OSM."""
+    try:
+        with open(source, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        # Failed scrapes leave empty files; serve an empty layer for them
+        logger.warning(f"{source} is not valid JSON ({e}); writing an empty layer")
+        data = {"elements": []}
+    if not is_osm_file(data):
+        return None
+
+    geojson = convert_osm_to_geojson(data)
+    body = dump_json(geojson)
+    target = artifact_path(source, source_dir, build_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, target)
+
+    return {
+        "artifact": str(target.relative_to(build_dir)),
+        "bytes": len(body),
+        "features": len(geojson["features"]),
+        "source_mtime_ns": source.stat().st_mtime_ns,
+    }
+
+
+def build_all(
+    source_dir: Path = SOURCE_DIR,
+    build_dir: Path = BUILD_DIR,
+    region: Optional[str] = None,
+) -> Dict[str, dict]:
+    """Build artifacts for every OSM file and write the manifest."""
+    manifest_file = build_dir / MANIFEST_NAME
+    manifest: Dict[str, dict] = {}
+    if manifest_file.exists():
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+
+    pattern = f"{region}/*.json" if region else "*/*.json"
+    for source in sorted(source_dir.glob(pattern)):
+        entry = build_file(source, source_dir, build_dir)
+        if entry is not None:
+            manifest[str(source.relative_to(source_dir))] = entry
+            logger.info(
+                f"Built {entry['artifact']}: {entry['features']} features, {entry['bytes']} bytes"
+            )
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+    with open(manifest_file, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build GeoJSON artifacts from raw OSM files")
+    parser.add_argument("--region", help="Only build one region directory (e.g. kashmir)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("BUILDING OSM GEOJSON ARTIFACTS")
+    print("=" * 60)
+
+    manifest = build_all(region=args.region)
+
+    for source, entry in sorted(manifest.items()):
+        print(f"  {source}: {entry['features']} features, {entry['bytes'] / 1024:.0f} KB")
+    print(f"BUILT: {len(manifest)} artifacts in {BUILD_DIR}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -13,7 +13,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
-from ..cache import cache_get, cache_set, make_cache_key, CachePrefix, CacheTTL
+from ..cache import cache_fetch, make_cache_key, CachePrefix, CacheTTL
 
 router = APIRouter()
 
@@ -481,74 +481,69 @@ async def get_combined_liberation_data(
         region=region,
     )
 
-    cached = await cache_get(cache_key)
-    if cached:
-        return cached
-
-    combined_data = {
-        "regions": {
-            "palestine": {
-                "occupations": [],
-                "resistance": [],
-                "features": {
-                    "nakba_villages": 0,
-                    "settlements": 0,
+    async def compute() -> dict:
+        combined_data = {
+            "regions": {
+                "palestine": {
+                    "occupations": [],
+                    "resistance": [],
+                    "features": {
+                        "nakba_villages": 0,
+                        "settlements": 0,
+                        "checkpoints": 0,
+                        "separation_wall_segments": 0,
+                        "documented_massacres": 0,
+                    },
+                },
+                "ireland": {
+                    "troubles_events": 0,
+                    "famine_counties": 0,
+                },
+                "kashmir": {
+                    "military_installations": 0,
                     "checkpoints": 0,
-                    "separation_wall_segments": 0,
-                    "documented_massacres": 0,
+                    "events": 0,
+                },
+                "tibet": {
+                    "destroyed_monasteries": 0,
+                    "political_prisoners": 0,
+                    "events": 0,
+                },
+                "kurdistan": {
+                    "destroyed_villages": 0,
+                    "massacres": 0,
+                    "events": 0,
+                },
+                "western_sahara": {
+                    "sand_berms": 0,
+                    "settlements": 0,
+                    "refugee_camps": 0,
+                },
+                "west_papua": {
+                    "military_installations": 0,
+                    "massacres": 0,
+                    "resource_extraction_sites": 0,
                 },
             },
-            "ireland": {
-                "troubles_events": 0,
-                "famine_counties": 0,
-            },
-            "kashmir": {
-                "military_installations": 0,
-                "checkpoints": 0,
-                "events": 0,
-            },
-            "tibet": {
-                "destroyed_monasteries": 0,
-                "political_prisoners": 0,
-                "events": 0,
-            },
-            "kurdistan": {
-                "destroyed_villages": 0,
-                "massacres": 0,
-                "events": 0,
-            },
-            "western_sahara": {
-                "sand_berms": 0,
-                "settlements": 0,
-                "refugee_camps": 0,
-            },
-            "west_papua": {
-                "military_installations": 0,
-                "massacres": 0,
-                "resource_extraction_sites": 0,
+            "total_occupations": 0,
+            "total_resistance_movements": 0,
+            "metadata": {
+                "generated_at": "2024-01-01T00:00:00Z",
+                "coverage": "global",
             },
-        },
-        "total_occupations": 0,
-        "total_resistance_movements": 0,
-        "metadata": {
-            "generated_at": "2024-01-01T00:00:00Z",
-            "coverage": "global",
-        },
-    }
-
-    # If specific region requested, include only that region
-    if region and region.lower() in combined_data["regions"]:
-        filtered = {
-            "regions": {region.lower(): combined_data["regions"][region.lower()]},
-            "metadata": combined_data["metadata"],
         }
-        await cache_set(cache_key, filtered, CacheTTL.VERY_LONG)
-        return filtered
 
-    # Cache combined data
-    await cache_set(cache_key, combined_data, CacheTTL.VERY_LONG)
+        # If specific region requested, include only that region
+        if region and region.lower() in combined_data["regions"]:
+            filtered = {
+                "regions": {region.lower(): combined_data["regions"][region.lower()]},
+                "metadata": combined_data["metadata"],
+            }
+            return filtered
+
+        return combined_data
 
-    return combined_data
+    return await cache_fetch(cache_key, compute, CacheTTL.VERY_LONG)
 
 
 # ==========================================
@@ -0,0 +1,648 @@
+"""
+Tests for the Caching Layer
+
+Tests cover the per-worker file cache used by static data routers,
+ETag revalidation of pre-serialized responses, the in-process tier in
+front of Redis, stampede protection in cache_fetch, tag invalidation,
+the binary value codec, startup warm-up and deferring invalidation until
+a transaction commits.
+"""
+
+import asyncio
+import json
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src import cache as cache_module
+from src.cache import (
+    LocalCache,
+    apply_invalidation,
+    cache_fetch,
+    cache_get,
+    cache_set,
+    cache_tag,
+    invalidate_tags,
+    jittered,
+    local_ttl,
+)
+from src.core import cache_codec, warmup
+from src.core.file_cache import FileCache
+from src.core.http_cache import CachedBody, cached_response
+from src.database import run_after_commit, run_committed_callbacks
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class TestFileCache:
+    """Tests for mtime-checked file caching."""
+
+    @pytest.fixture
+    def data_file(self, tmp_path):
+        path = tmp_path / "layer.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": []}))
+        return path
+
+    def test_repeat_hits_skip_loader(self, data_file):
+        """Test a file is loaded once and then served from memory."""
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return read_json(path)
+
+        cache = FileCache()
+        first = cache.get(data_file, loader)
+        second = cache.get(data_file, loader)
+
+        assert first is second
+        assert json.loads(first.body)["type"] == "FeatureCollection"
+        assert len(calls) == 1
+
+    def test_changed_file_is_reloaded(self, data_file):
+        """Test a new mtime invalidates the cached body."""
+        cache = FileCache(recheck_seconds=0)
+        cache.get(data_file, read_json)
+
+        data_file.write_text(json.dumps({"type": "FeatureCollection", "features": [1]}))
+        stat = data_file.stat()
+        os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert json.loads(cache.get(data_file, read_json).body)["features"] == [1]
+
+    def test_changed_dependency_is_reloaded(self, data_file, tmp_path):
+        """Test a rebuilt file the loader depends on invalidates the body."""
+        artifact = tmp_path / "layer.built.json"
+        artifact.write_text(json.dumps({"features": []}))
+
+        def loader(path):
+            return read_json(artifact)
+
+        loader.dependencies = lambda path: [artifact]
+        cache = FileCache(recheck_seconds=0)
+        cache.get(data_file, loader)
+
+        artifact.write_text(json.dumps({"features": [1]}))
+        stat = artifact.stat()
+        os.utime(artifact, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert json.loads(cache.get(data_file, loader).body)["features"] == [1]
+
+    def test_byte_budget_evicts_oldest(self, tmp_path):
+        """Test least recently used entries are evicted past the budget."""
+        paths = []
+        for name in ["a", "b", "c"]:
+            path = tmp_path / f"{name}.json"
+            path.write_text(json.dumps("x" * 40))
+            paths.append(path)
+
+        entry_size = CachedBody.from_data("x" * 40)
+        entry_size.gzipped()
+        cache = FileCache(max_bytes=entry_size.size * 2 + 10)
+        for path in paths:
+            cache.get(path, read_json)
+
+        assert cache.size <= cache.max_bytes
+        assert cache.stats()["entries"] == 2
+        cache.get(paths[0], read_json)
+        assert cache.misses == 4
+
+
+class TestConditionalResponses:
+    """Tests for ETag and pre-compressed cached responses."""
+
+    @pytest.fixture
+    def client(self):
+        body = CachedBody.from_data({"features": ["x" * 2000]})
+        app = FastAPI()
+
+        @app.get("/layer")
+        async def layer(request: Request):
+            return cached_response(request, body, max_age=60)
+
+        return TestClient(app)
+
+    def test_matching_etag_returns_304(self, client):
+        """Test revalidation with the current ETag skips the body."""
+        first = client.get("/layer")
+        etag = first.headers["etag"]
+
+        second = client.get("/layer", headers={"If-None-Match": f'W/{etag}, "other"'})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_pre_gzipped_body(self, client):
+        """Test gzip-capable clients get the stored compressed copy."""
+        response = client.get("/layer", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["features"][0] == "x" * 2000
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the cache helpers."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def pttl(self, key):
+        return self.ttls.get(key, 60) * 1000 if key in self.data else -2
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.data.get(key, {}).items(), key=lambda item: -item[1])
+        return ranked[start:end + 1]
+
+    async def zincrby(self, key, amount, member):
+        scores = self.data.setdefault(key, {})
+        scores[member] = scores.get(member, 0) + amount
+        return scores[member]
+
+    async def publish(self, channel, message):
+        self.published.append(message)
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    async def expire(self, key, ttl, nx=False, gt=False):
+        current = self.ttls.get(key)
+        if (nx and current is not None) or (gt and (current is None or ttl <= current)):
+            return False
+        self.ttls[key] = ttl
+        return True
+
+    async def delete(self, *keys):
+        deleted = [key for key in keys if key in self.data]
+        for key in deleted:
+            del self.data[key]
+            self.ttls.pop(key, None)
+        return len(deleted)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append(getattr(self.client, name)(*args, **kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+@pytest.fixture
+def redis_client(request, monkeypatch):
+    """A FakeRedis behind the cache helpers, with a fresh local tier.
+
+    The local tier is off unless the test is marked with_local_cache,
+    which parametrizes this fixture indirectly with True, as a subscribed
+    worker would have it.
+    """
+    client = FakeRedis()
+    local = LocalCache()
+    local.enabled = getattr(request, "param", False)
+
+    async def get_redis():
+        return client
+
+    monkeypatch.setattr(cache_module, "get_redis", get_redis)
+    monkeypatch.setattr(cache_module, "_local_cache", local)
+    return client
+
+
+with_local_cache = pytest.mark.parametrize("redis_client", [True], indirect=True)
+
+
+class TestLocalCache:
+    """Tests for the in-process cache tier."""
+
+    @with_local_cache
+    async def test_hits_skip_redis(self, redis_client):
+        """Test repeat reads are served locally, as decoded copies."""
+        value = {"features": [1, 2]}
+        await cache_set("geojson:layer", value, 600)
+        value["features"].append(3)
+
+        assert await cache_get("geojson:layer") == {"features": [1, 2]}
+        assert redis_client.gets == 0
+        assert json.loads(redis_client.published[0])["keys"] == ["geojson:layer"]
+
+    @with_local_cache
+    async def test_redis_hits_fill_local_cache(self, redis_client):
+        """Test a value read from Redis is kept for the next read."""
+        redis_client.data["countries:all"] = json.dumps(["Cuba"])
+        assert await cache_get("countries:all") == ["Cuba"]
+        assert await cache_get("countries:all") == ["Cuba"]
+        assert redis_client.gets == 1
+
+    @with_local_cache
+    async def test_token_blacklist_bypasses_local_cache(self, redis_client):
+        """Test excluded prefixes always go to Redis."""
+        await cache_set("token:blacklist:abc", {"blacklisted": True}, 600)
+        await cache_get("token:blacklist:abc")
+        assert redis_client.gets == 1
+
+    def test_budget_ttl_and_patterns(self):
+        """Test byte-budget eviction, expiry and pattern invalidation."""
+        local = LocalCache(max_bytes=100)
+        local.put("stats:a", 1, 60, ttl=60)
+        local.put("stats:b", 2, 60, ttl=60)
+        assert local.get("stats:a") is cache_module._MISSING
+        assert local.size == 60
+
+        local.put("search:q", 3, 10, ttl=0)
+        assert local.get("search:q") is cache_module._MISSING
+
+        local.put("search:q", 3, 10, ttl=60)
+        local.discard_pattern("search:*")
+        assert local.get("search:q") is cache_module._MISSING
+        assert local.get("stats:b") == 2
+
+    def test_prefix_ttls(self):
+        """Test local lifetimes follow the prefix TTL and the Redis TTL."""
+        assert local_ttl("stats:overview", 3600) == 300
+        assert local_ttl("geojson:layer", 60) == 60
+
+    def test_invalidation_messages(self, monkeypatch):
+        """Test other workers' messages drop entries and our own are ignored."""
+        local = LocalCache()
+        monkeypatch.setattr(cache_module, "_local_cache", local)
+        local.put("countries:all", [], 10, ttl=60)
+        local.put("people:1", {}, 10, ttl=60)
+
+        own = {"origin": cache_module._worker_id, "keys": ["countries:all"]}
+        apply_invalidation(json.dumps(own))
+        assert local.get("countries:all") == []
+
+        other = {"origin": "other", "keys": ["countries:all"], "patterns": ["people:*"]}
+        apply_invalidation(json.dumps(other))
+        assert local.stats()["entries"] == 0
+
+
+class TestCacheFetch:
+    """Tests for single-flight computation and stale-while-revalidate."""
+
+    @staticmethod
+    def counting(value, delay=0.0):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(delay)
+            return value
+
+        return compute, calls
+
+    async def test_joining_a_computation_releases_the_lock(self, redis_client, monkeypatch):
+        """Test a refresh that finds the key in flight gives its lock back."""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({"total": 3})
+        monkeypatch.setitem(cache_module._inflight, "stats:overview", future)
+        redis_client.data["lock:stats:overview"] = "token"
+        compute, calls = self.counting({"total": 4})
+
+        value = await cache_module._compute("stats:overview", compute, 300, 60, "token", ())
+
+        assert value == {"total": 3}
+        assert not calls
+        assert "lock:stats:overview" not in redis_client.data
+
+    async def test_concurrent_misses_compute_once(self, redis_client):
+        """Test callers missing together share one computation."""
+        compute, calls = self.counting({"total": 3}, delay=0.05)
+
+        values = await asyncio.gather(
+            *[cache_fetch("stats:overview", compute, 300) for _ in range(5)]
+        )
+
+        assert values == [{"total": 3}] * 5
+        assert len(calls) == 1
+        assert 300 * 0.9 + 75 <= redis_client.ttls["stats:overview"] <= 375
+        assert "lock:stats:overview" not in redis_client.data
+
+    async def test_fresh_value_is_served(self, redis_client):
+        """Test values outside the stale window are returned as they are."""
+        redis_client.data["stats:overview"] = json.dumps({"total": 1})
+        redis_client.ttls["stats:overview"] = 200
+        compute, calls = self.counting({"total": 2})
+
+        assert await cache_fetch("stats:overview", compute, 300) == {"total": 1}
+        assert calls == []
+
+    async def test_stale_value_refreshed_by_lock_holder(self, redis_client):
+        """Test stale values are served while one caller refreshes."""
+        redis_client.data["stats:overview"] = json.dumps({"total": 1})
+        redis_client.ttls["stats:overview"] = 10
+        redis_client.data["lock:stats:overview"] = "other-worker"
+        compute, calls = self.counting({"total": 2})
+
+        assert await cache_fetch("stats:overview", compute, 300) == {"total": 1}
+        assert calls == []
+
+        del redis_client.data["lock:stats:overview"]
+        assert await cache_fetch("stats:overview", compute, 300) == {"total": 2}
+        assert len(calls) == 1
+
+    async def test_miss_waits_for_other_worker(self, redis_client, monkeypatch):
+        """Test a locked miss waits for the value, then computes itself."""
+        monkeypatch.setattr(cache_module, "LOCK_WAIT", 0.3)
+        monkeypatch.setattr(cache_module, "LOCK_POLL_INTERVAL", 0.01)
+        redis_client.data["lock:search:q"] = "other-worker"
+        compute, calls = self.counting(["mine"])
+
+        async def other_worker():
+            await asyncio.sleep(0.05)
+            redis_client.data["search:q"] = json.dumps(["theirs"])
+
+        value, _ = await asyncio.gather(cache_fetch("search:q", compute, 300), other_worker())
+
+        assert value == ["theirs"]
+        assert calls == []
+
+        assert await cache_fetch("search:other", compute, 300) == ["mine"]
+
+    def test_jitter_shortens_ttls(self):
+        """Test jittered TTLs stay within the jitter fraction."""
+        assert all(900 <= jittered(1000) <= 1000 for _ in range(100))
+        assert jittered(0) == 1
+
+
+class TestCacheTags:
+    """Tests for tag-based invalidation."""
+
+    @with_local_cache
+    async def test_tags_register_keys(self, redis_client):
+        """Test tag sets collect their keys and outlive the longest one."""
+        await cache_set("stats:overview", {}, 300, tags=["stats", "events"])
+        year_tags = [cache_tag("events", "year", 1917)]
+        await cache_set("globe:events:1917", [], 3600, tags=year_tags)
+        await cache_set("search:q", [], 60, tags=["events"])
+
+        assert redis_client.data["tag:events"] == {"stats:overview", "search:q"}
+        assert redis_client.data["tag:events:year:1917"] == {"globe:events:1917"}
+        assert redis_client.ttls["tag:events"] == 300
+
+    @with_local_cache
+    async def test_invalidation_deletes_only_tagged_keys(self, redis_client):
+        """Test a tag drops its keys locally and in Redis, and nothing else."""
+        for year, value in [(1917, [1]), (1968, [2])]:
+            tags = [cache_tag("events", "year", year)]
+            await cache_set(f"globe:events:{year}", value, 3600, tags=tags)
+        await cache_set("stats:overview", {}, 300, tags=["events"])
+
+        deleted = await invalidate_tags("events", cache_tag("events", "year", 1917))
+
+        assert deleted == 2
+        assert set(redis_client.data) == {"globe:events:1968", "tag:events:year:1968"}
+        assert await cache_get("globe:events:1917") is None
+        assert await cache_get("globe:events:1968") == [2]
+        published = json.loads(redis_client.published[-1])
+        assert published["keys"] == ["globe:events:1917", "stats:overview"]
+        assert await invalidate_tags("events") == 0
+
+    @with_local_cache
+    async def test_admin_changes_invalidate_after_commit(self, redis_client, monkeypatch):
+        """Test audited changes drop their tags only once committed."""
+        from uuid import uuid4
+
+        # The admin router imports the auth module, which needs these set
+        monkeypatch.setenv("JWT_SECRET_KEY", "x" * 32)
+        monkeypatch.setenv("TOTP_ENCRYPTION_KEY", "A" * 43 + "=")
+        from src.admin import router as admin_router
+
+        monkeypatch.setattr(admin_router, "notify_data_change", lambda *args: None)
+        record_id = uuid4()
+        await cache_set("events:detail", {}, 600, tags=[cache_tag("events", record_id)])
+        year_tags = [cache_tag("events", "year", 1917)]
+        await cache_set("globe:events:1917", [], 600, tags=year_tags)
+
+        engine = create_engine("sqlite://")
+        with Session(engine) as session:
+            session.execute(text("SELECT 1"))
+            admin_db = SimpleNamespace(info=session.info, execute=lambda *args: asyncio.sleep(0))
+            await admin_router.log_audit(
+                admin_db, "events", record_id, "UPDATE", uuid4(),
+                cache_tags=admin_router.event_year_tags(date(1917, 11, 7)),
+            )
+            assert "events:detail" in redis_client.data
+
+            session.commit()
+            await run_committed_callbacks(session)
+        assert "events:detail" not in redis_client.data
+        assert "globe:events:1917" not in redis_client.data
+
+
+class TestCacheCodec:
+    """Tests for the versioned, compressed cache value format."""
+
+    def test_round_trip_matches_json(self):
+        """Test values read back as they would from plain JSON."""
+        from datetime import date, datetime
+        from uuid import UUID
+
+        value = {
+            "day": date(1917, 11, 7),
+            "at": datetime(1917, 11, 7, 21, 45),
+            "id": UUID(int=7),
+            1: (1, 2),
+            "big": 2 ** 70,
+        }
+        expected = json.loads(json.dumps(value, default=str))
+        encoded = cache_codec.encode(value)
+        assert encoded[0] == cache_codec.FORMAT_VERSION
+        assert cache_codec.decode(encoded) == expected
+
+    def test_large_values_are_compressed(self):
+        """Test payloads past the threshold are stored compressed."""
+        features = [{"type": "Feature", "properties": {"name": "x" * 20}}] * 500
+        encoded = cache_codec.encode(features)
+        assert encoded[1] & 0x0F == cache_codec.DEFAULT_COMPRESSOR
+        assert len(encoded) < len(json.dumps(features)) / 10
+
+        value, size = cache_codec.decode_with_size(encoded)
+        assert value == features
+        assert size > len(encoded)
+
+        small = cache_codec.encode({"a": 1})
+        assert small[1] & 0x0F == cache_codec.NONE
+
+    def test_legacy_and_unknown_values(self):
+        """Test JSON text still decodes and unknown formats raise."""
+        assert cache_codec.decode(b'{"a": [1, 2]}') == {"a": [1, 2]}
+        assert cache_codec.decode('["x"]') == ["x"]
+        with pytest.raises(cache_codec.UnknownCodecError):
+            cache_codec.decode(bytes((0xC2, 0x10)) + b"{}")
+        with pytest.raises(cache_codec.UnknownCodecError):
+            cache_codec.decode(bytes((cache_codec.FORMAT_VERSION, 0xF0)) + b"{}")
+
+
+class TestCacheWarmup:
+    """Tests for replaying popular pages and hot years on startup."""
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+        calls = []
+        app.state.calls = calls
+        app.state.active = 0
+        app.state.peak = 0
+
+        @app.get("/api/v1/territories/kashmir/graves/geojson")
+        async def layer(request: Request):
+            app.state.active += 1
+            app.state.peak = max(app.state.peak, app.state.active)
+            await asyncio.sleep(0.01)
+            app.state.active -= 1
+            calls.append(request.scope.get(warmup.WARMUP_SCOPE_KEY))
+            return {"type": "FeatureCollection", "features": []}
+
+        @app.get("/api/v1/territories/{region}/geojson")
+        async def region_layer(region: str):
+            return {}
+
+        return app
+
+    async def test_targets_follow_popular_pages(self, app, monkeypatch):
+        """Test popular API pages come first and set the hot years."""
+        client = FakeRedis()
+        client.data[warmup.POPULAR_PAGES_KEY] = {
+            "/api/v1/globe/events/year?year=1968": 40,
+            "/api/v1/admin/events": 30,
+            "/api/v1/globe/heatmap?type_filter=events&year=1917": 20,
+        }
+
+        async def get_redis():
+            return client
+
+        monkeypatch.setattr(warmup, "get_redis", get_redis)
+        targets = await warmup.build_targets(app)
+
+        assert targets[:2] == [
+            "/api/v1/globe/events/year?year=1968",
+            "/api/v1/globe/heatmap?type_filter=events&year=1917",
+        ]
+        assert "/api/v1/admin/events" not in targets
+        assert "/api/v1/globe/conflicts/active?year=1917" in targets
+        assert "/api/v1/geography/borders/geojson?year=2019&simplify=0.01" in targets
+        assert targets[-1] == "/api/v1/territories/kashmir/graves/geojson"
+        assert len(targets) == len(set(targets))
+
+    async def test_page_views_are_saved_to_redis(self, monkeypatch):
+        """Test warmable views are counted, flushed to Redis and ranked."""
+        client = FakeRedis()
+
+        async def get_redis():
+            return client
+
+        monkeypatch.setattr(warmup, "get_redis", get_redis)
+        monkeypatch.setattr(warmup, "_page_views", warmup.Counter())
+        for _ in range(3):
+            warmup.record_page_view("/api/v1/globe/events/year", "year=1968")
+        warmup.record_page_view("/api/v1/admin/events")
+        warmup.record_page_view("/api/v1/stats/overview")
+
+        assert await warmup.popular_pages() == [
+            "/api/v1/globe/events/year?year=1968", "/api/v1/stats/overview",
+        ]
+        await warmup.save_popular_pages()
+        assert not warmup._page_views
+        assert client.data[warmup.POPULAR_PAGES_KEY] == {
+            "/api/v1/globe/events/year?year=1968": 3, "/api/v1/stats/overview": 1,
+        }
+
+        warmup.record_page_view("/api/v1/stats/overview")
+        await warmup.save_popular_pages()
+        assert client.data[warmup.POPULAR_PAGES_KEY]["/api/v1/stats/overview"] == 2
+
+    async def test_bounded_concurrency(self, app):
+        """Test replays are marked, counted and run a few at a time."""
+        targets = [f"/api/v1/territories/kashmir/graves/geojson?v={i}" for i in range(6)]
+        targets.append("/api/v1/missing")
+        results = await warmup.warm_cache(app, targets, concurrency=2)
+
+        assert results["warmed"] == 6
+        assert results["failed"] == 1
+        assert app.state.peak == 2
+        assert app.state.calls == [True] * 6
+
+
+class TestAfterCommit:
+    """Tests for callbacks deferred until a transaction commits."""
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine("sqlite://")
+        with Session(engine) as session:
+            session.execute(text("SELECT 1"))
+            yield session
+
+    async def test_callbacks_run_after_commit(self, session):
+        """Test callbacks wait for the commit, including async ones."""
+        calls = []
+
+        async def invalidate():
+            calls.append("async")
+
+        run_after_commit(session, lambda: calls.append("sync"))
+        run_after_commit(session, invalidate)
+        await run_committed_callbacks(session)
+        assert calls == []
+
+        session.commit()
+        await run_committed_callbacks(session)
+        assert calls == ["sync", "async"]
+
+    async def test_rollback_drops_callbacks(self, session):
+        """Test callbacks for a rolled back transaction never run."""
+        calls = []
+        run_after_commit(session, lambda: calls.append(1))
+        session.rollback()
+        session.execute(text("SELECT 1"))
+        session.commit()
+        await run_committed_callbacks(session)
+        assert calls == []
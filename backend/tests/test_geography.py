@@ -0,0 +1,490 @@
+"""
+Tests for the Geography Module
+
+Tests cover the border epoch index used to cache border snapshots,
+snapping of simplification requests to precomputed levels, the
+single-country border endpoint, the vector
+tile helpers, the streaming GeoJSON writer, TopoJSON encoding and the
+World Bank indicator store, the city gazetteer and heatmap binning.
+"""
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import geojson_stream
+from src.core.geojson_stream import write_feature_collection
+from src.core.http_cache import CachedBody
+from src.core.tiles import FileLayerIndex, TileCache, tile_bounds, zoom_tolerance
+from src.core.topojson import feature_collection_to_topology
+from src.geography.border_lods import LOD_TOLERANCES, snap_tolerance
+from src.geography.epochs import BorderEpochs
+from src.geography.gazetteer import Gazetteer, get_gazetteer
+from src.geography.heatmap import DEFAULT_WEIGHT, bin_points, conflict_weight
+from src.geography.worldbank import WorldBankStore, store_worldbank_codes
+
+
+class TestBorderEpochs:
+    """Tests for mapping years to border change points."""
+
+    @pytest.fixture
+    def epochs(self) -> BorderEpochs:
+        epochs = BorderEpochs()
+        epochs.build([date(1886, 1, 1), date(1919, 6, 28), date(1990, 10, 3), date(1919, 6, 28)])
+        return epochs
+
+    def test_years_between_changes_share_an_epoch(self, epochs):
+        """Test every date maps to the last change point before it."""
+        assert epochs.epoch_count == 3
+        assert epochs.epoch_for(date(1900, 7, 1)) == date(1886, 1, 1)
+        assert epochs.epoch_for(date(1918, 7, 1)) == date(1886, 1, 1)
+        assert epochs.epoch_for(date(1919, 6, 28)) == date(1919, 6, 28)
+        assert epochs.epoch_for(date(2019, 7, 1)) == date(1990, 10, 3)
+
+    def test_before_first_change_point(self, epochs):
+        """Test dates before any border map to no epoch."""
+        assert epochs.epoch_for(date(1850, 7, 1)) is None
+
+    def test_rebuild_drops_snapshots(self, epochs):
+        """Test snapshots are discarded on rebuild, including in-flight ones."""
+        version = epochs.version
+        epochs.put_snapshot((date(1886, 1, 1), 0.0), CachedBody(b"{}"), version)
+        assert epochs.get_snapshot((date(1886, 1, 1), 0.0)) is not None
+
+        epochs.build([date(1886, 1, 1)])
+        assert epochs.get_snapshot((date(1886, 1, 1), 0.0)) is None
+
+        epochs.put_snapshot((date(1886, 1, 1), 0.0), CachedBody(b"{}"), version)
+        assert epochs.get_snapshot((date(1886, 1, 1), 0.0)) is None
+
+    def test_rebuild_drops_build_locks(self, epochs):
+        """Test build locks do not outlive the change points they name."""
+        lock = epochs.build_lock((date(1886, 1, 1), 0.01, "geojson"))
+        assert epochs.build_lock((date(1886, 1, 1), 0.01, "geojson")) is lock
+
+        epochs.build([date(1886, 1, 1)])
+        assert epochs.build_lock((date(1886, 1, 1), 0.01, "geojson")) is not lock
+
+
+class TestBorderLevelsOfDetail:
+    """Tests for snapping requested tolerances to LOD levels."""
+
+    def test_no_simplification_is_full_resolution(self):
+        """Test missing or zero tolerance keeps original geometry."""
+        assert snap_tolerance(None) is None
+        assert snap_tolerance(0) is None
+
+    def test_snaps_to_nearest_level(self):
+        """Test requests snap on a log scale and clamp to the range."""
+        assert snap_tolerance(0.01) == 0.01
+        assert snap_tolerance(0.02) == 0.01
+        assert snap_tolerance(0.03) == 0.05
+        assert snap_tolerance(1.0) == max(LOD_TOLERANCES)
+        assert snap_tolerance(0.00001) == min(LOD_TOLERANCES)
+
+
+class TestCountryBorderEndpoint:
+    """Tests for the single-country border endpoint."""
+
+    @pytest.fixture
+    def client(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from src.database import get_db
+        from src.geography.router import router
+
+        row = SimpleNamespace(
+            id="b1",
+            geometry='{"type": "Point", "coordinates": [0, 0]}',
+            valid_from=date(1946, 1, 1),
+            valid_to=None,
+            area_km2=10.0,
+        )
+
+        class FakeSession:
+            async def execute(self, query):
+                self.query = query
+                return SimpleNamespace(first=lambda: row)
+
+        app = FastAPI()
+        app.include_router(router, prefix="/geography")
+        app.dependency_overrides[get_db] = FakeSession
+        return TestClient(app)
+
+    def test_returns_border_for_year(self, client):
+        """Test the border is returned with its geometry parsed."""
+        country_id = "00000000-0000-0000-0000-000000000001"
+        response = client.get(f"/geography/countries/{country_id}/borders?year=1950")
+        assert response.status_code == 200
+        assert response.json()["geometry"] == {"type": "Point", "coordinates": [0, 0]}
+        assert response.json()["valid_to"] is None
+
+
+class TestVectorTiles:
+    """Tests for tile math, file layer lookups and the tile cache."""
+
+    def test_tile_bounds(self):
+        """Test tile coordinates map to Web Mercator extents."""
+        west, south, east, north = tile_bounds(0, 0, 0)
+        assert (west, east) == (-180.0, 180.0)
+        assert north == pytest.approx(85.0511, abs=1e-4)
+        assert south == pytest.approx(-85.0511, abs=1e-4)
+
+        west, south, east, north = tile_bounds(1, 1, 0)
+        assert (west, south, east) == (0.0, 0.0, 180.0)
+
+    def test_zoom_tolerance(self):
+        """Test coarse zooms use coarse levels and deep zooms full geometry."""
+        assert zoom_tolerance(0) == max(LOD_TOLERANCES)
+        assert zoom_tolerance(10) == min(LOD_TOLERANCES)
+        assert zoom_tolerance(14) is None
+
+    def test_file_layer_index_filters_by_bbox(self):
+        """Test only features meeting the tile are selected."""
+        index = FileLayerIndex({"features": [
+            {"geometry": {"type": "Point", "coordinates": [35.2, 31.8]}, "properties": {"n": 1}},
+            {"geometry": {"type": "LineString", "coordinates": [[-10, 0], [-5, 5]]}},
+            {"geometry": None, "properties": {}},
+        ]})
+        assert len(index) == 2
+
+        hits = index.query(tile_bounds(1, 1, 0))
+        assert len(hits) == 1
+        assert '"n":1' in hits[0]
+
+    def test_invalidate_one_layer(self):
+        """Test invalidating a layer keeps other layers' tiles."""
+        cache = TileCache()
+        cache.put("borders", (0, 0, 0, None), CachedBody(b"a"), cache.version("borders"))
+        cache.put("frontlines", (0, 0, 0, None), CachedBody(b"b"), cache.version("frontlines"))
+        stale = cache.version("borders")
+
+        cache.invalidate("borders")
+        assert cache.get("borders", (0, 0, 0, None)) is None
+        assert cache.get("frontlines", (0, 0, 0, None)) is not None
+
+        cache.put("borders", (0, 0, 0, None), CachedBody(b"a"), stale)
+        assert cache.get("borders", (0, 0, 0, None)) is None
+
+    def test_tiles_expire_after_max_age(self, monkeypatch):
+        """Test database layer tiles are dropped once older than max_age."""
+        from src.core import tiles
+
+        now = [1000.0]
+        monkeypatch.setattr(tiles.time, "monotonic", lambda: now[0])
+        cache = TileCache()
+        cache.put("frontlines", (0, 0, 0, None), CachedBody(b"b"), cache.version("frontlines"))
+
+        now[0] += 60
+        assert cache.get("frontlines", (0, 0, 0, None), max_age=120) is not None
+        now[0] += 120
+        assert cache.get("frontlines", (0, 0, 0, None), max_age=120) is None
+        assert cache.stats()["bytes"] == 0
+
+
+class TestGeoJSONStream:
+    """Tests for the streaming FeatureCollection writer."""
+
+    async def collect(self, rows, **kwargs):
+        async def source():
+            for row in rows:
+                yield row
+
+        chunks = [chunk async for chunk in write_feature_collection(
+            source(), lambda row: {"name": row.name}, **kwargs
+        )]
+        return chunks
+
+    async def test_geometry_text_is_spliced(self):
+        """Test geometry text is embedded without re-encoding."""
+        rows = [
+            SimpleNamespace(name="A", geometry='{"type":"Point","coordinates":[1.5,2]}'),
+            SimpleNamespace(name="B", geometry=None),
+        ]
+        chunks = await self.collect(rows, empty_geometry=b"{}")
+        collection = json.loads(b"".join(chunks))
+
+        assert collection["type"] == "FeatureCollection"
+        assert collection["features"][0]["geometry"]["coordinates"] == [1.5, 2]
+        assert collection["features"][1]["geometry"] == {}
+        assert b'"coordinates":[1.5,2]' in b"".join(chunks)
+
+    async def test_empty_collection(self):
+        """Test no rows still produce a valid collection."""
+        chunks = await self.collect([])
+        assert json.loads(b"".join(chunks)) == {"type": "FeatureCollection", "features": []}
+
+    async def test_output_is_chunked(self, monkeypatch):
+        """Test output is flushed in bounded chunks."""
+        monkeypatch.setattr(geojson_stream, "FLUSH_BYTES", 200)
+        point = '{"type":"Point","coordinates":[0,0]}'
+        rows = [SimpleNamespace(name=str(i), geometry=point) for i in range(50)]
+        chunks = await self.collect(rows)
+
+        assert len(chunks) > 10
+        assert max(len(chunk) for chunk in chunks) < 400
+        assert len(json.loads(b"".join(chunks))["features"]) == 50
+
+
+def square(x0, y0, size=1):
+    return [[x0, y0], [x0 + size, y0], [x0 + size, y0 + size], [x0, y0 + size], [x0, y0]]
+
+
+def decode_ring(topology, arc_refs):
+    """Rebuild absolute grid coordinates of a ring from its arc references."""
+    ring = []
+    for ref in arc_refs:
+        x = y = 0
+        points = []
+        for dx, dy in topology["arcs"][ref if ref >= 0 else ~ref]:
+            x, y = x + dx, y + dy
+            points.append((x, y))
+        if ref < 0:
+            points.reverse()
+        ring.extend(points if not ring else points[1:])
+    return ring
+
+
+class TestTopoJSON:
+    """Tests for converting feature collections to TopoJSON."""
+
+    def collection(self, *geometries):
+        return {"features": [
+            {"type": "Feature", "properties": {"n": i}, "geometry": g}
+            for i, g in enumerate(geometries)
+        ]}
+
+    def test_neighbours_share_an_arc(self):
+        """Test a common edge is stored once and referenced from both sides."""
+        topology = feature_collection_to_topology(self.collection(
+            {"type": "Polygon", "coordinates": [square(0, 0)]},
+            {"type": "Polygon", "coordinates": [square(1, 0)]},
+        ), "borders", quantization=3)
+
+        a, b = topology["objects"]["borders"]["geometries"]
+        shared = set(a["arcs"][0]) & {~ref for ref in b["arcs"][0]}
+        assert len(shared) == 1
+        assert len(topology["arcs"]) == 3
+        assert b["properties"] == {"n": 1}
+
+    def test_rings_round_trip(self):
+        """Test delta-decoded arcs rebuild the original quantized ring."""
+        topology = feature_collection_to_topology(self.collection(
+            {"type": "Polygon", "coordinates": [square(0, 0)]},
+            {"type": "Polygon", "coordinates": [square(1, 0)]},
+        ), quantization=3)
+
+        b = topology["objects"]["collection"]["geometries"][1]
+        ring = decode_ring(topology, b["arcs"][0])
+        assert ring[0] == ring[-1]
+        assert set(ring) == {(1, 0), (2, 0), (2, 2), (1, 2)}
+
+    def test_enclave_shares_hole_arc(self):
+        """Test an enclave and the hole it fills use one arc."""
+        topology = feature_collection_to_topology(self.collection(
+            {"type": "Polygon", "coordinates": [square(0, 0, 3), square(1, 1)[::-1]]},
+            {"type": "Polygon", "coordinates": [square(1, 1)]},
+        ), quantization=4)
+
+        outer, enclave = topology["objects"]["collection"]["geometries"]
+        assert outer["arcs"][1] == [~enclave["arcs"][0][0]]
+
+    def test_collapsed_geometry_is_null(self):
+        """Test geometries that vanish on the grid become null."""
+        topology = feature_collection_to_topology(self.collection(
+            {"type": "Polygon", "coordinates": [square(0, 0, 0.0001)]},
+            {"type": "Point", "coordinates": [10, 10]},
+            None,
+        ), quantization=10)
+
+        tiny, point, missing = topology["objects"]["collection"]["geometries"]
+        assert tiny["type"] is None
+        assert point["coordinates"] == [9, 9]
+        assert missing["type"] is None
+
+
+class TestWorldBankStore:
+    """Tests for the columnar World Bank store."""
+
+    @pytest.fixture
+    def store(self):
+        return WorldBankStore([
+            {
+                "country_code": "CUB",
+                "country_name": "Cuba",
+                "data": {
+                    "2019": {"gdp_current_usd": 100.0, "population": 11.3},
+                    "2021": {"gdp_current_usd": 0, "population": 11.2},
+                    "2022": {"population": None, "inflation": 5.0},
+                },
+            },
+            {
+                "country_code": "BOL",
+                "country_name": "Bolivia (Plurinational State of)",
+                "data": {"2020": {"population": 11.9}},
+            },
+        ])
+
+    def test_latest_skips_missing_years(self, store):
+        """Test latest values skip null and zero entries."""
+        assert store.latest_value("CUB", "gdp_current_usd") == (100.0, 2019)
+        assert store.latest_value("CUB", "population") == (11.2, 2021)
+        assert store.latest_value("BOL", "gdp_current_usd") == (None, None)
+
+    def test_series_slices_year_range(self, store):
+        """Test series are clipped to the years in the data."""
+        years, (population,) = store.series("CUB", ("population",), 1990, 2020)
+        assert list(years) == [2019, 2020]
+        assert population[0] == 11.3
+
+    def test_resolve_names(self, store):
+        """Test exact, substring and unknown names resolve once."""
+        assert store.resolve("Cuba") == "CUB"
+        assert store.resolve("Bolivia") == "BOL"
+        assert store.resolve("Atlantis") is None
+        assert "atlantis" in store._names
+
+    def test_resolve_historical_names(self, store):
+        """Test bulk resolution of CShapes-style names and ISO3 codes."""
+        codes = store.resolve_many([
+            ("Cuba (Republic of)", None),
+            ("Bolivia/Upper Peru", None),
+            ("Republic of Cuba", "CUB"),
+            ("Gran Colombia", None),
+        ])
+        assert codes[("Cuba (Republic of)", None)] == "CUB"
+        assert codes[("Bolivia/Upper Peru", None)] == "BOL"
+        assert codes[("Republic of Cuba", "CUB")] == "CUB"
+        assert codes[("Gran Colombia", None)] is None
+
+    def test_empty_store(self):
+        """Test a missing data file gives an empty but usable store."""
+        store = WorldBankStore([])
+        assert "CUB" not in store
+        assert store.resolve("Cuba") is None
+
+    def test_store_codes_updates_rows(self):
+        """Test resolved codes are written to the matching countries."""
+        from uuid import uuid4
+
+        from sqlalchemy import create_engine, select
+        from sqlalchemy.orm import Session
+
+        from src.geography.models import Country
+
+        engine = create_engine("sqlite://")
+        Country.__table__.create(engine)
+        cuba, chile = uuid4(), uuid4()
+        with Session(engine) as session:
+            for row_id, name in [(cuba, "Cuba"), (chile, "Chile")]:
+                session.add(Country(id=row_id, name_en=name, valid_from=date(1900, 1, 1)))
+            session.commit()
+
+            assert store_worldbank_codes(session, {cuba: "CUB"}) == 1
+            assert store_worldbank_codes(session, {}) == 0
+            session.commit()
+
+            codes = dict(session.execute(select(Country.name_en, Country.worldbank_code)).all())
+        assert codes == {"Cuba": "CUB", "Chile": None}
+
+
+class TestGazetteer:
+    """Tests for the in-process city gazetteer."""
+
+    @pytest.fixture
+    def gazetteer(self) -> Gazetteer:
+        return Gazetteer([
+            {"name": "Havana", "country": "Cuba", "lat": 23.11, "lng": -82.37,
+             "importance": 9, "type": "capital"},
+            {"name": "Santiago de Cuba", "country": "Cuba", "lat": 20.02, "lng": -75.82,
+             "importance": 7, "type": "liberation"},
+            {"name": "Bogotá", "country": "Colombia", "lat": 4.71, "lng": -74.07,
+             "importance": 8, "type": "capital"},
+            {"name": "Havana", "country": "Cuba", "lat": 23.11, "lng": -82.37,
+             "importance": 6, "type": "protest"},
+            {"name": "Suva", "country": "Fiji", "lat": -18.14, "lng": 178.44,
+             "importance": 5, "type": "capital"},
+        ])
+
+    def test_geocode(self, gazetteer):
+        """Test exact, accented, comma, country and substring lookups."""
+        assert gazetteer.geocode("havana")["type"] == "capital"
+        assert gazetteer.geocode("Bogota")["country"] == "Colombia"
+        assert gazetteer.geocode("Havana, Cuba")["name"] == "Havana"
+        assert gazetteer.geocode("Colombia")["name"] == "Bogotá"
+        assert gazetteer.geocode("Santiago")["name"] == "Santiago de Cuba"
+        assert gazetteer.geocode("Atlantis") is None
+        assert gazetteer.geocode("") is None
+
+    def test_centroid_averages_listed_cities(self, gazetteer):
+        """Test centroids match averaging every city of the countries."""
+        lat, lng = gazetteer.centroid(["Cuba", "Cuba", "Atlantis"])
+        assert lat == pytest.approx((23.11 * 2 + 20.02) / 3)
+        assert lng == pytest.approx((-82.37 * 2 - 75.82) / 3)
+        assert gazetteer.centroid(["Atlantis"]) == (None, None)
+
+    def test_mentioned_country(self, gazetteer):
+        """Test conflict names resolve to the named country's first city."""
+        assert gazetteer.mentioned_country("Colombian conflict")["name"] == "Bogotá"
+        assert gazetteer.mentioned_country("Cuban Revolution")["name"] == "Havana"
+        assert gazetteer.mentioned_country("Boxer Rebellion") is None
+
+    def test_nearest_matches_brute_force(self):
+        """Test the grid search agrees with a full scan, across the antimeridian."""
+        import math
+        import random
+
+        from src.geography.gazetteer import _unit_vector
+
+        gazetteer = get_gazetteer()
+        rng = random.Random(7)
+        for lat, lng in [(-17.5, -179.9), (89.9, 10.0)] + [
+            (rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(200)
+        ]:
+            query = _unit_vector(lat, lng)
+            expected = min(
+                gazetteer.cities, key=lambda c: math.dist(query, _unit_vector(c["lat"], c["lng"]))
+            )
+            found = gazetteer.nearest(lat, lng)
+            assert (found["lat"], found["lng"]) == (expected["lat"], expected["lng"])
+
+    def test_nearest_max_distance(self, gazetteer):
+        """Test nearest returns None beyond the distance limit."""
+        assert gazetteer.nearest(-17.5, -179.9)["name"] == "Suva"
+        assert gazetteer.nearest(-17.5, -179.9, max_km=100) is None
+
+
+class TestHeatmapBinning:
+    """Tests for aggregating weighted points into heatmap cells."""
+
+    def test_points_merge_into_weighted_cells(self):
+        """Test nearby points share a cell placed at their weighted mean."""
+        cells = bin_points([10.2, 10.8, 40.0], [20.1, 20.5, -70.0], [1.0, 3.0, 2.0], resolution=2.0)
+        assert len(cells) == 2
+        heaviest = cells[0]
+        assert heaviest["count"] == 2
+        assert heaviest["intensity"] == 1.0
+        assert heaviest["lat"] == pytest.approx((10.2 + 10.8 * 3) / 4)
+        assert heaviest["lng"] == pytest.approx((20.1 + 20.5 * 3) / 4)
+        assert cells[1]["intensity"] == 0.5
+
+    def test_edges_of_the_grid(self):
+        """Test the poles and the antimeridian bin without overflow."""
+        cells = bin_points([90.0, -90.0, 0.0], [180.0, -180.0, 179.9], [1, 1, 1], resolution=5.0)
+        assert sum(c["count"] for c in cells) == 3
+        assert bin_points([], [], []) == []
+
+    def test_zero_weights(self):
+        """Test cells with zero total weight still get a position."""
+        (cell,) = bin_points([1.0, 1.5], [1.0, 1.5], [0, 0])
+        assert cell["lat"] == pytest.approx(1.25)
+        assert cell["intensity"] == 0.0
+
+    def test_conflict_weights(self):
+        """Test imported intensity values, including UCDP wars, are weighted."""
+        assert conflict_weight("war") == conflict_weight("major") == 10.0
+        assert conflict_weight(" Minor ") == 3.0
+        assert conflict_weight(None) == conflict_weight("unknown") == DEFAULT_WEIGHT
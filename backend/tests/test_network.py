@@ -0,0 +1,123 @@
+"""
+Tests for the Network Module
+
+Tests cover the in-memory person graph used by network endpoints and
+the offline graph metrics.
+"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.people.graph import PersonGraph
+from src.people.graph_metrics import (
+    approximate_betweenness,
+    label_propagation,
+    pagerank,
+    symmetric_csr,
+)
+
+
+class TestPersonGraph:
+    """Tests for CSR person graph traversal."""
+
+    @pytest.fixture
+    def people(self) -> dict:
+        return {name: uuid4() for name in ["marx", "engels", "lenin", "luxemburg", "trotsky"]}
+
+    @pytest.fixture
+    def graph(self, people) -> PersonGraph:
+        graph = PersonGraph()
+        graph.build(
+            [
+                (people["engels"], people["marx"], "collaborated_with", 1.0),
+                (people["lenin"], people["marx"], "influenced_by", 0.8),
+                (people["trotsky"], people["lenin"], "colleague_of", None),
+                (people["luxemburg"], people["lenin"], "opposed", 0.5),
+            ],
+            [(
+                people["lenin"],
+                "Chairman of the Council of People's Commissars",
+                "head_of_government",
+            )],
+        )
+        return graph
+
+    def test_neighbors_ignore_direction(self, graph, people):
+        """Test neighbours include both incoming and outgoing connections."""
+        assert set(graph.neighbors(people["marx"])) == {people["engels"], people["lenin"]}
+
+    def test_traverse_by_depth(self, graph, people):
+        """Test BFS stops at the requested depth."""
+        reached, truncated = graph.traverse(people["marx"], depth=1, max_nodes=100)
+        assert reached[0] == people["marx"]
+        assert set(reached) == {people["marx"], people["engels"], people["lenin"]}
+        assert not truncated
+
+        reached, _ = graph.traverse(people["marx"], depth=2, max_nodes=100)
+        assert len(reached) == 5
+
+    def test_traverse_node_cap(self, graph, people):
+        """Test the node cap truncates the walk."""
+        reached, truncated = graph.traverse(people["marx"], depth=4, max_nodes=2)
+        assert len(reached) == 2
+        assert truncated
+
+    def test_edges_among_keep_orientation(self, graph, people):
+        """Test edges are reported once with their original direction."""
+        edges = graph.edges_among([people["marx"], people["lenin"], people["trotsky"]])
+        assert sorted((e[0], e[1], e[2]) for e in edges) == sorted([
+            (people["lenin"], people["marx"], "influenced_by"),
+            (people["trotsky"], people["lenin"], "colleague_of"),
+        ])
+        assert all(e[3] == 1.0 for e in edges if e[2] == "colleague_of")
+
+    def test_removed_person_is_masked(self, graph, people):
+        """Test a deleted person drops out of traversals without a rebuild."""
+        graph.remove_person(people["lenin"])
+        reached, _ = graph.traverse(people["marx"], depth=4, max_nodes=100)
+        assert set(reached) == {people["marx"], people["engels"]}
+
+    def test_positions(self, graph, people):
+        """Test positions are available per person."""
+        assert graph.positions(people["lenin"])[0][1] == "head_of_government"
+        assert graph.positions(people["marx"]) == []
+
+
+class TestGraphMetrics:
+    """Tests for the vectorized centrality and community functions."""
+
+    def test_pagerank_sums_to_one(self):
+        """Test rank mass is preserved, including from dangling nodes."""
+        ranks = pagerank(4, np.array([0, 1, 2]), np.array([1, 2, 0]))
+        assert ranks.sum() == pytest.approx(1.0)
+        assert ranks[3] < ranks[0]
+
+    def test_betweenness_of_path_center(self):
+        """Test the middle of a path lies on every shortest path."""
+        indptr, indices = symmetric_csr(3, np.array([0, 1]), np.array([1, 2]))
+        scores = approximate_betweenness(indptr, indices, samples=3)
+        assert scores.tolist() == pytest.approx([0.0, 1.0, 0.0])
+
+    def test_label_propagation_separates_components(self):
+        """Test two disconnected triangles form two communities."""
+        src = np.array([0, 1, 2, 3, 4, 5])
+        dst = np.array([1, 2, 0, 4, 5, 3])
+        indptr, indices = symmetric_csr(6, src, dst)
+        labels = label_propagation(indptr, indices)
+        assert len(set(labels[:3])) == 1
+        assert len(set(labels[3:])) == 1
+        assert labels[0] != labels[3]
+
+    def test_edge_arrays_include_organizations(self):
+        """Test memberships become edges to shared organization nodes."""
+        a, b = uuid4(), uuid4()
+        graph = PersonGraph()
+        graph.build(
+            [(a, b, "comrade_of", 1.0)],
+            [(a, "Central Committee", "member"), (b, "Central Committee", "member")],
+        )
+        keys, src, dst = graph.edge_arrays()
+        assert keys == [a, b, "org:Central Committee"]
+        assert len(src) == len(dst) == 5
@@ -0,0 +1,214 @@
+"""
+Tests for the Search Module
+
+Tests cover query preparation, faceted search filters and facet counts,
+and the autocomplete prefix index.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.core import search_advanced
+from src.core.search import (
+    build_unified_search_sql,
+    prepare_tsquery,
+    search_tags,
+    unified_search,
+)
+from src.core.search_advanced import build_facet_filters, get_search_facets
+from src.core.suggestions import SuggestionIndex
+
+
+class TestQueryPreparation:
+    """Tests for full-text query helpers."""
+
+    def test_prepare_tsquery_prefix_matches_each_word(self):
+        """Test every word becomes an AND-ed prefix term."""
+        assert prepare_tsquery("paris commune") == "paris:* & commune:*"
+
+    def test_prepare_tsquery_strips_operators(self):
+        """Test tsquery syntax characters are removed."""
+        assert prepare_tsquery("marx & (engels | !lenin)") == "marx:* & engels:* & lenin:*"
+        assert prepare_tsquery("&|!") == ""
+
+    def test_unified_sql_only_includes_requested_types(self):
+        """Test the UNION ALL query is built from the requested branches."""
+        sql = build_unified_search_sql({"person", "book", "unknown"})
+
+        assert sql.count("UNION ALL") == 1
+        assert "FROM people" in sql
+        assert "FROM books" in sql
+        assert "FROM events" not in sql
+
+    def test_search_tags_cover_every_type(self):
+        """Test each searchable type is tagged with its table."""
+        assert search_tags("party, person") == ["people", "political_parties"]
+        assert "political_parties" in search_tags(None)
+        assert set(search_tags(None)) >= {"people", "events", "conflicts", "books", "countries"}
+
+    def test_total_survives_empty_page(self):
+        """Test paging past the last match still reports the total."""
+        class FakeSession:
+            def __init__(self, rows):
+                self.rows = rows
+
+            async def execute(self, query, params):
+                self.params = params
+                return SimpleNamespace(fetchall=lambda: self.rows)
+
+        empty_page = FakeSession([SimpleNamespace(id=None, total=7)])
+        rows, total = asyncio.run(unified_search(empty_page, "x", "x:*", {"person"}, 10, 20))
+        assert (rows, total) == ([], 7)
+        assert empty_page.params["offset"] == 20
+
+        hit = SimpleNamespace(id="1", total=1)
+        rows, total = asyncio.run(unified_search(FakeSession([hit]), "x", "x:*", {"person"}, 10))
+        assert (rows, total) == ([hit], 1)
+
+
+class TestFacetFilters:
+    """Tests for the faceted search WHERE clause."""
+
+    def matching_types(self, where_sql, params):
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("CREATE TABLE hits (type TEXT, year INTEGER)"))
+            conn.execute(text("INSERT INTO hits VALUES (:type, :year)"), [
+                {"type": "event", "year": 1917},
+                {"type": "event", "year": 1848},
+                {"type": "conflict", "year": 1848},
+                {"type": "person", "year": 1818},
+                {"type": "country", "year": None},
+            ])
+            rows = conn.execute(text(f"SELECT type FROM hits {where_sql}"), params)
+            return sorted(row.type for row in rows)
+
+    def test_year_filter_keeps_types_without_years(self):
+        """Test a year filter only constrains events and conflicts."""
+        where_sql, params = build_facet_filters(None, None, 1900, 2000)
+        assert self.matching_types(where_sql, params) == ["country", "event", "person"]
+
+    def test_filters_only_apply_to_their_types(self):
+        """Test country and category filters skip types without the field."""
+        where_sql, params = build_facet_filters({"c1"}, {"strike"}, None, None)
+        country_clause, category_clause = where_sql[len("WHERE "):].split(" AND ")
+        assert "'conflict'" not in country_clause and "'country'" not in country_clause
+        assert category_clause.startswith("(hits.type NOT IN ('event') OR")
+        assert params == {"country_ids": ["c1"], "categories": ["strike"]}
+
+
+class TestSearchFacets:
+    """Tests for cached facet counts."""
+
+    @pytest.fixture
+    def facets_db(self, monkeypatch):
+        db = SimpleNamespace(keys=[], queries=[], rows=[
+            SimpleNamespace(facet="types", value="person", count=2),
+            SimpleNamespace(facet="types", value="event", count=5),
+            SimpleNamespace(facet="years", value="1910", count=4),
+            SimpleNamespace(facet="years", value="1840", count=1),
+            SimpleNamespace(facet="countries", value="France", count=3),
+        ])
+
+        class FakeSession:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, query, params):
+                db.queries.append((str(query), params))
+                return SimpleNamespace(fetchall=lambda: db.rows)
+
+        async def cache_fetch(key, compute, ttl, tags=()):
+            db.keys.append(key)
+            return await compute()
+
+        monkeypatch.setattr(search_advanced, "cache_fetch", cache_fetch)
+        monkeypatch.setattr(search_advanced, "async_session_maker", FakeSession)
+        return db
+
+    async def test_cache_key_is_normalized(self, facets_db):
+        """Test case, whitespace and type order share a key, filters do not."""
+        where_sql, params = build_facet_filters({"c2", "c1"}, None, 1900, None)
+        await get_search_facets(
+            " Paris  Commune", "paris:* & commune:*", {"person", "event"}, where_sql, params,
+        )
+        await get_search_facets(
+            "paris commune", "paris:* & commune:*", {"event", "person"}, where_sql, params,
+        )
+        where_sql, params = build_facet_filters({"c1"}, None, 1900, None)
+        await get_search_facets(
+            "paris commune", "paris:* & commune:*", {"event", "person"}, where_sql, params,
+        )
+
+        first, second, other_country = facets_db.keys
+        assert first == second
+        assert other_country != first
+
+    async def test_facets_cover_filtered_match_set(self, facets_db):
+        """Test facets aggregate every filtered match rather than one page."""
+        where_sql, params = build_facet_filters(None, {"strike"}, 1900, 2000)
+        facets = await get_search_facets(
+            "strike", "strike:*", {"event", "person"}, where_sql, params,
+        )
+
+        sql, query_params = facets_db.queries[0]
+        assert where_sql in sql
+        assert "LIMIT" not in sql and "OFFSET" not in sql
+        assert query_params == {**params, "tsquery": "strike:*", "query": "strike"}
+        assert [v.value for v in facets.types] == ["event", "person"]
+        assert [v.value for v in facets.years] == ["1840", "1910"]
+        assert facets.countries[0].count == 3
+
+
+class TestSuggestionIndex:
+    """Tests for the in-process autocomplete index."""
+
+    @pytest.fixture
+    def index(self) -> SuggestionIndex:
+        index = SuggestionIndex()
+        index.build([
+            ("Karl Marx", "person", "1"),
+            ("Karl Liebknecht", "person", "2"),
+            ("Rosa Luxemburg", "person", "3"),
+            ("Paris Commune", "event", "4"),
+            ("Kenya", "country", "5"),
+        ])
+        return index
+
+    def test_whole_name_prefix(self, index):
+        """Test names are matched from their first character."""
+        texts = [s[0] for s in index.lookup("karl")]
+        assert texts == ["Karl Liebknecht", "Karl Marx"]
+
+    def test_word_prefix(self, index):
+        """Test later words in a name are matched too."""
+        assert index.lookup("lux") == [("Rosa Luxemburg", "person", "3")]
+
+    def test_whole_name_matches_rank_first(self, index):
+        """Test whole-name matches come before word matches."""
+        index.build([("Commune of Paris", "event", "1"), ("Paris Commune", "event", "2")])
+        texts = [s[0] for s in index.lookup("comm")]
+        assert texts == ["Commune of Paris", "Paris Commune"]
+
+    def test_case_and_whitespace_insensitive(self, index):
+        """Test lookups ignore case and repeated spaces."""
+        assert index.lookup("  PARIS   com")[0][0] == "Paris Commune"
+
+    def test_limit_and_no_duplicates(self, index):
+        """Test results are capped and each entity appears once."""
+        index.build([("Marx Marx Marx", "person", "1"), ("Marxism", "event", "2")])
+        assert len(index.lookup("marx", limit=1)) == 1
+        assert len(index.lookup("marx")) == 2
+
+    def test_mark_stale_requests_refresh(self, index):
+        """Test admin writes flag the index for rebuilding."""
+        index.max_age_seconds = 3600
+        assert not index.needs_refresh()
+        index.mark_stale()
+        assert index.needs_refresh()
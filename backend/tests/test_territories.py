@@ -0,0 +1,109 @@
+"""
+Tests for the Territories Module
+
+Tests cover OSM to GeoJSON conversion used for liberation overlays and
+the format option on the file-backed layer endpoints.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.file_cache import FileCache
+from src.territories import geojson_router
+from src.territories.osm_build import convert_osm_to_geojson, merge_lines
+
+
+def node(id, lon, lat, **tags):
+    el = {"type": "node", "id": id, "lon": lon, "lat": lat}
+    if tags:
+        el["tags"] = tags
+    return el
+
+
+class TestOsmConversion:
+    """Tests for node resolution and relation assembly."""
+
+    def test_skeleton_ways_resolve_node_refs(self):
+        """Test ways without inline geometry use referenced nodes."""
+        osm = {"elements": [
+            {"type": "way", "id": 1, "nodes": [10, 11, 12], "tags": {"barrier": "wall"}},
+            node(10, 35.0, 31.0), node(11, 35.1, 31.1), node(12, 35.2, 31.0),
+            node(13, 35.3, 31.3, barrier="checkpoint"),
+        ]}
+        features = convert_osm_to_geojson(osm)["features"]
+
+        assert [f["geometry"]["type"] for f in features] == ["LineString", "Point"]
+        assert features[0]["geometry"]["coordinates"][1] == (35.1, 31.1)
+
+    def test_multipolygon_relation_assembles_rings(self):
+        """Test outer and inner member ways are joined into one polygon."""
+        osm = {"elements": [
+            {"type": "relation", "id": 5, "tags": {"type": "multipolygon", "landuse": "military"},
+             "members": [
+                 {"type": "way", "ref": 1, "role": "outer"},
+                 {"type": "way", "ref": 2, "role": "outer"},
+                 {"type": "way", "ref": 3, "role": "inner"},
+             ]},
+            {"type": "way", "id": 1, "nodes": [1, 2, 3]},
+            {"type": "way", "id": 2, "nodes": [1, 4, 3]},
+            {"type": "way", "id": 3, "nodes": [5, 6, 7, 5]},
+            node(1, 0, 0), node(2, 10, 0), node(3, 10, 10), node(4, 0, 10),
+            node(5, 2, 2), node(6, 4, 2), node(7, 4, 4),
+        ]}
+        features = convert_osm_to_geojson(osm)["features"]
+
+        assert len(features) == 1
+        geometry = features[0]["geometry"]
+        assert geometry["type"] == "Polygon"
+        assert len(geometry["coordinates"]) == 2
+        assert len(geometry["coordinates"][0]) == 5
+
+    def test_merge_lines_keeps_open_chains(self):
+        """Test segments that never close are returned as chains."""
+        rings, chains = merge_lines([[(0, 0), (1, 0)], [(2, 0), (1, 0)]])
+        assert rings == []
+        assert chains == [[(0, 0), (1, 0), (2, 0)]]
+
+
+class TestGeoJSONFormat:
+    """Tests for TopoJSON output on the layer endpoints."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        (tmp_path / "overview.json").write_text(json.dumps({"occupied_since": 1963}))
+        (tmp_path / "massacres.geojson").write_text(json.dumps({
+            "type": "FeatureCollection",
+            "features": [{
+                "type": "Feature",
+                "properties": {"name": "Biak"},
+                "geometry": {"type": "Point", "coordinates": [136.1, -1.2]},
+            }],
+        }))
+        (tmp_path / "detention_facilities.geojson").write_text(json.dumps([{"name": "x"}]))
+
+        cache = FileCache()
+        monkeypatch.setattr(geojson_router, "get_file_cache", lambda: cache)
+        monkeypatch.setattr(geojson_router, "WEST_PAPUA_DIR", tmp_path)
+        monkeypatch.setattr(geojson_router, "UYGHUR_DIR", tmp_path)
+        app = FastAPI()
+        app.include_router(geojson_router.router)
+        return TestClient(app)
+
+    def test_layers_convert_to_topojson(self, client):
+        """Test GeoJSON layers honour format=topojson."""
+        topology = client.get("/west-papua/massacres/geojson?format=topojson").json()
+        assert topology["type"] == "Topology"
+        geometries = topology["objects"]["massacres"]["geometries"]
+        assert geometries[0]["properties"] == {"name": "Biak"}
+        assert client.get("/west-papua/massacres/geojson").json()["type"] == "FeatureCollection"
+
+    def test_other_routes_ignore_format(self, client):
+        """Test overviews are never converted and non-GeoJSON layers are rejected."""
+        overview = client.get("/west-papua/overview?format=topojson")
+        assert overview.json() == {"occupied_since": 1963}
+
+        response = client.get("/uyghur-region/detention-facilities/geojson?format=topojson")
+        assert response.status_code == 400